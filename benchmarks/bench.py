@@ -0,0 +1,338 @@
+"""Throughput, latency and memory benchmarks over the checked-in HTML corpus.
+
+Usage::
+
+    python benchmarks/bench.py run                      # writes benchmarks/results/<commit>.json
+    python benchmarks/bench.py run --only trafilatura --iterations 50
+    python benchmarks/bench.py compare OLD.json NEW.json --threshold 10
+
+Every benchmark/page pair runs in a fresh interpreter, so peak RSS is measured
+in isolation and import or warm-up costs of one case never leak into another.
+The ``fetch`` benchmark drives the whole URL path (robots.txt, streaming
+download, decoding, conversion) against a local stub HTTP server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+BENCH_DIR = Path(__file__).resolve().parent
+CORPUS_DIR = BENCH_DIR / "corpus"
+RESULTS_DIR = BENCH_DIR / "results"
+PAGES: tuple[str, ...] = ("small", "huge", "table_heavy", "link_heavy")
+BENCHMARKS: tuple[str, ...] = ("trafilatura", "readability", "rewrite_relative_links", "fetch")
+DEFAULT_ITERATIONS = 20
+DEFAULT_WARMUP = 2
+DEFAULT_CASE_TIMEOUT = 600.0
+BASE_URL = "https://example.com/section/page.html"
+_PACKAGES = ("extract2md", "lxml", "trafilatura", "readabilipy", "markdownify", "httpx")
+
+
+def _converter_case(name: str) -> Callable[[str, str], Callable[[], object]]:
+    def prepare(page: str, html: str) -> Callable[[], object]:
+        from extract2md.converters import get_converter
+
+        converter = get_converter(name)
+        return lambda: converter.convert(html)
+
+    return prepare
+
+
+def _rewrite_case(page: str, html: str) -> Callable[[], object]:
+    from extract2md._links import rewrite_relative_links
+
+    return lambda: rewrite_relative_links(html, base_url=BASE_URL)
+
+
+def _fetch_case(page: str, html: str) -> Callable[[], object]:
+    import asyncio
+
+    from extract2md import RobotsCache, afetch_to_markdown, create_client
+
+    server = _start_stub_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/{page}.html"
+    loop = asyncio.new_event_loop()
+    client = create_client()
+    robots_cache = RobotsCache()
+
+    def run() -> object:
+        return loop.run_until_complete(
+            afetch_to_markdown(url, client=client, robots_cache=robots_cache)
+        )
+
+    return run
+
+
+CASES: dict[str, Callable[[str, str], Callable[[], object]]] = {
+    "trafilatura": _converter_case("trafilatura"),
+    "readability": _converter_case("readability"),
+    "rewrite_relative_links": _rewrite_case,
+    "fetch": _fetch_case,
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Serve the corpus and a permissive robots.txt."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this small pages stall on delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        if self.path == "/robots.txt":
+            self._send(b"User-agent: *\nAllow: /\n", "text/plain")
+            return
+        path = CORPUS_DIR / self.path.lstrip("/")
+        if path.parent != CORPUS_DIR or not path.is_file():
+            self.send_error(404)
+            return
+        self._send(path.read_bytes(), "text/html; charset=utf-8")
+
+    def _send(self, body: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def _start_stub_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_case(benchmark: str, page: str, *, iterations: int, warmup: int) -> dict[str, Any]:
+    """Time ``iterations`` runs of one benchmark on one page in this process."""
+    html = (CORPUS_DIR / f"{page}.html").read_text(encoding="utf-8")
+    call = CASES[benchmark](page, html)
+    for _ in range(warmup):
+        call()
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    return {"latencies": latencies, "peak_rss_bytes": _peak_rss_bytes()}
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile, stable for the small sample sizes used here."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(benchmark: str, page: str, raw: dict[str, Any]) -> dict[str, Any]:
+    latencies = raw["latencies"]
+    return {
+        "benchmark": benchmark,
+        "page": page,
+        "iterations": len(latencies),
+        "pages_per_sec": len(latencies) / sum(latencies),
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "peak_rss_mib": (
+            raw["peak_rss_bytes"] / (1024 * 1024) if raw["peak_rss_bytes"] is not None else None
+        ),
+    }
+
+
+def environment() -> dict[str, Any]:
+    """Describe what was measured so results of different commits can be matched up."""
+
+    def git(*args: str) -> str | None:
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=BENCH_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    versions = {}
+    for package in _PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    corpus = {
+        path.name: hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+        for path in sorted(CORPUS_DIR.glob("*.html"))
+    }
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "packages": versions,
+        "corpus": corpus,
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    benchmarks = args.only or list(BENCHMARKS)
+    pages = args.pages or list(PAGES)
+    env = environment()
+    results = []
+    for benchmark in benchmarks:
+        for page in pages:
+            try:
+                completed = _run_case_process(benchmark, page, args)
+            except subprocess.TimeoutExpired:
+                completed = subprocess.CompletedProcess([], 1, "", f"timed out after {args.timeout}s")
+            if completed.returncode != 0:
+                error = completed.stderr.strip().splitlines()[-1:] or ["unknown error"]
+                print(f"{benchmark:<24} {page:<12} skipped: {error[0]}", file=sys.stderr)
+                results.append({"benchmark": benchmark, "page": page, "error": error[0]})
+                continue
+            summary = summarize(benchmark, page, json.loads(completed.stdout))
+            results.append(summary)
+            print(_format_row(summary), file=sys.stderr)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{env['commit'] or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"environment": env, "results": results}, indent=2) + "\n")
+    print(f"wrote {output}", file=sys.stderr)
+    return 0
+
+
+def _run_case_process(
+        benchmark: str,
+        page: str,
+        args: argparse.Namespace,
+) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "_case",
+            benchmark,
+            page,
+            "--iterations",
+            str(args.iterations),
+            "--warmup",
+            str(args.warmup),
+        ],
+        capture_output=True,
+        check=False,
+        text=True,
+        timeout=args.timeout,
+    )
+
+
+def _format_row(summary: dict[str, Any]) -> str:
+    rss = summary["peak_rss_mib"]
+    return (
+        f"{summary['benchmark']:<24} {summary['page']:<12} "
+        f"{summary['pages_per_sec']:>9.1f} pages/s  p50 {summary['p50_ms']:>8.2f} ms  "
+        f"p99 {summary['p99_ms']:>8.2f} ms  rss {rss if rss is None else f'{rss:.1f}':>6} MiB"
+    )
+
+
+def compare(args: argparse.Namespace) -> int:
+    old = json.loads(Path(args.old).read_text())
+    new = json.loads(Path(args.new).read_text())
+    for key in ("corpus", "python", "machine"):
+        if old["environment"].get(key) != new["environment"].get(key):
+            print(f"warning: {key} differs between the runs", file=sys.stderr)
+
+    baseline = {(r["benchmark"], r["page"]): r for r in old["results"] if "error" not in r}
+    regressions = 0
+    print(f"{'benchmark':<24} {'page':<12} {'pages/s':>10} {'p50':>8} {'p99':>8} {'rss':>8}")
+    for result in new["results"]:
+        before = baseline.get((result["benchmark"], result["page"]))
+        if before is None or "error" in result:
+            continue
+        throughput = _change(before["pages_per_sec"], result["pages_per_sec"])
+        if throughput < -args.threshold:
+            regressions += 1
+        print(
+            f"{result['benchmark']:<24} {result['page']:<12} {throughput:>+9.1f}% "
+            f"{_change(before['p50_ms'], result['p50_ms']):>+7.1f}% "
+            f"{_change(before['p99_ms'], result['p99_ms']):>+7.1f}% "
+            f"{_change(before['peak_rss_mib'], result['peak_rss_mib']):>+7.1f}%"
+        )
+    if regressions:
+        print(f"{regressions} case(s) lost more than {args.threshold}% throughput", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _change(before: float | None, after: float | None) -> float:
+    if not before or after is None:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark extract2md over the checked-in corpus")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and write a JSON result file")
+    run_parser.add_argument("--only", action="append", choices=BENCHMARKS, help="Benchmark to run (repeatable)")
+    run_parser.add_argument("--pages", action="append", choices=PAGES, help="Corpus page to use (repeatable)")
+    run_parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    run_parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    run_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_CASE_TIMEOUT,
+        help="Seconds after which a single benchmark/page case is abandoned (default: %(default)s)",
+    )
+    run_parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json)")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Exit with status 1 when throughput drops by more than this percentage (default: %(default)s)",
+    )
+
+    case_parser = subparsers.add_parser("_case")
+    case_parser.add_argument("benchmark", choices=BENCHMARKS)
+    case_parser.add_argument("page", choices=PAGES)
+    case_parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    case_parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "_case":
+        raw = run_case(args.benchmark, args.page, iterations=args.iterations, warmup=args.warmup)
+        print(json.dumps(raw))
+        return 0
+    return run(args) if args.command == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
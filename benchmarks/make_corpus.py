@@ -0,0 +1,114 @@
+"""Regenerate the benchmark corpus in ``benchmarks/corpus``.
+
+The pages are built from a fixed seed, so rerunning this script reproduces the
+checked-in files byte for byte. Only rerun it on purpose: changing the corpus
+makes results incomparable with earlier runs.
+"""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+CORPUS_DIR = Path(__file__).with_name("corpus")
+SEED = 2024
+
+_WORDS = (
+    "archive", "request", "server", "parser", "element", "table", "column", "value",
+    "network", "latency", "document", "article", "section", "summary", "content",
+    "markdown", "browser", "cache", "header", "response", "encoding", "library",
+    "release", "feature", "example", "version", "history", "people", "product",
+    "market", "report", "research", "result", "method", "system", "process", "analysis",
+    "data",
+)
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return text.capitalize() + "."
+
+
+def _paragraph(rng: random.Random, sentences: int = 5) -> str:
+    return "<p>" + " ".join(_sentence(rng) for _ in range(sentences)) + "</p>"
+
+
+def _page(title: str, body: str) -> str:
+    return (
+        "<!DOCTYPE html>\n<html lang=\"en\"><head><meta charset=\"utf-8\">"
+        f"<title>{title}</title></head>\n<body>\n"
+        "<header><nav><a href=\"/\">Home</a> <a href=\"/about\">About</a> "
+        "<a href=\"/contact\">Contact</a></nav></header>\n"
+        f"<main><article><h1>{title}</h1>\n{body}\n</article></main>\n"
+        "<footer><p>Copyright Example Corp. <a href=\"/privacy\">Privacy</a></p></footer>\n"
+        "</body></html>\n"
+    )
+
+
+def small_page(rng: random.Random) -> str:
+    """A short blog post: a few paragraphs and links."""
+    body = "\n".join(_paragraph(rng) for _ in range(4))
+    return _page("A short post", body + '\n<p>See <a href="notes/next.html">the next post</a>.</p>')
+
+
+def huge_page(rng: random.Random) -> str:
+    """A very long article with many sections, lists and boilerplate."""
+    sections = []
+    for index in range(400):
+        items = "".join(f"<li>{_sentence(rng, 8)}</li>" for _ in range(4))
+        sections.append(
+            f"<section><h2>Section {index}</h2>{_paragraph(rng, 6)}"
+            f"<ul>{items}</ul>{_paragraph(rng, 4)}</section>"
+        )
+    sidebar = "".join(
+        f'<li><a href="/related/{index}">{_sentence(rng, 4)}</a></li>' for index in range(200)
+    )
+    return _page("A huge reference article", "\n".join(sections) + f"\n<aside><ul>{sidebar}</ul></aside>")
+
+
+def table_heavy_page(rng: random.Random) -> str:
+    """A data report dominated by wide tables."""
+    tables = []
+    for table in range(12):
+        header = "".join(f"<th>Column {column}</th>" for column in range(8))
+        rows = "".join(
+            "<tr>" + "".join(f"<td>{rng.randint(0, 99999)}</td>" for _ in range(8)) + "</tr>"
+            for _ in range(60)
+        )
+        tables.append(
+            f"<h2>Table {table}</h2>{_paragraph(rng, 2)}"
+            f"<table><thead><tr>{header}</tr></thead><tbody>{rows}</tbody></table>"
+        )
+    return _page("Quarterly figures", "\n".join(tables))
+
+
+def link_heavy_page(rng: random.Random) -> str:
+    """A directory page where nearly everything is a relative link or image."""
+    blocks = []
+    for block in range(40):
+        links = "".join(
+            f'<li><a href="../dir/{block}/{index}.html?ref=list#top">{_sentence(rng, 3)}</a> '
+            f'<img src="img/{block}-{index}.png" alt="thumb"></li>'
+            for index in range(50)
+        )
+        blocks.append(f"<h2>Category {block}</h2>{_paragraph(rng, 1)}<ul>{links}</ul>")
+    return _page("Link directory", "\n".join(blocks))
+
+
+PAGES = {
+    "small": small_page,
+    "huge": huge_page,
+    "table_heavy": table_heavy_page,
+    "link_heavy": link_heavy_page,
+}
+
+
+def main() -> None:
+    CORPUS_DIR.mkdir(exist_ok=True)
+    for name, build in PAGES.items():
+        html = build(random.Random(f"{SEED}-{name}"))
+        (CORPUS_DIR / f"{name}.html").write_text(html, encoding="utf-8")
+        print(f"{name}.html: {len(html.encode('utf-8')):,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,30 @@
+from ._batch import convert_directory
+from ._crawl import CrawlFrontier, acrawl, crawl
+from ._dedup import DuplicateIndex, canonical_url
+from ._fetch import create_client
+from ._manifest import Manifest, ManifestEntry
+from ._metrics import MetricsObserver, StageMetrics, observe
+from ._result_cache import ResultCache
+from ._retry import RetryPolicy
+from ._robots import RobotsCache
+from ._scheduler import HostScheduler
+from ._server import ConversionServer
+from ._sitemap import aiter_sitemap_urls
 from .core import (
     DEFAULT_USER_AGENT,
+    afetch,
+    afetch_many_to_markdown,
+    afetch_to_markdown,
+    ahtml_to_markdown,
     fetch,
+    fetch_many_to_markdown,
     fetch_to_markdown,
     file_to_markdown,
     html_to_markdown,
 )
 from .models import (
+    BatchSummary,
+    ConversionResult,
     Extract2MarkdownContentTypeError,
     Extract2MarkdownConverterError,
     Extract2MarkdownError,
@@ -15,10 +34,35 @@ from .models import (
 
 __all__ = [
     "DEFAULT_USER_AGENT",
+    "acrawl",
+    "afetch",
+    "afetch_many_to_markdown",
+    "afetch_to_markdown",
+    "ahtml_to_markdown",
+    "aiter_sitemap_urls",
+    "canonical_url",
+    "convert_directory",
+    "crawl",
+    "create_client",
     "fetch",
+    "fetch_many_to_markdown",
     "fetch_to_markdown",
     "file_to_markdown",
     "html_to_markdown",
+    "observe",
+    "BatchSummary",
+    "ConversionResult",
+    "ConversionServer",
+    "CrawlFrontier",
+    "DuplicateIndex",
+    "HostScheduler",
+    "Manifest",
+    "ManifestEntry",
+    "MetricsObserver",
+    "ResultCache",
+    "RetryPolicy",
+    "RobotsCache",
+    "StageMetrics",
     "Extract2MarkdownContentTypeError",
     "Extract2MarkdownConverterError",
     "Extract2MarkdownError",
@@ -0,0 +1,268 @@
+"""Convert directories of saved HTML files across worker processes."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import ExitStack
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+
+from extract2md._files import read_mapped, write_atomic
+from extract2md._links import REWRITE_HTML
+from extract2md._manifest import Manifest, content_hash, conversion_version
+from extract2md._metrics import STAGE_READ, StageMetrics, observe, timed
+from extract2md.converters import DEFAULT_CONVERTER, get_converter
+from extract2md.core import html_to_markdown
+from extract2md.models import BatchSummary, ConversionResult, Extract2MarkdownError
+
+HTML_SUFFIXES: tuple[str, ...] = (".html", ".htm", ".xhtml")
+DEFAULT_CHUNK_SIZE = 32
+
+_WARM_UP_HTML = "<html><head><title>warm-up</title></head><body><p>warm-up</p></body></html>"
+
+
+@dataclass(frozen=True)
+class BatchOptions:
+    """Conversion settings shipped once to every worker process."""
+
+    converter: str = DEFAULT_CONVERTER
+    encoding: str | None = None
+    rewrite_relative_urls: bool = True
+    rewrite_mode: str = REWRITE_HTML
+    collect_stats: bool = False
+    hash_content: bool = False
+
+
+@dataclass(frozen=True)
+class _FileTask:
+    """One file to convert, with its manifest stamp and last known content hash."""
+
+    source: str
+    target: str
+    stamp: str | None = None
+    content_hash: str | None = None
+
+
+@dataclass(frozen=True)
+class _FileResult:
+    task: _FileTask
+    error: Exception | None = None
+    content_hash: str | None = None
+    unchanged: bool = False
+
+
+_ChunkResult = tuple[list[_FileResult], dict | None]
+
+
+def iter_html_files(src: Path) -> Iterator[Path]:
+    """Yield the HTML files below ``src`` in a stable order."""
+    for directory, dirnames, filenames in os.walk(src):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(HTML_SUFFIXES):
+                yield Path(directory, filename)
+
+
+def output_path_for(source: Path, src: Path, dst: Path) -> Path:
+    """Return where the Markdown for ``source`` is written below ``dst``."""
+    return (dst / source.relative_to(src)).with_suffix(".md")
+
+
+def convert_directory(
+        src: Path | str,
+        dst: Path | str,
+        *,
+        workers: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        converter: str | None = None,
+        encoding: str | None = None,
+        rewrite_relative_urls: bool = True,
+        rewrite_mode: str = REWRITE_HTML,
+        collect_stats: bool = False,
+        manifest: Manifest | None = None,
+) -> BatchSummary:
+    """Convert every HTML file below ``src`` into a mirrored ``.md`` file below ``dst``.
+
+    Files are handed to ``workers`` processes (default: one per CPU) in chunks of
+    ``chunk_size`` paths, and only a few chunks per worker are queued at a time,
+    so even very large trees are walked lazily. Each worker loads the converter
+    once before its first chunk. Output files are replaced atomically. With
+    ``collect_stats`` the workers time each pipeline stage and the merged totals
+    are returned in ``BatchSummary.stats``.
+
+    With ``manifest``, files whose size and modification time are unchanged
+    since the recorded conversion are not read at all, and files whose content
+    hashes the same are not converted again; both count as ``skipped``.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    src_path = Path(src)
+    dst_path = Path(dst)
+    if not src_path.is_dir():
+        raise NotADirectoryError(f"Source directory {src_path} does not exist")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    worker_count = workers or os.cpu_count() or 1
+    options = BatchOptions(
+        converter=converter or DEFAULT_CONVERTER,
+        encoding=encoding,
+        rewrite_relative_urls=rewrite_relative_urls,
+        rewrite_mode=rewrite_mode,
+        collect_stats=collect_stats,
+        hash_content=manifest is not None,
+    )
+    get_converter(options.converter)  # fail fast on unknown names
+    summary = BatchSummary()
+    stats = StageMetrics() if collect_stats else None
+    version = conversion_version(
+        options.converter,
+        rewrite_relative_urls=rewrite_relative_urls,
+        rewrite_mode=rewrite_mode,
+    )
+    tasks = _tasks(src_path, dst_path, manifest, version, summary)
+    max_pending = worker_count * 2
+
+    with ProcessPoolExecutor(
+            max_workers=worker_count,
+            initializer=_init_worker,
+            initargs=(options,),
+    ) as executor:
+        pending: set[Future[_ChunkResult]] = set()
+        for chunk in _chunked(tasks, chunk_size):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _collect(done, summary, stats, manifest, version)
+            pending.add(executor.submit(_convert_chunk, chunk))
+        _collect(pending, summary, stats, manifest, version)
+    if stats is not None:
+        summary.stats = stats.as_dict()
+    return summary
+
+
+def _tasks(
+        src: Path,
+        dst: Path,
+        manifest: Manifest | None,
+        version: str,
+        summary: BatchSummary,
+) -> Iterator[_FileTask]:
+    """Yield the files to convert, skipping those the manifest shows unchanged."""
+    for path in iter_html_files(src):
+        target = output_path_for(path, src, dst)
+        if manifest is None:
+            yield _FileTask(str(path), str(target))
+            continue
+        stat = path.stat()
+        stamp = f"{stat.st_size}-{stat.st_mtime_ns}"
+        previous = manifest.get(str(path.resolve()))
+        known_hash = None
+        if previous is not None and previous.is_current(version, target.resolve()):
+            if previous.file_stamp == stamp:
+                summary.skipped += 1
+                continue
+            known_hash = previous.content_hash
+        yield _FileTask(str(path), str(target), stamp=stamp, content_hash=known_hash)
+
+
+def _chunked(items: Iterable[_FileTask], size: int) -> Iterator[list[_FileTask]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _collect(
+        futures: Iterable[Future[_ChunkResult]],
+        summary: BatchSummary,
+        stats: StageMetrics | None,
+        manifest: Manifest | None,
+        version: str,
+) -> None:
+    for future in futures:
+        results, chunk_stats = future.result()
+        if stats is not None and chunk_stats is not None:
+            stats.merge(chunk_stats)
+        for result in results:
+            task = result.task
+            if result.error is not None:
+                summary.failures.append(ConversionResult(url=task.source, error=result.error))
+                continue
+            if result.unchanged:
+                summary.skipped += 1
+            else:
+                summary.converted += 1
+            if manifest is not None:
+                manifest.record(
+                    str(Path(task.source).resolve()),
+                    etag=None,
+                    last_modified=None,
+                    content_hash=result.content_hash,
+                    converter_version=version,
+                    output_path=Path(task.target).resolve(),
+                    file_stamp=task.stamp,
+                )
+
+
+_worker_options: BatchOptions | None = None
+
+
+def _init_worker(options: BatchOptions) -> None:
+    """Import and exercise the converter once so chunks do not pay for it."""
+    global _worker_options
+    _worker_options = options
+    try:
+        get_converter(options.converter).convert(_WARM_UP_HTML)
+    except Extract2MarkdownError:
+        pass
+
+
+def _convert_chunk(chunk: list[_FileTask]) -> _ChunkResult:
+    options = _worker_options or BatchOptions()
+    if not options.collect_stats:
+        return _convert_files(chunk, options), None
+    with observe(StageMetrics()) as stats:
+        results = _convert_files(chunk, options)
+    return results, stats.as_dict()
+
+
+def _convert_files(chunk: list[_FileTask], options: BatchOptions) -> list[_FileResult]:
+    results: list[_FileResult] = []
+    for task in chunk:
+        try:
+            results.append(_convert_file(task, options))
+        except (Extract2MarkdownError, ValueError, OSError) as exc:
+            results.append(_FileResult(task, error=exc))
+    return results
+
+
+def _convert_file(task: _FileTask, options: BatchOptions) -> _FileResult:
+    """Convert one file as ``file_to_markdown`` does, unless its content hash is unchanged."""
+    source = Path(task.source)
+    with ExitStack() as files:
+        with timed(STAGE_READ):
+            html = files.enter_context(read_mapped(source))
+        digest = content_hash(html) if options.hash_content else None
+        if digest is not None and digest == task.content_hash:
+            return _FileResult(task, content_hash=digest, unchanged=True)
+        markdown = html_to_markdown(
+            html,
+            charset=options.encoding,
+            base_url=source.resolve().as_uri(),
+            rewrite_relative_urls=options.rewrite_relative_urls,
+            rewrite_mode=options.rewrite_mode,
+            converter=options.converter,
+        )
+    write_atomic(Path(task.target), markdown)
+    return _FileResult(task, content_hash=digest)
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "HTML_SUFFIXES",
+    "convert_directory",
+    "iter_html_files",
+    "output_path_for",
+]
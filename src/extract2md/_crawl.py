@@ -0,0 +1,455 @@
+"""Crawl sites breadth-first, converting every page on the way."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from concurrent.futures import Executor
+from contextlib import aclosing
+from dataclasses import replace
+from datetime import datetime
+from hashlib import sha256
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING
+from urllib.parse import unquote, urldefrag, urljoin, urlsplit
+
+from extract2md._dedup import canonical_url
+from extract2md._fetch import create_client
+from extract2md._files import write_atomic
+from extract2md._http_cache import http_cache_for
+from extract2md._links import REWRITE_HTML
+from extract2md._manifest import conversion_version
+from extract2md._scheduler import host_key, run_fair
+from extract2md._sitemap import aiter_sitemap_urls
+from extract2md.core import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_USER_AGENT,
+    _convert_one,
+    _iterate_sync,
+)
+from extract2md.models import ConversionResult, Extract2MarkdownFetchError
+
+if TYPE_CHECKING:
+    from httpx import AsyncClient
+
+    from extract2md._dedup import DuplicateIndex
+    from extract2md._manifest import Manifest
+    from extract2md._result_cache import ResultCache
+    from extract2md._retry import RetryPolicy
+    from extract2md._robots import RobotsCache
+    from extract2md._scheduler import HostScheduler
+
+DEFAULT_MAX_PAGES = 100
+
+_CRAWL_SCHEMES = frozenset({"http", "https"})
+
+
+class CrawlFrontier:
+    """Deduplicated breadth-first queue of the URLs a crawl still has to fetch.
+
+    At most ``max_pages`` URLs are ever admitted (``None`` lifts the limit),
+    which bounds both the queue and the set of known URLs. Links more than
+    ``max_depth`` hops away from a start URL are dropped, and so are links to
+    other hosts with ``same_host``. With ``key``, URLs with the same key
+    (e.g. the same ``canonical_url``) count as one, and the first one queued
+    is the one fetched.
+    Iterating pops queued URLs; an empty frontier may be refilled later.
+    """
+
+    def __init__(
+            self,
+            start_urls: Iterable[str],
+            *,
+            max_pages: int | None = DEFAULT_MAX_PAGES,
+            max_depth: int | None = None,
+            same_host: bool = False,
+            key: Callable[[str], str] | None = None,
+    ) -> None:
+        _check_max_pages(max_pages)
+        if max_depth is not None and max_depth < 0:
+            raise ValueError("max_depth must not be negative")
+        start_urls = [_normalize(url) for url in start_urls]
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self._key = key
+        self._hosts = frozenset(host_key(url) for url in start_urls) if same_host else None
+        self._queue: deque[str] = deque()
+        self._depths: dict[str, int] = {}
+        self._aliases: set[str] = set()
+        for url in start_urls:
+            self.add(url, depth=0)
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        if not self._queue:
+            raise StopIteration
+        return self._queue.popleft()
+
+    def __len__(self) -> int:
+        """Return the number of URLs waiting to be fetched."""
+        return len(self._queue)
+
+    @property
+    def admitted(self) -> int:
+        """Return the number of URLs accepted so far, fetched or queued."""
+        return len(self._depths)
+
+    def depth(self, url: str) -> int:
+        """Return how many links away from a start URL ``url`` was found."""
+        return self._depths[self._known_as(url)]
+
+    def expands(self, url: str) -> bool:
+        """Return True when the links of ``url`` may still be followed."""
+        return self.max_depth is None or self.depth(url) < self.max_depth
+
+    def add(self, url: str, *, depth: int) -> bool:
+        """Queue ``url`` unless it is known, out of scope or over a limit."""
+        url = _normalize(url)
+        known_as = self._known_as(url)
+        if (
+            (self.max_pages is not None and len(self._depths) >= self.max_pages)
+            or (self.max_depth is not None and depth > self.max_depth)
+            or known_as in self._depths
+            or known_as in self._aliases
+            or urlsplit(url).scheme not in _CRAWL_SCHEMES
+            or (self._hosts is not None and host_key(url) not in self._hosts)
+        ):
+            return False
+        self._depths[known_as] = depth
+        self._queue.append(url)
+        return True
+
+    def mark_seen(self, url: str) -> None:
+        """Remember ``url`` (e.g. a redirect target) as fetched without queueing it."""
+        known_as = self._known_as(url)
+        if known_as not in self._depths:
+            self._aliases.add(known_as)
+
+    def _known_as(self, url: str) -> str:
+        url = _normalize(url)
+        return self._key(url) if self._key is not None else url
+
+
+def _check_max_pages(max_pages: int | None) -> None:
+    if max_pages is not None and max_pages < 1:
+        raise ValueError("max_pages must be at least 1")
+
+
+def _normalize(url: str) -> str:
+    """Return ``url`` without its fragment and with an explicit root path."""
+    url = urldefrag(url)[0]
+    parts = urlsplit(url)
+    if parts.netloc and not parts.path:
+        url = parts._replace(path="/").geturl()
+    return url
+
+
+def output_path_for(url: str, root: Path | str) -> Path:
+    """Return where below ``root`` the Markdown of ``url`` is written.
+
+    The layout mirrors the site: ``<host>/<path>.md``, with ``index.md`` for
+    directory URLs and a short hash of the query string when there is one.
+    """
+    parts = urlsplit(url)
+    segments = [
+        segment for segment in PurePosixPath(unquote(parts.path)).parts
+        if segment not in ("/", ".", "..")
+    ]
+    if not segments or parts.path.endswith("/"):
+        segments.append("index")
+    stem = segments[-1]
+    for suffix in (".html", ".htm", ".xhtml", ".php", ".asp", ".aspx"):
+        if stem.lower().endswith(suffix) and len(stem) > len(suffix):
+            stem = stem[: -len(suffix)]
+            break
+    if parts.query:
+        stem = f"{stem}_{sha256(parts.query.encode('utf-8')).hexdigest()[:8]}"
+    segments[-1] = f"{stem}.md"
+    return Path(root, (parts.hostname or "unknown").lower(), *segments)
+
+
+async def acrawl(
+        start_urls: str | Iterable[str],
+        *,
+        max_pages: int | None = DEFAULT_MAX_PAGES,
+        max_depth: int | None = None,
+        same_host: bool = False,
+        sitemap: bool = False,
+        since: datetime | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        user_agent: str | None = None,
+        ignore_robots_txt: bool = False,
+        proxy_url: str | None = None,
+        timeout: float = 30.0,
+        robots_cache: RobotsCache | None = None,
+        max_bytes: int | None = None,
+        cache_dir: Path | str | None = None,
+        rewrite_relative_urls: bool = True,
+        rewrite_mode: str = REWRITE_HTML,
+        converter: str | None = None,
+        result_cache: ResultCache | None = None,
+        scheduler: HostScheduler | None = None,
+        retry: RetryPolicy | None = None,
+        executor: Executor | None = None,
+        output_dir: Path | str | None = None,
+        manifest: Manifest | None = None,
+        dedup: DuplicateIndex | None = None,
+) -> AsyncIterator[ConversionResult]:
+    """Crawl breadth-first from ``start_urls``, yielding every page as it is converted.
+
+    Each page is downloaded once: the links found while its links are rewritten
+    for conversion feed a ``CrawlFrontier`` bounded by ``max_pages``,
+    ``max_depth`` and ``same_host``. Fetching runs on one pooled client as in
+    ``afetch_many_to_markdown``; failed pages are yielded with their error.
+
+    With ``sitemap``, links are not followed. The pages listed in the sitemaps
+    of each start URL's site (see ``aiter_sitemap_urls``) are converted
+    instead, skipping those whose ``lastmod`` is not newer than ``since``.
+    A sitemap that cannot be read is yielded as a failed result for its URL.
+
+    With ``output_dir`` every converted page is written to its
+    ``output_path_for`` file there. With ``manifest`` each page is recorded
+    once converted, and later crawls send its validators along: pages the
+    server reports as not modified, or whose HTML hashes the same, are yielded
+    ``unchanged`` instead of being converted and written again.
+
+    With ``dedup``, URLs with the same ``canonical_url`` (e.g. differing only
+    in tracking parameters) are fetched until one succeeds, and pages nearly duplicating a
+    page in the index are yielded with ``duplicate_of`` instead of converted.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    start_urls = [start_urls] if isinstance(start_urls, str) else list(start_urls)
+    frontier = CrawlFrontier(
+        [] if sitemap else start_urls,
+        max_pages=max_pages,
+        max_depth=max_depth,
+        same_host=same_host,
+        key=canonical_url if dedup is not None else None,
+    )
+    resolved_user_agent = user_agent or DEFAULT_USER_AGENT
+    http_cache = http_cache_for(cache_dir)
+    version = conversion_version(
+        converter,
+        rewrite_relative_urls=rewrite_relative_urls,
+        rewrite_mode=rewrite_mode,
+    )
+
+    async with create_client(
+        proxy_url=proxy_url,
+        timeout=timeout,
+        max_connections=concurrency,
+    ) as client:
+
+        claimed: dict[str, str] = {}
+        fetching: dict[str, asyncio.Event] = {}
+
+        async def convert(url: str) -> ConversionResult:
+            if dedup is None:
+                return await fetch_and_convert(url)
+            key = canonical_url(url)
+            while key not in claimed and key in fetching:
+                # Another spelling of this URL is in flight; only its success claims it.
+                await fetching[key].wait()
+            if key in claimed:
+                return ConversionResult(url=url, duplicate_of=claimed[key])
+            fetching[key] = asyncio.Event()
+            try:
+                result = await fetch_and_convert(url)
+            finally:
+                fetching.pop(key).set()
+            if result.error is None:
+                claimed[key] = url
+            return result
+
+        async def fetch_and_convert(url: str) -> ConversionResult:
+            collect_links = not sitemap and frontier.expands(url)
+            target = output_path_for(url, output_dir) if output_dir is not None else None
+            previous = manifest.get(url) if manifest is not None else None
+            if previous is not None and (
+                not previous.is_current(version, target)
+                or (collect_links and previous.links is None)
+            ):
+                previous = None
+            result = await _convert_one(
+                client,
+                url,
+                user_agent=resolved_user_agent,
+                ignore_robots_txt=ignore_robots_txt,
+                proxy_url=proxy_url,
+                timeout=timeout,
+                robots_cache=robots_cache,
+                max_bytes=max_bytes,
+                http_cache=http_cache,
+                rewrite_relative_urls=rewrite_relative_urls,
+                rewrite_mode=rewrite_mode,
+                converter=converter,
+                result_cache=result_cache,
+                scheduler=scheduler,
+                retry=retry,
+                executor=executor,
+                collect_links=collect_links,
+                previous=previous,
+                hash_content=manifest is not None,
+                dedup=dedup,
+            )
+            if not result.ok or result.duplicate_of is not None:
+                return result
+            if target is not None and not result.unchanged:
+                try:
+                    write_atomic(target, result.markdown)
+                except OSError as exc:
+                    return replace(result, markdown=None, error=exc)
+            if manifest is not None:
+                manifest.record(
+                    url,
+                    etag=result.etag,
+                    last_modified=result.last_modified,
+                    content_hash=result.content_hash,
+                    converter_version=version,
+                    output_path=target,
+                    links=result.links if collect_links else None,
+                )
+            return result
+
+        failed_sitemaps: deque[ConversionResult] = deque()
+        if sitemap:
+            urls = _sitemap_urls(
+                client,
+                start_urls,
+                user_agent=resolved_user_agent,
+                robots_cache=robots_cache,
+                since=since,
+                max_pages=max_pages,
+                same_host=same_host,
+                on_error=lambda sitemap_url, exc: failed_sitemaps.append(
+                    ConversionResult(url=sitemap_url, error=exc, status_code=exc.status_code)
+                ),
+            )
+        else:
+            urls = frontier
+        results = run_fair(
+            urls,
+            convert,
+            concurrency=concurrency,
+            max_per_host=scheduler.max_per_host if scheduler else None,
+            refill=not sitemap,
+        )
+        async with aclosing(results):
+            async for result in results:
+                while failed_sitemaps:
+                    yield failed_sitemaps.popleft()
+                if not sitemap:
+                    page_url = result.final_url or result.url
+                    frontier.mark_seen(page_url)
+                    depth = frontier.depth(result.url) + 1
+                    for link in result.links:
+                        frontier.add(urljoin(page_url, link), depth=depth)
+                yield result
+        while failed_sitemaps:
+            yield failed_sitemaps.popleft()
+
+
+async def _sitemap_urls(
+        client: AsyncClient,
+        start_urls: list[str],
+        *,
+        user_agent: str,
+        robots_cache: RobotsCache | None,
+        since: datetime | None,
+        max_pages: int | None,
+        same_host: bool,
+        on_error: Callable[[str, Extract2MarkdownFetchError], None],
+) -> AsyncIterator[str]:
+    """Yield up to ``max_pages`` URLs from the sitemaps of ``start_urls``."""
+    hosts = frozenset(host_key(url) for url in start_urls) if same_host else None
+    remaining = max_pages
+    for start_url in start_urls:
+        async for url in aiter_sitemap_urls(
+            client,
+            start_url,
+            user_agent=user_agent,
+            robots_cache=robots_cache,
+            since=since,
+            on_error=on_error,
+        ):
+            if urlsplit(url).scheme not in _CRAWL_SCHEMES:
+                continue
+            if hosts is not None and host_key(url) not in hosts:
+                continue
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                remaining -= 1
+            yield url
+
+
+def crawl(
+        start_urls: str | Iterable[str],
+        *,
+        max_pages: int | None = DEFAULT_MAX_PAGES,
+        max_depth: int | None = None,
+        same_host: bool = False,
+        sitemap: bool = False,
+        since: datetime | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        user_agent: str | None = None,
+        ignore_robots_txt: bool = False,
+        proxy_url: str | None = None,
+        timeout: float = 30.0,
+        robots_cache: RobotsCache | None = None,
+        max_bytes: int | None = None,
+        cache_dir: Path | str | None = None,
+        rewrite_relative_urls: bool = True,
+        rewrite_mode: str = REWRITE_HTML,
+        converter: str | None = None,
+        result_cache: ResultCache | None = None,
+        scheduler: HostScheduler | None = None,
+        retry: RetryPolicy | None = None,
+        executor: Executor | None = None,
+        output_dir: Path | str | None = None,
+        manifest: Manifest | None = None,
+        dedup: DuplicateIndex | None = None,
+) -> Iterator[ConversionResult]:
+    """Synchronous variant of ``acrawl``."""
+
+    return _iterate_sync(
+        acrawl(
+            start_urls,
+            max_pages=max_pages,
+            max_depth=max_depth,
+            same_host=same_host,
+            sitemap=sitemap,
+            since=since,
+            concurrency=concurrency,
+            user_agent=user_agent,
+            ignore_robots_txt=ignore_robots_txt,
+            proxy_url=proxy_url,
+            timeout=timeout,
+            robots_cache=robots_cache,
+            max_bytes=max_bytes,
+            cache_dir=cache_dir,
+            rewrite_relative_urls=rewrite_relative_urls,
+            rewrite_mode=rewrite_mode,
+            converter=converter,
+            result_cache=result_cache,
+            scheduler=scheduler,
+            retry=retry,
+            executor=executor,
+            output_dir=output_dir,
+            manifest=manifest,
+            dedup=dedup,
+        )
+    )
+
+
+__all__ = [
+    "DEFAULT_MAX_PAGES",
+    "CrawlFrontier",
+    "acrawl",
+    "crawl",
+    "output_path_for",
+]
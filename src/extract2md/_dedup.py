@@ -0,0 +1,231 @@
+"""Near-duplicate detection with URL normalization and SimHash fingerprints."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from urllib.parse import SplitResult, urlsplit, urlunsplit
+
+from extract2md._sniff import decode_html
+
+DEFAULT_MAX_DISTANCE = 3
+
+# Query parameters that only identify a campaign or click, never the content.
+TRACKING_PARAMS = frozenset({
+    "_ga", "_gl", "_hsenc", "_hsmi", "dclid", "fbclid", "gbraid", "gclid", "gclsrc",
+    "igshid", "mc_cid", "mc_eid", "mkt_tok", "msclkid", "oly_anon_id", "oly_enc_id",
+    "rb_clickid", "ref_src", "s_cid", "twclid", "vero_id", "wbraid", "yclid",
+})
+TRACKING_PREFIXES: tuple[str, ...] = ("utm_", "pk_", "mtm_")
+
+_BITS = 64
+_BANDS = 4
+_BAND_BITS = _BITS // _BANDS
+_SHINGLE_WORDS = 3
+# Pages with fewer distinct shingles are too short to fingerprint reliably.
+MIN_SHINGLES = 16
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_BOILERPLATE = re.compile(
+    r"<(script|style|noscript|template|nav|header|footer|aside)\b.*?</\1\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_TAG = re.compile(r"<[^>]*>")
+_WORD = re.compile(r"\w+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    url TEXT PRIMARY KEY,
+    simhash INTEGER NOT NULL,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL
+)
+"""
+_INDEXES = tuple(
+    f"CREATE INDEX IF NOT EXISTS fingerprints_band{band} ON fingerprints (band{band})"
+    for band in range(_BANDS)
+)
+
+
+def canonical_url(url: str) -> str:
+    """Return ``url`` normalized so that trivially different spellings compare equal.
+
+    The scheme and host are lowercased, default ports, the fragment and
+    tracking parameters (``utm_*``, ``fbclid``, ...) are removed, the remaining
+    query parameters are sorted, and an empty path becomes ``/``. The result
+    is a key to compare URLs by, not necessarily a URL to fetch.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    query = sorted(
+        parameter
+        for parameter in parts.query.split("&")
+        if parameter and not _is_tracking(parameter.partition("=")[0].lower())
+    )
+    return urlunsplit((scheme, _canonical_netloc(parts, scheme), parts.path or "/", "&".join(query), ""))
+
+
+def simhash(words: list[str]) -> int | None:
+    """Return the 64-bit SimHash of the word shingles of ``words``.
+
+    Returns ``None`` when there are fewer than ``MIN_SHINGLES`` distinct shingles.
+    """
+    shingles = {" ".join(shingle) for shingle in zip(*(words[start:] for start in range(_SHINGLE_WORDS)))}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    packed = b"".join(
+        hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles
+    )
+    # Count every bit position over all shingle hashes at once: masking the packed
+    # hashes with one bit per 64-bit word and counting the set bits is done in C.
+    hashes = int.from_bytes(packed, "little")
+    column = int.from_bytes((1).to_bytes(8, "little") * len(shingles), "little")
+    majority = len(shingles) / 2
+    fingerprint = 0
+    for bit in range(_BITS):
+        if ((hashes >> bit) & column).bit_count() > majority:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def html_fingerprint(html: str | bytes, charset: str | None = None) -> int | None:
+    """Return the SimHash of the visible text of ``html``, ignoring navigation and scripts.
+
+    The markup is stripped with regular expressions rather than parsed, so the
+    fingerprint costs a fraction of a conversion.
+    """
+    if not isinstance(html, str):
+        html = decode_html(html, charset)
+    text = _TAG.sub(" ", _BOILERPLATE.sub(" ", html))
+    return simhash(_WORD.findall(text.lower()))
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """Return the number of bits in which two fingerprints differ."""
+    return (first ^ second).bit_count()
+
+
+class DuplicateIndex:
+    """SQLite index of page fingerprints that finds near-duplicates by Hamming distance.
+
+    Every fingerprint is split into four 16-bit bands stored in indexed columns.
+    Two fingerprints at most three bits apart share at least one band, so only
+    the pages sharing a band are compared. Each page takes a single row, and
+    with ``path`` the index persists across runs; without one it lives in memory.
+    """
+
+    def __init__(
+            self,
+            path: Path | str | None = None,
+            *,
+            max_distance: int = DEFAULT_MAX_DISTANCE,
+    ) -> None:
+        if not 0 <= max_distance < _BANDS:
+            raise ValueError(f"max_distance must be between 0 and {_BANDS - 1}")
+        self.path = Path(path).expanduser() if path else None
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+
+    def check(self, url: str, fingerprint: int) -> str | None:
+        """Return the URL of an indexed near-duplicate of ``url``, else index ``url``.
+
+        URLs are compared by ``canonical_url``; the entry of ``url`` itself, e.g.
+        from an earlier run, is replaced rather than reported.
+        """
+        key = canonical_url(url)
+        bands = _bands(fingerprint)
+        with self._lock:
+            connection = self._connect()
+            rows = connection.execute(
+                "SELECT url, simhash FROM fingerprints"
+                " WHERE band0 = ? OR band1 = ? OR band2 = ? OR band3 = ?",
+                bands,
+            ).fetchall()
+            for other_url, other in rows:
+                if other_url != key and hamming_distance(fingerprint, _unsigned(other)) <= self.max_distance:
+                    return other_url
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO fingerprints"
+                    " (url, simhash, band0, band1, band2, band3) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, _signed(fingerprint), *bands),
+                )
+        return None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the SQLite connection if one is open."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path is None:
+                connection = sqlite3.connect(":memory:", check_same_thread=False)
+            else:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                connection = sqlite3.connect(self.path, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(_SCHEMA)
+            for statement in _INDEXES:
+                connection.execute(statement)
+            self._connection = connection
+        return self._connection
+
+
+def _canonical_netloc(parts: SplitResult, scheme: str) -> str:
+    try:
+        port = parts.port
+    except ValueError:
+        # Leave hosts with an unparsable port alone; fetching them fails anyway.
+        return parts.netloc
+    netloc = (parts.hostname or "").lower()
+    if ":" in netloc:
+        netloc = f"[{netloc}]"
+    if port is not None and port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+    if parts.username or parts.password:
+        netloc = f"{parts.netloc.rpartition('@')[0]}@{netloc}"
+    return netloc
+
+
+def _is_tracking(name: str) -> bool:
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _bands(fingerprint: int) -> tuple[int, ...]:
+    mask = (1 << _BAND_BITS) - 1
+    return tuple((fingerprint >> (band * _BAND_BITS)) & mask for band in range(_BANDS))
+
+
+def _signed(value: int) -> int:
+    """Map an unsigned 64-bit fingerprint onto SQLite's signed INTEGER range."""
+    return value - (1 << _BITS) if value >= 1 << (_BITS - 1) else value
+
+
+def _unsigned(value: int) -> int:
+    return value + (1 << _BITS) if value < 0 else value
+
+
+__all__ = [
+    "DEFAULT_MAX_DISTANCE",
+    "MIN_SHINGLES",
+    "TRACKING_PARAMS",
+    "TRACKING_PREFIXES",
+    "DuplicateIndex",
+    "canonical_url",
+    "hamming_distance",
+    "html_fingerprint",
+    "simhash",
+]
@@ -3,90 +3,323 @@
 from __future__ import annotations
 
 import asyncio
-from urllib.parse import urlparse, urlunparse
+import importlib.util
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from extract2md.models import Extract2MarkdownFetchError
-from protego import Protego
+from extract2md._http_cache import CacheEntry, HttpCache, http_cache_for
+from extract2md._metrics import (
+    SIZE_DOWNLOAD,
+    STAGE_CONNECT,
+    STAGE_DECODE,
+    STAGE_DOWNLOAD,
+    STAGE_ROBOTS,
+    is_observed,
+    record_size,
+    record_timing,
+    timed,
+)
+from extract2md._retry import RetryPolicy
+from extract2md._robots import DEFAULT_ROBOTS_CACHE, RobotsCache, RobotsRules
+from extract2md._scheduler import HostScheduler
+from extract2md._sniff import (
+    SNIFF_BYTES,
+    decode_html,
+    is_html_content_type,
+    sniff_prefix,
+)
+from extract2md.models import (
+    Extract2MarkdownContentTypeError,
+    Extract2MarkdownFetchError,
+    Extract2MarkdownToMarkdownError,
+)
+
+if TYPE_CHECKING:
+    from httpx import AsyncClient
 
 DEFAULT_USER_AGENT = (
     "extract2md/0.1 (+https://github.com/Wuodan/extract2md)"
 )
+DEFAULT_MAX_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 30.0
 
+# httpcore trace events bracketing the TCP connect and the TLS handshake.
+_CONNECT_STARTED = frozenset({"connection.connect_tcp.started", "connection.start_tls.started"})
+_CONNECT_COMPLETE = frozenset({"connection.connect_tcp.complete", "connection.start_tls.complete"})
+_connect_started: ContextVar[float | None] = ContextVar("extract2md_connect_started", default=None)
 
-def _get_robots_txt_url(url: str) -> str:
-    """Return the robots.txt URL for the host extracted from ``url``."""
-    parsed = urlparse(url)
-    return urlunparse((parsed.scheme, parsed.netloc, "/robots.txt", "", "", ""))
 
+@dataclass(frozen=True)
+class FetchResponse:
+    """Result of a successful page fetch.
 
-async def _check_may_fetch_url(
-        url: str,
-        user_agent: str,
+    ``body`` holds the undecoded bytes and ``charset`` the encoding declared by
+    a BOM, the header or a ``<meta>`` tag, if any; ``content`` decodes the body
+    on first access. ``etag`` and ``last_modified`` hold the response validators.
+    ``not_modified`` is set, with an empty ``body``, when the server answered
+    the caller's validators with ``304``. ``from_cache`` is set when it answered
+    the HTTP cache's validators so: ``body`` and ``status_code`` are then those
+    of the cached response.
+    """
+
+    url: str
+    final_url: str
+    status_code: int
+    body: bytes
+    content_type: str
+    charset: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False
+    from_cache: bool = False
+
+    @cached_property
+    def content(self) -> str:
+        """The body decoded with ``charset`` (UTF-8, else windows-1252, without one)."""
+        with timed(STAGE_DECODE):
+            return decode_html(self.body, self.charset)
+
+
+def _http2_available() -> bool:
+    """Return True when the optional ``h2`` package is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_client(
+        *,
         proxy_url: str | None = None,
-) -> None:
-    """Validate robots.txt rules for the provided URL."""
-    from httpx import AsyncClient, HTTPError
+        timeout: float = 30.0,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        http2: bool | None = None,
+) -> AsyncClient:
+    """Return a pooled ``httpx.AsyncClient`` that can be shared across fetches.
 
-    robot_txt_url = _get_robots_txt_url(url)
+    Connections are kept alive between requests so robots.txt and page fetches
+    against the same host reuse one TCP/TLS session. HTTP/2 is enabled when the
+    ``h2`` package is available unless ``http2`` is set explicitly.
+    """
+    from httpx import AsyncClient, Limits
 
-    async with AsyncClient(proxy=proxy_url) as client:
-        try:
-            response = await client.get(
-                robot_txt_url,
-                follow_redirects=True,
-                headers={"User-Agent": user_agent},
-            )
-        except HTTPError as exc:  # pragma: no cover - depends on network
-            raise Extract2MarkdownFetchError(
-                f"Failed to fetch robots.txt {robot_txt_url}: {exc}"
-            ) from exc
-        if response.status_code in (401, 403):
-            raise Extract2MarkdownFetchError(
-                "robots.txt forbids autonomous fetching for this user agent",
-            )
-        elif 400 <= response.status_code < 500:
-            return
-        robot_txt = response.text
-    processed_robot_txt = "\n".join(
-        line for line in robot_txt.splitlines() if not line.strip().startswith("#")
+    return AsyncClient(
+        proxy=proxy_url,
+        timeout=timeout,
+        http2=_http2_available() if http2 is None else http2,
+        limits=Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
     )
-    robot_parser = Protego.parse(processed_robot_txt)
-    if not robot_parser.can_fetch(str(url), user_agent):
-        raise Extract2MarkdownFetchError(
-            "robots.txt disallows fetching this page for the configured user-agent"
-        )
+
+
+async def _check_may_fetch_url(
+        client: AsyncClient,
+        url: str,
+        user_agent: str,
+        *,
+        robots_cache: RobotsCache | None = None,
+) -> RobotsRules:
+    """Validate robots.txt rules for the provided URL and return them."""
+    cache = robots_cache or DEFAULT_ROBOTS_CACHE
+    rules = await cache.rules_for(client, url, user_agent)
+    rules.check(url, user_agent)
+    return rules
 
 
 async def _fetch_url(
+        client: AsyncClient,
         url: str,
         user_agent: str,
         *,
-        proxy_url: str | None = None,
         timeout: float = 30.0,
-) -> tuple[str, str]:
-    """Perform the HTTP GET request and return response body and content-type."""
-    from httpx import AsyncClient, HTTPError
+        max_bytes: int | None = None,
+        require_html: bool = False,
+        http_cache: HttpCache | None = None,
+        validators: dict[str, str] | None = None,
+) -> FetchResponse:
+    """Stream the HTTP GET response and return the response details.
 
-    async with AsyncClient(proxy=proxy_url) as client:
-        try:
-            response = await client.get(
-                url,
-                follow_redirects=True,
-                headers={"User-Agent": user_agent},
-                timeout=timeout,
-            )
-        except HTTPError as exc:  # pragma: no cover - depends on network
-            raise Extract2MarkdownFetchError(f"Failed to fetch {url}: {exc!r}") from exc
-        if response.status_code >= 400:
-            raise Extract2MarkdownFetchError(
-                f"Failed to fetch {url} - status code {response.status_code}",
-            )
+    The body is read incrementally and the download is aborted once it grows
+    beyond ``max_bytes``. The first ``SNIFF_BYTES`` are inspected to detect the
+    charset (BOM, header, then ``<meta>``) used to decode the whole body. With
+    ``require_html`` the response is rejected from its headers, before any of
+    the body is downloaded, unless it declares HTML, and again after the first
+    bytes unless they look like an HTML document.
 
-        content = response.text
+    With ``http_cache`` a previously stored response is revalidated with
+    ``If-None-Match``/``If-Modified-Since`` and served from disk on ``304``.
+    Without a cached response, conditional ``validators`` headers are sent
+    instead and a ``304`` gives a ``not_modified`` response without a body.
+    """
+    from httpx import HTTPError, InvalidURL
+
+    cached = http_cache.get(url) if http_cache is not None else None
+    headers = {"User-Agent": user_agent}
+    if cached is not None:
+        headers.update(cached.conditional_headers())
+    elif validators:
+        headers.update(validators)
+
+    observed = is_observed()
+    started = time.perf_counter()
+    try:
+        async with client.stream(
+            "GET",
+            url,
+            follow_redirects=True,
+            headers=headers,
+            timeout=timeout,
+            extensions={"trace": _trace_connect} if observed else None,
+        ) as response:
+            if response.status_code == 304 and cached is not None:
+                return _cached_response(url, cached, require_html=require_html)
+            if response.status_code == 304 and validators:
+                return FetchResponse(
+                    url=url,
+                    final_url=str(response.url),
+                    status_code=304,
+                    body=b"",
+                    content_type=response.headers.get("content-type", ""),
+                    etag=response.headers.get("etag"),
+                    last_modified=response.headers.get("last-modified"),
+                    not_modified=True,
+                )
+            if response.status_code == 304:
+                raise Extract2MarkdownFetchError(
+                    f"Failed to fetch {url} - status code 304 without a cached response",
+                    status_code=304,
+                )
+            if response.status_code >= 400:
+                raise Extract2MarkdownFetchError(
+                    f"Failed to fetch {url} - status code {response.status_code}",
+                    status_code=response.status_code,
+                    retry_after=response.headers.get("retry-after"),
+                )
+            content_type = response.headers.get("content-type", "")
+            if require_html and not is_html_content_type(content_type):
+                raise Extract2MarkdownContentTypeError(
+                    f"Received non-html content type {content_type} from {url}"
+                )
+            _check_size(url, response.headers.get("content-length"), max_bytes)
+
+            body = bytearray()
+            charset: str | None = None
+            sniffed = False
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                _check_size(url, len(body), max_bytes)
+                if not sniffed and len(body) >= SNIFF_BYTES:
+                    charset = _sniff_body(url, body, content_type, require_html)
+                    sniffed = True
+            if not sniffed:
+                charset = _sniff_body(url, body, content_type, require_html)
+    except (HTTPError, InvalidURL) as exc:
+        raise Extract2MarkdownFetchError(f"Failed to fetch {url}: {exc!r}") from exc
+    if observed:
+        record_timing(STAGE_DOWNLOAD, time.perf_counter() - started)
+        record_size(SIZE_DOWNLOAD, len(body))
+
+    if (
+            http_cache is not None
+            and response.status_code == 200
+            and "no-store" not in response.headers.get("cache-control", "").lower()
+    ):
+        http_cache.store(
+            url,
+            final_url=str(response.url),
+            content_type=content_type,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            body=bytes(body),
+            status_code=response.status_code,
+        )
+
+    return FetchResponse(
+        url=url,
+        final_url=str(response.url),
+        status_code=response.status_code,
+        body=bytes(body),
+        content_type=content_type,
+        charset=charset,
+        etag=response.headers.get("etag"),
+        last_modified=response.headers.get("last-modified"),
+    )
 
-    content_type = response.headers.get("content-type", "")
 
-    return content, content_type
+async def _trace_connect(event: str, info: dict[str, Any]) -> None:
+    """httpcore trace hook timing TCP connects and TLS handshakes as ``connect``."""
+    if event in _CONNECT_STARTED:
+        _connect_started.set(time.perf_counter())
+    elif event in _CONNECT_COMPLETE:
+        started = _connect_started.get()
+        if started is not None:
+            record_timing(STAGE_CONNECT, time.perf_counter() - started)
+            _connect_started.set(None)
+
+
+def _cached_response(
+        url: str,
+        cached: CacheEntry,
+        *,
+        require_html: bool,
+) -> FetchResponse:
+    """Build the response for a cache entry the server confirmed with ``304``."""
+    if require_html and not is_html_content_type(cached.content_type):
+        raise Extract2MarkdownContentTypeError(
+            f"Received non-html content type {cached.content_type} from {url}"
+        )
+    try:
+        body = cached.read_body()
+    except OSError as exc:
+        raise Extract2MarkdownFetchError(
+            f"Cached response for {url} is no longer readable: {exc}"
+        ) from exc
+    charset = _sniff_body(url, body, cached.content_type, require_html)
+    return FetchResponse(
+        url=url,
+        final_url=cached.final_url,
+        status_code=cached.status_code,
+        body=body,
+        content_type=cached.content_type,
+        charset=charset,
+        etag=cached.etag,
+        last_modified=cached.last_modified,
+        from_cache=True,
+    )
+
+
+def _sniff_body(
+        url: str,
+        body: bytes | bytearray,
+        content_type: str,
+        require_html: bool,
+) -> str | None:
+    """Return the charset of ``body`` and reject non-HTML bodies when required."""
+    looks_like_html, charset = sniff_prefix(bytes(body[:SNIFF_BYTES]), content_type)
+    if require_html and looks_like_html is False:
+        raise Extract2MarkdownToMarkdownError(
+            f"Not a valid HTML document received from {url}",
+        )
+    return charset
+
+
+def _check_size(url: str, size: int | str | None, max_bytes: int | None) -> None:
+    """Raise when ``size`` (a byte count or Content-Length value) exceeds ``max_bytes``."""
+    if max_bytes is None or size is None:
+        return
+    try:
+        size = int(size)
+    except ValueError:
+        return
+    if size > max_bytes:
+        raise Extract2MarkdownFetchError(
+            f"Response from {url} exceeds the limit of {max_bytes} bytes",
+        )
 
 
 async def _fetch_async(
@@ -96,28 +329,89 @@ async def _fetch_async(
         ignore_robots_txt: bool,
         proxy_url: str | None,
         timeout: float,
-) -> tuple[str, str]:
-    """Wrapper that optionally enforces robots.txt validation before fetching."""
+        client: AsyncClient | None = None,
+        robots_cache: RobotsCache | None = None,
+        max_bytes: int | None = None,
+        require_html: bool = False,
+        http_cache: HttpCache | None = None,
+        scheduler: HostScheduler | None = None,
+        retry: RetryPolicy | None = None,
+        validators: dict[str, str] | None = None,
+) -> FetchResponse:
+    """Wrapper that optionally enforces robots.txt validation before fetching.
+
+    When ``client`` is omitted a short-lived client is created for this fetch.
+    With ``scheduler`` the request waits for a per-host slot, paced by the
+    robots.txt ``Crawl-delay`` for ``user_agent`` when there is one. With
+    ``retry`` transient failures are retried after an asynchronous backoff, so
+    other requests on the event loop keep running meanwhile.
+    """
+    if client is None:
+        async with create_client(proxy_url=proxy_url, timeout=timeout) as own_client:
+            return await _fetch_async(
+                url,
+                user_agent=user_agent,
+                ignore_robots_txt=ignore_robots_txt,
+                proxy_url=proxy_url,
+                timeout=timeout,
+                client=own_client,
+                robots_cache=robots_cache,
+                max_bytes=max_bytes,
+                require_html=require_html,
+                http_cache=http_cache,
+                scheduler=scheduler,
+                retry=retry,
+                validators=validators,
+            )
+
+    crawl_delay = None
     if not ignore_robots_txt:
-        await _check_may_fetch_url(url, user_agent, proxy_url=proxy_url)
+        with timed(STAGE_ROBOTS):
+            rules = await _check_may_fetch_url(
+                client,
+                url,
+                user_agent,
+                robots_cache=robots_cache,
+            )
+        crawl_delay = rules.crawl_delay(user_agent)
 
-    return await _fetch_url(
-        url,
-        user_agent,
-        proxy_url=proxy_url,
-        timeout=timeout,
-    )
+    attempt = 0
+    while True:
+        slot = scheduler.slot(url, crawl_delay=crawl_delay) if scheduler else nullcontext()
+        try:
+            async with slot:
+                return await _fetch_url(
+                    client,
+                    url,
+                    user_agent,
+                    timeout=timeout,
+                    max_bytes=max_bytes,
+                    require_html=require_html,
+                    http_cache=http_cache,
+                    validators=validators,
+                )
+        except Extract2MarkdownFetchError as exc:
+            delay = retry.next_delay(exc, attempt) if retry is not None else None
+            if delay is None:
+                raise
+        attempt += 1
+        await asyncio.sleep(delay)
 
 
-def fetch_url(
+def fetch_response(
         url: str,
         *,
         user_agent: str | None = None,
         ignore_robots_txt: bool = False,
         proxy_url: str | None = None,
         timeout: float = 30.0,
-) -> tuple[str, str]:
-    """Fetch the given URL and return the content and content-type.
+        robots_cache: RobotsCache | None = None,
+        max_bytes: int | None = None,
+        require_html: bool = False,
+        cache_dir: Path | str | None = None,
+        retry: RetryPolicy | None = None,
+) -> FetchResponse:
+    """Fetch the given URL and return the response with its undecoded body.
 
     Args:
         url: Webpage to fetch.
@@ -125,22 +419,62 @@ def fetch_url(
         ignore_robots_txt: Skip robots.txt validation when True.
         proxy_url: HTTP proxy URL if requests must be proxied.
         timeout: Timeout for individual HTTP requests.
+        robots_cache: Cache for robots.txt rules, defaults to a process-wide one.
+        max_bytes: Abort the download once the body exceeds this many bytes.
+        require_html: Reject non-HTML responses before downloading the body.
+        cache_dir: Directory of an HTTP cache revalidated with ETag/Last-Modified.
+        retry: Policy for retrying transient failures, no retries by default.
 
     Returns:
-        content and content-type of the fetched page.
+        the fetched page; ``content`` decodes its body on access.
     """
     if not url:
         raise ValueError("A non-empty URL is required")
 
     resolved_user_agent = user_agent or DEFAULT_USER_AGENT
-    content, content_type = asyncio.run(
+    return asyncio.run(
         _fetch_async(
             url,
             user_agent=resolved_user_agent,
             ignore_robots_txt=ignore_robots_txt,
             proxy_url=proxy_url,
             timeout=timeout,
+            robots_cache=robots_cache,
+            max_bytes=max_bytes,
+            require_html=require_html,
+            http_cache=http_cache_for(cache_dir),
+            retry=retry,
         )
     )
 
-    return content, content_type
+
+def fetch_url(
+        url: str,
+        *,
+        user_agent: str | None = None,
+        ignore_robots_txt: bool = False,
+        proxy_url: str | None = None,
+        timeout: float = 30.0,
+        robots_cache: RobotsCache | None = None,
+        max_bytes: int | None = None,
+        require_html: bool = False,
+        cache_dir: Path | str | None = None,
+        retry: RetryPolicy | None = None,
+) -> tuple[str, str]:
+    """Fetch the given URL and return the decoded content and content-type.
+
+    Takes the same arguments as ``fetch_response``.
+    """
+    response = fetch_response(
+        url,
+        user_agent=user_agent,
+        ignore_robots_txt=ignore_robots_txt,
+        proxy_url=proxy_url,
+        timeout=timeout,
+        robots_cache=robots_cache,
+        max_bytes=max_bytes,
+        require_html=require_html,
+        cache_dir=cache_dir,
+        retry=retry,
+    )
+    return response.content, response.content_type
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""Filesystem helpers shared by the caches and batch writers."""
+
+from __future__ import annotations
+
+import mmap
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+# Files at least this large are memory-mapped instead of read into a bytes object.
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+
+def write_atomic(path: Path, data: bytes | str) -> None:
+    """Write ``data`` to ``path`` so readers never observe a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if isinstance(data, str):
+            temp_path.write_text(data, encoding="utf-8")
+        else:
+            temp_path.write_bytes(data)
+        temp_path.replace(path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def read_mapped(path: Path | str, *, threshold: int = MMAP_THRESHOLD) -> Iterator[bytes | mmap.mmap]:
+    """Yield the contents of ``path``, memory-mapped read-only when it is large.
+
+    A mapping is backed by the page cache rather than process memory, so large
+    files can be parsed without ever holding a full copy in a Python object. It
+    is only valid inside the ``with`` block.
+    """
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size < threshold or size == 0:
+            yield file.read()
+            return
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapping
+        finally:
+            mapping.close()
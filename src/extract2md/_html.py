@@ -2,41 +2,199 @@
 
 from __future__ import annotations
 
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
-from extract2md.converters import get_converter
+from extract2md._links import (
+    REWRITE_HTML,
+    REWRITE_MARKDOWN,
+    REWRITE_MODES,
+    collect_links,
+    rewrite_markdown_links,
+    rewrite_relative_links,
+    rewrite_relative_links_in_tree,
+)
+from extract2md._metrics import (
+    SIZE_OUTPUT,
+    STAGE_CONVERT,
+    STAGE_DECODE,
+    STAGE_PARSE,
+    STAGE_REWRITE,
+    is_observed,
+    record_size,
+    timed,
+)
+from extract2md._parse import parse_html, parse_html_bytes
+from extract2md._sniff import (
+    SNIFF_BYTES,
+    decode_html,
+    detect_charset,
+    is_html_content_type,
+    sniff_charset,
+    sniff_html,
+)
+from extract2md.converters import HtmlConverter, get_converter
 from extract2md.models import (
     Extract2MarkdownContentTypeError,
     Extract2MarkdownToMarkdownError,
 )
 
+if TYPE_CHECKING:
+    from mmap import mmap
+
+    from lxml.html import HtmlElement
+
 HTML_TAG_THRESHOLD = 100
 
 
 def to_markdown(
-        html: str,
+        html: str | bytes | mmap,
         content_type: Optional[Any] = None,
         *,
+        charset: str | None = None,
         converter: str | None = None,
+        base_url: str | None = None,
+        rewrite_mode: str = REWRITE_HTML,
+        links: list[str] | None = None,
 ) -> str:
-    """Convert raw HTML into Markdown."""
+    """Convert raw HTML into Markdown.
 
-    content_type_value = str(content_type or "")
-    is_content_type_html = (
-            not content_type_value or "text/html" in content_type_value.lower()
-    )
-    if not is_content_type_html:
+    When ``base_url`` is given, relative URLs are resolved against it: in the
+    HTML before conversion (``rewrite_mode="html"``) or only in the links and
+    images that survive into the Markdown (``rewrite_mode="markdown"``).
+    Converters that accept a parsed tree get the same lxml tree the links were
+    rewritten on, so the document is parsed only once.
+
+    ``html`` may also be undecoded bytes. Their encoding is ``charset`` when
+    given, else detected once from a BOM, the ``content_type`` charset or a
+    ``<meta>`` tag; tree converters then get the bytes parsed by lxml directly.
+
+    When ``links`` is given, the ``<a href>`` targets of the document, resolved
+    against ``base_url``, are appended to it while the links are rewritten.
+    """
+    if rewrite_mode not in REWRITE_MODES:
+        raise ValueError(
+            f"Unknown rewrite mode '{rewrite_mode}'. Available: {', '.join(REWRITE_MODES)}"
+        )
+
+    if not isinstance(html, str):
+        charset = detect_charset(
+            html,
+            charset or sniff_charset(html[:SNIFF_BYTES], str(content_type or "")),
+        )
+        looks_like_html, prefix = _sniff_bytes(html, charset)
+    else:
+        looks_like_html, prefix = sniff_html(html), html
+
+    if not is_html_content_type(content_type):
         raise Extract2MarkdownContentTypeError(
-            f"Received non-html content type {content_type}. Here is the raw content:\n{html}"
+            f"Received non-html content type {content_type}. Here is the raw content:\n"
+            f"{html if isinstance(html, str) else decode_html(html, charset)}"
         )
 
-    is_page_html = "<html" in html[:HTML_TAG_THRESHOLD].lower()
-    if not is_page_html:
+    if not looks_like_html:
         raise Extract2MarkdownToMarkdownError(
             "Not a valid HTML document. "
             f"Here are the first {HTML_TAG_THRESHOLD} characters:\n"
-            f"{html[:HTML_TAG_THRESHOLD]}"
+            f"{prefix[:HTML_TAG_THRESHOLD]}"
         )
 
     converter_impl = get_converter(converter)
-    return converter_impl.convert(html)
+    if rewrite_mode == REWRITE_MARKDOWN:
+        markdown = _convert(
+            converter_impl, html, charset=charset, base_url=base_url, rewrite_html=False, links=links
+        )
+        with timed(STAGE_REWRITE):
+            markdown = rewrite_markdown_links(markdown, base_url=base_url)
+    else:
+        markdown = _convert(
+            converter_impl, html, charset=charset, base_url=base_url, rewrite_html=True, links=links
+        )
+    if is_observed():
+        record_size(SIZE_OUTPUT, len(markdown.encode("utf-8")))
+    return markdown
+
+
+def to_markdown_with_links(
+        html: str | bytes | mmap,
+        content_type: Any | None = None,
+        *,
+        charset: str | None = None,
+        converter: str | None = None,
+        base_url: str | None = None,
+        rewrite_mode: str = REWRITE_HTML,
+) -> tuple[str, list[str]]:
+    """Return ``to_markdown`` output together with the document's link targets.
+
+    Unlike passing ``links`` to ``to_markdown`` this also works in worker processes.
+    """
+    links: list[str] = []
+    markdown = to_markdown(
+        html,
+        content_type,
+        charset=charset,
+        converter=converter,
+        base_url=base_url,
+        rewrite_mode=rewrite_mode,
+        links=links,
+    )
+    return markdown, links
+
+
+def _sniff_bytes(html: bytes | mmap, charset: str) -> tuple[bool | None, str]:
+    """Return ``(looks_like_html, prefix)`` for undecoded ``html``.
+
+    Only the first bytes are decoded, and more of them while ``sniff_html``
+    is still inside a long preamble.
+    """
+    size = SNIFF_BYTES
+    while True:
+        prefix = html[:size].decode(charset, errors="replace")
+        looks_like_html = sniff_html(prefix)
+        if looks_like_html is not None or size >= len(html):
+            return looks_like_html, prefix
+        size *= 4
+
+
+def _convert(
+        converter_impl: HtmlConverter,
+        html: str | bytes | mmap,
+        *,
+        charset: str | None,
+        base_url: str | None,
+        rewrite_html: bool,
+        links: list[str] | None,
+) -> str:
+    """Run ``converter_impl`` after rewriting links in the HTML when requested."""
+    rewrite_base_url = base_url if rewrite_html else None
+    convert_tree = getattr(converter_impl, "convert_tree", None)
+    if convert_tree is not None:
+        with timed(STAGE_PARSE):
+            tree = _parse(html, charset)
+        if rewrite_base_url:
+            with timed(STAGE_REWRITE):
+                rewrite_relative_links_in_tree(tree, base_url=rewrite_base_url, links=links)
+        elif links is not None:
+            with timed(STAGE_REWRITE):
+                collect_links(tree, base_url=base_url, links=links)
+        with timed(STAGE_CONVERT):
+            return convert_tree(tree)
+    if not isinstance(html, str):
+        with timed(STAGE_DECODE):
+            html = decode_html(html, charset)
+    if rewrite_base_url:
+        with timed(STAGE_REWRITE):
+            html = rewrite_relative_links(html, base_url=rewrite_base_url, links=links)
+    elif links is not None:
+        with timed(STAGE_REWRITE):
+            collect_links(parse_html(html), base_url=base_url, links=links)
+    with timed(STAGE_CONVERT):
+        return converter_impl.convert(html)
+
+
+def _parse(html: str | bytes | mmap, charset: str | None) -> HtmlElement:
+    if isinstance(html, str):
+        return parse_html(html)
+    try:
+        return parse_html_bytes(html, charset or "utf-8")
+    except LookupError:
+        return parse_html(decode_html(html, charset))
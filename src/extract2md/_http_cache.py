@@ -0,0 +1,179 @@
+"""On-disk HTTP cache revalidated with ETag / Last-Modified."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from extract2md._files import write_atomic
+
+DEFAULT_MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+_METADATA_SUFFIX = ".json"
+_BODY_SUFFIX = ".body"
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """Stored response for one URL."""
+
+    url: str
+    final_url: str
+    content_type: str
+    etag: str | None
+    last_modified: str | None
+    body_path: Path
+    status_code: int = 200
+
+    def read_body(self) -> bytes:
+        """Return the cached response body."""
+        return self.body_path.read_bytes()
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Return the request headers that revalidate this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Directory of response bodies plus validators, evicted least-recently-used.
+
+    Only responses carrying an ``ETag`` or ``Last-Modified`` header are stored,
+    because they are served again only after the server answers a conditional
+    request with ``304 Not Modified``. Once the bodies exceed ``max_bytes`` the
+    entries used longest ago are removed.
+    """
+
+    def __init__(
+            self,
+            directory: Path | str,
+            *,
+            max_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+    ) -> None:
+        self.directory = Path(directory).expanduser()
+        self.max_bytes = max_bytes
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> CacheEntry | None:
+        """Return the entry stored for ``url`` and mark it as recently used."""
+        metadata_path, body_path = self._paths_for(url)
+        try:
+            payload = json.loads(metadata_path.read_text(encoding="utf-8"))
+            if payload.get("url") != url or not body_path.exists():
+                return None
+            os.utime(metadata_path)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(
+            url=url,
+            final_url=payload.get("final_url") or url,
+            content_type=payload.get("content_type", ""),
+            etag=payload.get("etag"),
+            last_modified=payload.get("last_modified"),
+            body_path=body_path,
+            status_code=payload.get("status_code", 200),
+        )
+
+    def store(
+            self,
+            url: str,
+            *,
+            final_url: str,
+            content_type: str,
+            etag: str | None,
+            last_modified: str | None,
+            body: bytes,
+            status_code: int = 200,
+    ) -> None:
+        """Store ``body`` for ``url`` when it can be revalidated later."""
+        if not (etag or last_modified) or len(body) > self.max_bytes:
+            return
+        metadata_path, body_path = self._paths_for(url)
+        payload = {
+            "url": url,
+            "final_url": final_url,
+            "content_type": content_type,
+            "etag": etag,
+            "last_modified": last_modified,
+            "status_code": status_code,
+        }
+        with self._lock:
+            size = self._current_size()
+            previous_size = _file_size(body_path)
+            try:
+                write_atomic(body_path, body)
+                write_atomic(metadata_path, json.dumps(payload).encode("utf-8"))
+            except OSError:  # pragma: no cover - the cache is best effort
+                return
+            self._size = size - previous_size + len(body)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _paths_for(self, url: str) -> tuple[Path, Path]:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = self.directory / digest[:2] / digest
+        return base.with_suffix(_METADATA_SUFFIX), base.with_suffix(_BODY_SUFFIX)
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(
+                _file_size(path) for path in self.directory.glob(f"*/*{_BODY_SUFFIX}")
+            )
+        return self._size
+
+    def _evict(self) -> None:
+        entries = []
+        for metadata_path in self.directory.glob(f"*/*{_METADATA_SUFFIX}"):
+            try:
+                entries.append((metadata_path.stat().st_mtime, metadata_path))
+            except OSError:
+                continue
+        entries.sort()
+        size = self._current_size()
+        for _, metadata_path in entries:
+            if size <= self.max_bytes:
+                break
+            body_path = metadata_path.with_suffix(_BODY_SUFFIX)
+            size -= _file_size(body_path)
+            for path in (metadata_path, body_path):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+        self._size = size
+
+
+@lru_cache(maxsize=16)
+def _shared_http_cache(directory: Path) -> HttpCache:
+    return HttpCache(directory)
+
+
+def http_cache_for(cache_dir: Path | str | None) -> HttpCache | None:
+    """Return the process-wide ``HttpCache`` for ``cache_dir``.
+
+    Reusing one instance per directory keeps its running size total, so the
+    directory is not re-scanned on every call.
+    """
+    if not cache_dir:
+        return None
+    return _shared_http_cache(Path(cache_dir).expanduser().resolve())
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+__all__ = ["DEFAULT_MAX_CACHE_BYTES", "CacheEntry", "HttpCache", "http_cache_for"]
@@ -2,28 +2,112 @@
 
 from __future__ import annotations
 
+import re
+from typing import TYPE_CHECKING
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
+from extract2md._parse import parse_html, serialize_html
+
+if TYPE_CHECKING:
+    from lxml.html import HtmlElement
 
 ATTRIBUTES_TO_REWRITE: tuple[str, ...] = ("href", "src")
 
+REWRITE_HTML = "html"
+REWRITE_MARKDOWN = "markdown"
+REWRITE_MODES: tuple[str, ...] = (REWRITE_HTML, REWRITE_MARKDOWN)
+
+# Elements whose href points at another document rather than a resource of this one.
+_LINK_TAGS = frozenset({"a", "area"})
+
+_LINK_XPATH = "//*[" + " or ".join(f"@{attr}" for attr in ATTRIBUTES_TO_REWRITE) + "]"
+
+# Destination of an inline link/image (``](url``) or of a reference definition
+# (``[label]: url``): either ``<...>`` or a run without whitespace that may
+# contain one level of balanced parentheses.
+_MARKDOWN_TARGET_PATTERN = re.compile(
+    r"(?P<prefix>\]\(\s*|^[ ]{0,3}\[[^\]\n]+\]:[ \t]*)"
+    r"(?P<target><[^<>\n]*>|(?:[^\s()\\]|\\.|\([^\s()]*\))+)",
+    re.MULTILINE,
+)
+_FENCE_PATTERN = re.compile(
+    r"(^[ ]{0,3}(?:```|~~~)[^\n]*\n.*?^[ ]{0,3}(?:```|~~~)[ \t]*$)",
+    re.MULTILINE | re.DOTALL,
+)
+
 
-def rewrite_relative_links(html: str, *, base_url: str | None) -> str:
+def rewrite_relative_links(
+        html: str,
+        *,
+        base_url: str | None,
+        links: list[str] | None = None,
+) -> str:
     """Return ``html`` with relative href/src values rewritten to absolute URLs."""
     if not base_url:
         return html
 
-    soup = BeautifulSoup(html, "html.parser")
-    for attr in ATTRIBUTES_TO_REWRITE:
-        _rewrite_attribute(soup, attr, base_url)
-    return str(soup)
+    tree = parse_html(html)
+    rewrite_relative_links_in_tree(tree, base_url=base_url, links=links)
+    return serialize_html(tree)
+
+
+def rewrite_relative_links_in_tree(
+        tree: HtmlElement,
+        *,
+        base_url: str | None,
+        links: list[str] | None = None,
+) -> None:
+    """Rewrite relative href/src values of a parsed document in place.
+
+    When ``links`` is given, the resolved ``<a href>`` targets are appended to it
+    on the same walk.
+    """
+    if not base_url:
+        return
+
+    _walk_links(tree, base_url, links, rewrite=True)
+
+
+def collect_links(tree: HtmlElement, *, base_url: str | None, links: list[str]) -> None:
+    """Append the ``<a href>`` targets of ``tree``, resolved against ``base_url``, to ``links``."""
+    _walk_links(tree, base_url or "", links, rewrite=False)
+
+
+def _walk_links(
+        tree: HtmlElement,
+        base_url: str,
+        links: list[str] | None,
+        *,
+        rewrite: bool,
+) -> None:
+    for element in tree.xpath(_LINK_XPATH):
+        for attr in ATTRIBUTES_TO_REWRITE:
+            value = element.get(attr)
+            if not value:
+                continue
+            url = urljoin(base_url, value)
+            if rewrite:
+                element.set(attr, url)
+            if links is not None and attr == "href" and element.tag in _LINK_TAGS:
+                links.append(url)
+
+
+def rewrite_markdown_links(markdown: str, *, base_url: str | None) -> str:
+    """Return ``markdown`` with relative link and image targets made absolute.
+
+    Only ``[text](url)``, ``![alt](src)`` and ``[label]: url`` constructs are
+    touched; fenced code blocks are left alone.
+    """
+    if not base_url or ("](" not in markdown and "]:" not in markdown):
+        return markdown
 
+    def resolve(match: re.Match[str]) -> str:
+        target = match.group("target")
+        if target.startswith("<") and target.endswith(">"):
+            return f"{match.group('prefix')}<{urljoin(base_url, target[1:-1])}>"
+        return f"{match.group('prefix')}{urljoin(base_url, target)}"
 
-def _rewrite_attribute(soup: BeautifulSoup, attribute: str, base_url: str) -> None:
-    """Update each attribute occurrence to an absolute URL."""
-    for element in soup.find_all(attrs={attribute: True}):
-        value = element.get(attribute)
-        if not isinstance(value, str) or not value:
-            continue
-        element[attribute] = urljoin(base_url, value)
+    parts = _FENCE_PATTERN.split(markdown)
+    for index in range(0, len(parts), 2):
+        parts[index] = _MARKDOWN_TARGET_PATTERN.sub(resolve, parts[index])
+    return "".join(parts)
@@ -0,0 +1,183 @@
+"""Manifest of converted sources, used to skip unchanged pages on the next run."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from extract2md.converters import converter_version
+
+if TYPE_CHECKING:
+    from mmap import mmap
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    file_stamp TEXT,
+    converter_version TEXT NOT NULL,
+    output_path TEXT,
+    links TEXT,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def content_hash(data: bytes | mmap) -> str:
+    """Return the hash of undecoded HTML stored in the manifest."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def conversion_version(
+        converter: str | None,
+        *,
+        rewrite_relative_urls: bool,
+        rewrite_mode: str,
+) -> str:
+    """Return the manifest's converter version for converting with these options."""
+    rewrite = rewrite_mode if rewrite_relative_urls else "off"
+    return f"{converter_version(converter)} rewrite={rewrite}"
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """What the manifest remembers about the last conversion of one source.
+
+    ``etag`` and ``last_modified`` are the HTTP validators of a URL and
+    ``file_stamp`` the size/mtime stamp of a local file. ``links`` is ``None``
+    when the page's links were not collected.
+    """
+
+    source: str
+    etag: str | None
+    last_modified: str | None
+    content_hash: str | None
+    converter_version: str
+    output_path: str | None
+    links: tuple[str, ...] | None = None
+    file_stamp: str | None = None
+
+    def is_current(self, converter_version: str, output_path: Path | str | None) -> bool:
+        """Return True when converting again would give the same output at ``output_path``.
+
+        That requires the same converter version and an output that still exists.
+        """
+        if self.converter_version != converter_version:
+            return False
+        if output_path is None:
+            return self.output_path is None
+        return self.output_path == str(output_path) and Path(output_path).exists()
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Return the request headers that ask the server whether the page changed."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class Manifest:
+    """SQLite record of the validators, content hash and output of every converted source.
+
+    Scheduled jobs pass the same manifest to each run: sources whose validators
+    still match are not downloaded again, and sources whose HTML hashes the same
+    are not converted again.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path).expanduser()
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+
+    def get(self, source: str) -> ManifestEntry | None:
+        """Return the entry recorded for ``source`` if there is one."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT etag, last_modified, content_hash, converter_version, output_path, links,"
+                " file_stamp FROM sources WHERE source = ?",
+                (source,),
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, digest, version, output_path, links, file_stamp = row
+        return ManifestEntry(
+            source=source,
+            etag=etag,
+            last_modified=last_modified,
+            content_hash=digest,
+            converter_version=version,
+            output_path=output_path,
+            links=tuple(json.loads(links)) if links is not None else None,
+            file_stamp=file_stamp,
+        )
+
+    def record(
+            self,
+            source: str,
+            *,
+            etag: str | None,
+            last_modified: str | None,
+            content_hash: str | None,
+            converter_version: str,
+            output_path: Path | str | None = None,
+            links: Iterable[str] | None = None,
+            file_stamp: str | None = None,
+    ) -> None:
+        """Store the outcome of converting ``source``, replacing any earlier entry."""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO sources (source, etag, last_modified, content_hash,"
+                    " file_stamp, converter_version, output_path, links, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        source,
+                        etag,
+                        last_modified,
+                        content_hash,
+                        file_stamp,
+                        converter_version,
+                        str(output_path) if output_path is not None else None,
+                        json.dumps(list(links)) if links is not None else None,
+                        time.time(),
+                    ),
+                )
+
+    def close(self) -> None:
+        """Close the SQLite connection if one is open."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(_SCHEMA)
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(sources)")}
+            if "file_stamp" not in columns:  # manifests written before the column existed
+                connection.execute("ALTER TABLE sources ADD COLUMN file_stamp TEXT")
+            self._connection = connection
+        return self._connection
+
+
+__all__ = [
+    "Manifest",
+    "ManifestEntry",
+    "content_hash",
+    "conversion_version",
+]
@@ -0,0 +1,182 @@
+"""Per-stage timing and size metrics reported to pluggable observers."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Protocol, TypeVar
+
+STAGE_ROBOTS = "robots"
+STAGE_CONNECT = "connect"
+STAGE_DOWNLOAD = "download"
+STAGE_DECODE = "decode"
+STAGE_READ = "read"
+STAGE_PARSE = "parse"
+STAGE_REWRITE = "rewrite"
+STAGE_CONVERT = "converter"
+STAGES: tuple[str, ...] = (
+    STAGE_ROBOTS,
+    STAGE_CONNECT,
+    STAGE_DOWNLOAD,
+    STAGE_DECODE,
+    STAGE_READ,
+    STAGE_PARSE,
+    STAGE_REWRITE,
+    STAGE_CONVERT,
+)
+
+SIZE_DOWNLOAD = "download_bytes"
+SIZE_OUTPUT = "output_bytes"
+
+
+class MetricsObserver(Protocol):
+    """Receives measurements from the fetch and conversion pipeline."""
+
+    def record_timing(self, stage: str, seconds: float) -> None:
+        """Called once each time ``stage`` finishes."""
+
+    def record_size(self, name: str, size: int) -> None:
+        """Called with byte counts such as ``download_bytes`` and ``output_bytes``."""
+
+
+_ObserverT = TypeVar("_ObserverT", bound=MetricsObserver)
+
+_observers: ContextVar[tuple[MetricsObserver, ...]] = ContextVar(
+    "extract2md_metrics_observers", default=()
+)
+
+
+@contextmanager
+def observe(observer: _ObserverT) -> Iterator[_ObserverT]:
+    """Report the measurements taken inside the block to ``observer``.
+
+    Observers nest: measurements reach every observer installed by enclosing
+    blocks as well. The registration is stored in a context variable, so it
+    follows asyncio tasks started inside the block.
+    """
+    token = _observers.set((*_observers.get(), observer))
+    try:
+        yield observer
+    finally:
+        _observers.reset(token)
+
+
+def is_observed() -> bool:
+    """Return True when at least one observer is installed."""
+    return bool(_observers.get())
+
+
+def record_timing(stage: str, seconds: float) -> None:
+    """Report that ``stage`` took ``seconds`` to every installed observer."""
+    for observer in _observers.get():
+        observer.record_timing(stage, seconds)
+
+
+def record_size(name: str, size: int) -> None:
+    """Report a byte count to every installed observer."""
+    for observer in _observers.get():
+        observer.record_size(name, size)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Time the block as ``stage``; free when nobody is observing."""
+    if not _observers.get():
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(stage, time.perf_counter() - started)
+
+
+class StageMetrics:
+    """Observer that sums the time and number of runs of each stage and all sizes."""
+
+    def __init__(self) -> None:
+        self.timings: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self.sizes: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record_timing(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+            self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def record_size(self, name: str, size: int) -> None:
+        with self._lock:
+            self.sizes[name] = self.sizes.get(name, 0) + size
+
+    def merge(self, data: Mapping[str, Mapping[str, Any]]) -> None:
+        """Add the totals of another ``as_dict()`` result, e.g. from a worker process."""
+        with self._lock:
+            for stage, seconds in data.get("timings", {}).items():
+                self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+            for stage, count in data.get("counts", {}).items():
+                self.counts[stage] = self.counts.get(stage, 0) + count
+            for name, size in data.get("sizes", {}).items():
+                self.sizes[name] = self.sizes.get(name, 0) + size
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return the totals as ``{"timings": ..., "counts": ..., "sizes": ...}``."""
+        with self._lock:
+            return {
+                "timings": dict(self.timings),
+                "counts": dict(self.counts),
+                "sizes": dict(self.sizes),
+            }
+
+    def render_prometheus(
+            self,
+            *,
+            counters: Mapping[str, float] | None = None,
+            gauges: Mapping[str, float] | None = None,
+    ) -> str:
+        """Return the totals in the Prometheus text exposition format.
+
+        ``counters`` and ``gauges`` add further values, such as finished jobs and
+        queue depth, exported as ``extract2md_<name>``.
+        """
+        data = self.as_dict()
+        lines = [
+            "# HELP extract2md_stage_seconds Time spent in each pipeline stage.",
+            "# TYPE extract2md_stage_seconds summary",
+        ]
+        for stage in sorted(data["timings"]):
+            lines.append(
+                f'extract2md_stage_seconds_sum{{stage="{stage}"}} {data["timings"][stage]:.6f}'
+            )
+            lines.append(
+                f'extract2md_stage_seconds_count{{stage="{stage}"}} {data["counts"][stage]}'
+            )
+        lines.extend([
+            "# HELP extract2md_bytes_total Bytes downloaded and Markdown bytes produced.",
+            "# TYPE extract2md_bytes_total counter",
+        ])
+        for name in sorted(data["sizes"]):
+            kind = name.removesuffix("_bytes")
+            lines.append(f'extract2md_bytes_total{{kind="{kind}"}} {data["sizes"][name]}')
+        for kind, values in (("counter", counters), ("gauge", gauges)):
+            for name, value in (values or {}).items():
+                lines.append(f"# TYPE extract2md_{name} {kind}")
+                lines.append(f"extract2md_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+__all__ = [
+    "SIZE_DOWNLOAD",
+    "SIZE_OUTPUT",
+    "STAGES",
+    "MetricsObserver",
+    "StageMetrics",
+    "is_observed",
+    "observe",
+    "record_size",
+    "record_timing",
+    "timed",
+]
@@ -0,0 +1,112 @@
+"""Shared lxml parsing helpers."""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+from extract2md.models import Extract2MarkdownToMarkdownError
+
+if TYPE_CHECKING:
+    from mmap import mmap
+
+    from lxml.html import HtmlElement, HTMLParser
+
+_local = threading.local()
+_UTF8_NAMES = frozenset({"utf-8", "utf8", "utf-8-sig", "u8"})
+
+
+def _parser(encoding: str = "utf-8") -> HTMLParser:
+    """Return this thread's parser for ``encoding``; lxml parsers must not be shared across threads.
+
+    Raises ``LookupError`` when libxml2 does not know ``encoding``.
+    """
+    parsers = getattr(_local, "parsers", None)
+    if parsers is None:
+        parsers = _local.parsers = {}
+    parser = parsers.get(encoding)
+    if parser is None:
+        from lxml.html import HTMLParser
+
+        parser = HTMLParser(
+            collect_ids=False,
+            default_doctype=False,
+            encoding=encoding,
+            remove_comments=True,
+            remove_pis=True,
+        )
+        parsers[encoding] = parser
+    return parser
+
+
+def parse_html(html: str) -> HtmlElement:
+    """Parse ``html`` into an lxml document tree."""
+    from lxml.etree import ParserError
+    from lxml.html import document_fromstring
+
+    try:
+        try:
+            return document_fromstring(html, parser=_parser())
+        except ValueError:
+            # lxml rejects str input that carries an XML encoding declaration.
+            return document_fromstring(html.encode("utf-8"), parser=_parser())
+    except ParserError as exc:
+        raise Extract2MarkdownToMarkdownError(
+            f"Unable to parse the HTML document: {exc}"
+        ) from exc
+
+
+def parse_html_bytes(data: bytes | mmap, encoding: str) -> HtmlElement:
+    """Parse undecoded ``data`` with libxml2 decoding it as ``encoding``.
+
+    This skips building a Python string of the whole document. libxml2 pulls a
+    memory-mapped file through its own small read buffer, so the document is
+    never copied into process memory as a whole.
+    ``LookupError`` is raised when libxml2 does not support ``encoding``;
+    decode the bytes and use ``parse_html`` then.
+    """
+    from lxml.etree import ParserError
+    from lxml.html import document_fromstring
+
+    if encoding.lower().replace("_", "-") in _UTF8_NAMES:
+        # libxml2 skips a UTF-8 BOM itself and does not know Python's "utf-8-sig".
+        encoding = "utf-8"
+    parser = _parser(encoding)
+    try:
+        if isinstance(data, bytes):
+            return document_fromstring(data, parser=parser)
+        return _parse_mapped(data, parser)
+    except ParserError as exc:
+        raise Extract2MarkdownToMarkdownError(
+            f"Unable to parse the HTML document: {exc}"
+        ) from exc
+
+
+class _MappedReader:
+    """File-like view of a mapping that leaves the mapping's own position alone."""
+
+    def __init__(self, data: mmap) -> None:
+        self._data = data
+        self._offset = 0
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._data) if size < 0 else self._offset + size
+        chunk = self._data[self._offset:end]
+        self._offset += len(chunk)
+        return chunk
+
+
+def _parse_mapped(data: mmap, parser: HTMLParser) -> HtmlElement:
+    from lxml.etree import ParserError, parse
+
+    root = parse(_MappedReader(data), parser).getroot()
+    if root is None:
+        raise ParserError("Document is empty")
+    return root
+
+
+def serialize_html(tree: HtmlElement) -> str:
+    """Serialize ``tree`` back into an HTML string."""
+    from lxml.html import tostring
+
+    return tostring(tree, encoding="unicode")
@@ -0,0 +1,135 @@
+"""Content-addressed cache of converted Markdown."""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mmap import mmap
+
+DEFAULT_MAX_ENTRIES = 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    markdown TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+
+
+class ResultCache:
+    """Two-tier cache of Markdown keyed by a hash of the HTML and conversion options.
+
+    An in-memory LRU holds the ``max_entries`` most recently used results. When
+    ``path`` is given, every result is also written to an SQLite database there,
+    so identical documents are not converted again by later processes.
+    """
+
+    def __init__(
+            self,
+            *,
+            max_entries: int = DEFAULT_MAX_ENTRIES,
+            path: Path | str | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.path = Path(path).expanduser() if path else None
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+
+    @staticmethod
+    def key_for(
+            html: str | bytes | mmap,
+            *,
+            converter: str,
+            base_url: str | None,
+            rewrite_mode: str | None,
+            charset: str | None = None,
+    ) -> str:
+        """Return the cache key for converting ``html`` with the given options.
+
+        ``base_url`` and ``rewrite_mode`` should be ``None`` when relative links
+        are not rewritten. Undecoded ``html`` is hashed as is, together with the
+        ``charset`` it was declared in.
+        """
+        digest = hashlib.sha256()
+        for part in (converter, base_url or "", rewrite_mode or ""):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        if isinstance(html, str):
+            digest.update(html.encode("utf-8", errors="surrogatepass"))
+        else:
+            digest.update(f"bytes:{charset or ''}".encode())
+            digest.update(b"\0")
+            digest.update(html)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached Markdown for ``key`` if present."""
+        with self._lock:
+            markdown = self._memory.get(key)
+            if markdown is not None:
+                self._memory.move_to_end(key)
+                return markdown
+            connection = self._connect()
+            if connection is None:
+                return None
+            row = connection.execute(
+                "SELECT markdown FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return row[0]
+
+    def set(self, key: str, markdown: str) -> None:
+        """Store ``markdown`` under ``key`` in every tier."""
+        with self._lock:
+            self._remember(key, markdown)
+            connection = self._connect()
+            if connection is None:
+                return
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO results (key, markdown, created_at) VALUES (?, ?, ?)",
+                    (key, markdown, time.time()),
+                )
+
+    def clear(self) -> None:
+        """Forget all in-memory entries."""
+        with self._lock:
+            self._memory.clear()
+
+    def close(self) -> None:
+        """Close the SQLite connection if one is open."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _remember(self, key: str, markdown: str) -> None:
+        self._memory[key] = markdown
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if self.path is None:
+            return None
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+
+__all__ = ["DEFAULT_MAX_ENTRIES", "ResultCache"]
@@ -0,0 +1,83 @@
+"""Retry policy for transient fetch failures."""
+
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+
+from extract2md.models import Extract2MarkdownFetchError
+
+DEFAULT_RETRY_STATUSES: frozenset[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
+DEFAULT_MAX_RETRY_AFTER = 120.0
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """When and how long to wait before fetching a URL again.
+
+    A failed request is retried up to ``retries`` times when the server answered
+    with one of ``statuses`` or the request raised one of ``exceptions``
+    (default: httpx transport errors such as timeouts and refused connections).
+    The wait before retry ``n`` (0-based) is drawn uniformly from
+    ``[0, min(max_backoff, backoff * 2**n)]``, or is exactly the server's
+    ``Retry-After`` when ``respect_retry_after`` is set. A ``Retry-After`` longer
+    than ``max_retry_after`` seconds ends the retries.
+    """
+
+    retries: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    jitter: bool = True
+    statuses: frozenset[int] = DEFAULT_RETRY_STATUSES
+    exceptions: tuple[type[BaseException], ...] | None = None
+    respect_retry_after: bool = True
+    max_retry_after: float = DEFAULT_MAX_RETRY_AFTER
+
+    def next_delay(self, error: Extract2MarkdownFetchError, attempt: int) -> float | None:
+        """Return seconds to wait before retrying after ``error``, or ``None`` to give up.
+
+        ``attempt`` counts the retries already made.
+        """
+        if attempt >= self.retries or not self._is_retryable(error):
+            return None
+        if self.respect_retry_after and error.retry_after:
+            retry_after = parse_retry_after(error.retry_after)
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+        ceiling = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return random.uniform(0, ceiling) if self.jitter else ceiling
+
+    def _is_retryable(self, error: Extract2MarkdownFetchError) -> bool:
+        if error.status_code is not None:
+            return error.status_code in self.statuses
+        cause = error.__cause__
+        return cause is not None and isinstance(cause, self._exception_types())
+
+    def _exception_types(self) -> tuple[type[BaseException], ...]:
+        if self.exceptions is not None:
+            return self.exceptions
+        from httpx import TransportError
+
+        return (TransportError,)
+
+
+def parse_retry_after(value: str) -> float | None:
+    """Return the seconds announced by a ``Retry-After`` header value."""
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+__all__ = [
+    "DEFAULT_MAX_RETRY_AFTER",
+    "DEFAULT_RETRY_STATUSES",
+    "RetryPolicy",
+    "parse_retry_after",
+]
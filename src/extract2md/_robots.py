@@ -0,0 +1,252 @@
+"""Per-host caching of parsed robots.txt rules."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse, urlunparse
+
+from protego import Protego
+
+from extract2md._files import write_atomic
+from extract2md.models import Extract2MarkdownFetchError
+
+if TYPE_CHECKING:
+    from httpx import AsyncClient, Response
+
+DEFAULT_ROBOTS_TTL = 3600.0
+DEFAULT_MAX_ENTRIES = 1024
+
+_MAX_AGE_PATTERN = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+ALLOW = "allow"
+DENY = "deny"
+RULES = "rules"
+
+
+@dataclass
+class RobotsRules:
+    """Outcome of a robots.txt lookup for one scheme+netloc."""
+
+    status: str
+    robots_txt: str = ""
+    expires_at: float = 0.0
+    parser: Protego | None = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.status == RULES and self.parser is None:
+            self.parser = Protego.parse(_strip_comments(self.robots_txt))
+
+    def crawl_delay(self, user_agent: str) -> float | None:
+        """Return the ``Crawl-delay`` in seconds that applies to ``user_agent``."""
+        if self.parser is None:
+            return None
+        delay = self.parser.crawl_delay(user_agent)
+        return float(delay) if delay is not None else None
+
+    def sitemaps(self) -> list[str]:
+        """Return the sitemap URLs announced by ``Sitemap:`` lines."""
+        return list(self.parser.sitemaps) if self.parser is not None else []
+
+    def check(self, url: str, user_agent: str) -> None:
+        """Raise ``Extract2MarkdownFetchError`` when ``url`` may not be fetched."""
+        if self.status == DENY:
+            raise Extract2MarkdownFetchError(
+                "robots.txt forbids autonomous fetching for this user agent",
+            )
+        if self.parser is not None and not self.parser.can_fetch(str(url), user_agent):
+            raise Extract2MarkdownFetchError(
+                "robots.txt disallows fetching this page for the configured user-agent"
+            )
+
+
+class RobotsCache:
+    """In-process robots.txt cache keyed by scheme and netloc.
+
+    Parsed ``Protego`` rules, "allow all" (4xx) and "deny" (401/403) outcomes are
+    kept for ``ttl`` seconds, or for the ``max-age`` announced by the server's
+    ``Cache-Control`` header. When ``cache_dir`` is set, entries are also written
+    to disk so separate processes (e.g. repeated CLI runs) can reuse them.
+    """
+
+    def __init__(
+            self,
+            *,
+            ttl: float = DEFAULT_ROBOTS_TTL,
+            cache_dir: Path | str | None = None,
+            max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.ttl = ttl
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, RobotsRules] = OrderedDict()
+        self._pending: dict[tuple[int, str], asyncio.Future[RobotsRules]] = {}
+
+    def get(self, url: str) -> RobotsRules | None:
+        """Return fresh cached rules for the host of ``url`` if available."""
+        key = _cache_key(url)
+        entry = self._entries.get(key)
+        if entry is None and self.cache_dir is not None:
+            entry = self._load(key)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, url: str, entry: RobotsRules) -> None:
+        """Store ``entry`` for the host of ``url`` unless it is already expired."""
+        if entry.expires_at <= time.time():
+            return
+        key = _cache_key(url)
+        self._remember(key, entry)
+        if self.cache_dir is not None:
+            self._store(key, entry)
+
+    def clear(self) -> None:
+        """Forget all in-memory entries."""
+        self._entries.clear()
+
+    async def rules_for(
+            self,
+            client: AsyncClient,
+            url: str,
+            user_agent: str,
+    ) -> RobotsRules:
+        """Return robots.txt rules for ``url``, downloading them on a cache miss.
+
+        Concurrent lookups for the same host on one event loop share a single
+        download.
+        """
+        cached = self.get(url)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        pending_key = (id(loop), _cache_key(url))
+        pending = self._pending.get(pending_key)
+        if pending is None or pending.get_loop() is not loop:
+            # A download left behind by a closed loop never finishes; drop those,
+            # also in case the closed loop's id was reused by this one.
+            for stale_key, stale in list(self._pending.items()):
+                if stale.get_loop().is_closed():
+                    del self._pending[stale_key]
+            pending = loop.create_task(self._download(client, url, user_agent))
+            self._pending[pending_key] = pending
+            pending.add_done_callback(partial(self._forget_pending, pending_key))
+        return await asyncio.shield(pending)
+
+    def _forget_pending(self, key: tuple[int, str], task: asyncio.Future[RobotsRules]) -> None:
+        if self._pending.get(key) is task:
+            del self._pending[key]
+
+    async def _download(
+            self,
+            client: AsyncClient,
+            url: str,
+            user_agent: str,
+    ) -> RobotsRules:
+        from httpx import HTTPError, InvalidURL
+
+        robot_txt_url = get_robots_txt_url(url)
+        try:
+            response = await client.get(
+                robot_txt_url,
+                follow_redirects=True,
+                headers={"User-Agent": user_agent},
+            )
+        except (HTTPError, InvalidURL) as exc:
+            raise Extract2MarkdownFetchError(
+                f"Failed to fetch robots.txt {robot_txt_url}: {exc}"
+            ) from exc
+
+        expires_at = time.time() + self._ttl_for(response)
+        if response.status_code in (401, 403):
+            entry = RobotsRules(DENY, expires_at=expires_at)
+        elif 400 <= response.status_code < 500:
+            entry = RobotsRules(ALLOW, expires_at=expires_at)
+        else:
+            entry = RobotsRules(RULES, robots_txt=response.text, expires_at=expires_at)
+            if response.status_code >= 500:
+                # Server errors are transient; use the rules once, never cache them.
+                return entry
+        self.set(url, entry)
+        return entry
+
+    def _ttl_for(self, response: Response) -> float:
+        cache_control = response.headers.get("cache-control", "")
+        lowered = cache_control.lower()
+        if "no-store" in lowered or "no-cache" in lowered:
+            return 0.0
+        match = _MAX_AGE_PATTERN.search(cache_control)
+        if match:
+            return float(match.group(1))
+        return self.ttl
+
+    def _remember(self, key: str, entry: RobotsRules) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path_for(self, key: str) -> Path:
+        assert self.cache_dir is not None
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def _load(self, key: str) -> RobotsRules | None:
+        try:
+            payload = json.loads(self._path_for(key).read_text(encoding="utf-8"))
+            return RobotsRules(
+                payload["status"],
+                robots_txt=payload.get("robots_txt", ""),
+                expires_at=float(payload["expires_at"]),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _store(self, key: str, entry: RobotsRules) -> None:
+        payload = {
+            "key": key,
+            "status": entry.status,
+            "robots_txt": entry.robots_txt,
+            "expires_at": entry.expires_at,
+        }
+        try:
+            write_atomic(self._path_for(key), json.dumps(payload))
+        except OSError:  # pragma: no cover - disk cache is best effort
+            return
+
+
+def get_robots_txt_url(url: str) -> str:
+    """Return the robots.txt URL for the host extracted from ``url``."""
+    parsed = urlparse(url)
+    return urlunparse((parsed.scheme, parsed.netloc, "/robots.txt", "", "", ""))
+
+
+def _cache_key(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+
+def _strip_comments(robots_txt: str) -> str:
+    return "\n".join(
+        line for line in robots_txt.splitlines() if not line.strip().startswith("#")
+    )
+
+
+DEFAULT_ROBOTS_CACHE = RobotsCache()
+
+__all__ = ["DEFAULT_ROBOTS_CACHE", "DEFAULT_ROBOTS_TTL", "RobotsCache", "RobotsRules"]
@@ -0,0 +1,277 @@
+"""Per-host politeness: token buckets, Crawl-delay and in-flight caps."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+)
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TypeVar
+from urllib.parse import urlsplit
+
+DEFAULT_MAX_PER_HOST = 2
+DEFAULT_MAX_CRAWL_DELAY = 30.0
+
+# URLs buffered per concurrency slot while looking for a host that may be served.
+_LOOKAHEAD_PER_SLOT = 4
+# Idle hosts are forgotten whenever the number of known hosts reaches this (or twice
+# the number of busy hosts after the last pruning).
+_PRUNE_HOSTS = 1024
+
+_T = TypeVar("_T")
+
+
+def host_key(url: str) -> str:
+    """Return the host that politeness limits are applied to for ``url``."""
+    return (urlsplit(url).hostname or "").lower()
+
+
+@dataclass
+class _HostState:
+    tokens: float
+    updated: float
+    in_flight: int = 0
+    waiters: deque[asyncio.Future[None]] = field(default_factory=deque)
+    # When the token bucket is full again; forgetting the host is harmless after that.
+    full_at: float = 0.0
+
+    def idle(self, now: float) -> bool:
+        return self.in_flight == 0 and not self.waiters and self.full_at <= now
+
+
+class HostScheduler:
+    """Limit how hard each host is hit while other hosts proceed at full speed.
+
+    At most ``max_per_host`` requests run against one host at a time. Requests
+    are additionally spaced by a token bucket per host that refills at ``rate``
+    requests per second with room for ``burst`` back-to-back requests. A
+    ``Crawl-delay`` published in robots.txt slows the bucket down further (to one
+    request per delay, capped at ``max_crawl_delay`` seconds) unless
+    ``respect_crawl_delay`` is False.
+    """
+
+    def __init__(
+            self,
+            *,
+            max_per_host: int = DEFAULT_MAX_PER_HOST,
+            rate: float | None = None,
+            burst: int = 1,
+            respect_crawl_delay: bool = True,
+            max_crawl_delay: float = DEFAULT_MAX_CRAWL_DELAY,
+    ) -> None:
+        if max_per_host < 1:
+            raise ValueError("max_per_host must be at least 1")
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.max_per_host = max_per_host
+        self.rate = rate
+        self.burst = burst
+        self.respect_crawl_delay = respect_crawl_delay
+        self.max_crawl_delay = max_crawl_delay
+        self._hosts: dict[str, _HostState] = {}
+        self._prune_at = _PRUNE_HOSTS
+
+    def in_flight(self, url: str) -> int:
+        """Return the number of requests currently holding a slot for ``url``'s host."""
+        state = self._hosts.get(host_key(url))
+        return state.in_flight if state is not None else 0
+
+    @asynccontextmanager
+    async def slot(self, url: str, *, crawl_delay: float | None = None) -> AsyncIterator[None]:
+        """Hold one of the host's request slots for the duration of the block."""
+        await self.acquire(url, crawl_delay=crawl_delay)
+        try:
+            yield
+        finally:
+            self.release(url)
+
+    async def acquire(self, url: str, *, crawl_delay: float | None = None) -> None:
+        """Wait until a request to ``url`` is allowed and take a slot for it."""
+        state = self._state(host_key(url))
+        while state.in_flight >= self.max_per_host:
+            waiter = asyncio.get_running_loop().create_future()
+            state.waiters.append(waiter)
+            try:
+                await waiter
+            except BaseException:
+                if waiter in state.waiters:
+                    state.waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # Woken but cancelled before taking the slot: pass the wakeup on.
+                    self._wake_next(state)
+                raise
+        state.in_flight += 1
+        try:
+            delay = self._reserve_token(state, crawl_delay)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._release_state(state)
+            raise
+
+    def release(self, url: str) -> None:
+        """Give back the slot taken by ``acquire``."""
+        host = host_key(url)
+        state = self._hosts.get(host)
+        if state is not None:
+            self._release_state(state)
+            if state.idle(time.monotonic()):
+                del self._hosts[host]
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            if len(self._hosts) >= self._prune_at:
+                self._prune()
+            state = self._hosts[host] = _HostState(tokens=self.burst, updated=time.monotonic())
+        return state
+
+    def _prune(self) -> None:
+        """Forget idle hosts whose token bucket has refilled."""
+        now = time.monotonic()
+        for host, state in list(self._hosts.items()):
+            if state.idle(now):
+                del self._hosts[host]
+        self._prune_at = max(_PRUNE_HOSTS, 2 * len(self._hosts))
+
+    def _interval(self, crawl_delay: float | None) -> tuple[float, int]:
+        """Return the seconds per token and bucket size for a host."""
+        interval = 1.0 / self.rate if self.rate else 0.0
+        if self.respect_crawl_delay and crawl_delay and crawl_delay > 0:
+            delay = min(crawl_delay, self.max_crawl_delay)
+            if delay >= interval:
+                return delay, 1
+        return interval, self.burst
+
+    def _reserve_token(self, state: _HostState, crawl_delay: float | None) -> float:
+        """Take a token, possibly going into debt, and return how long to wait for it."""
+        interval, capacity = self._interval(crawl_delay)
+        now = time.monotonic()
+        if interval <= 0:
+            state.tokens, state.updated, state.full_at = capacity, now, now
+            return 0.0
+        state.tokens = min(capacity, state.tokens + (now - state.updated) / interval)
+        state.updated = now
+        state.tokens -= 1
+        state.full_at = now + (capacity - state.tokens) * interval
+        return -state.tokens * interval if state.tokens < 0 else 0.0
+
+    def _release_state(self, state: _HostState) -> None:
+        state.in_flight -= 1
+        self._wake_next(state)
+
+    def _wake_next(self, state: _HostState) -> None:
+        while state.waiters:
+            waiter = state.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+
+async def run_fair(
+        urls: Iterable[str] | AsyncIterable[str],
+        handle: Callable[[str], Awaitable[_T]],
+        *,
+        concurrency: int,
+        max_per_host: int | None = None,
+        refill: bool = False,
+) -> AsyncIterator[_T]:
+    """Run ``handle`` on ``urls``, interleaving hosts round-robin, and yield results.
+
+    At most ``concurrency`` calls run at once and at most ``max_per_host`` of them
+    target the same host, so one large host cannot occupy every slot while URLs
+    for other hosts wait behind it. ``urls``, which may be an async iterable, is
+    read lazily with a small lookahead; results are yielded in completion order.
+
+    With ``refill``, an exhausted ``urls`` iterator is polled again after every
+    result, so the consumer may add URLs while handling results (a crawl
+    frontier). The run ends once it stays empty with nothing in flight.
+    """
+    per_host_limit = max_per_host or concurrency
+    lookahead = concurrency * _LOOKAHEAD_PER_SLOT
+    if isinstance(urls, AsyncIterable):
+        pending_urls = aiter(urls)
+
+        async def next_url() -> str:
+            return await anext(pending_urls)
+    else:
+        pending_urls = iter(urls)
+
+        async def next_url() -> str:
+            try:
+                return next(pending_urls)
+            except StopIteration:
+                raise StopAsyncIteration from None
+    queues: OrderedDict[str, deque[str]] = OrderedDict()
+    active_per_host: dict[str, int] = {}
+    running: dict[asyncio.Task[_T], str] = {}
+    buffered = 0
+    exhausted = False
+
+    try:
+        while True:
+            dispatched = True
+            while dispatched and len(running) < concurrency:
+                dispatched = False
+                while not exhausted and buffered < lookahead:
+                    try:
+                        url = await next_url()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    queues.setdefault(host_key(url), deque()).append(url)
+                    buffered += 1
+                for host in list(queues):
+                    if len(running) >= concurrency:
+                        break
+                    if active_per_host.get(host, 0) >= per_host_limit:
+                        continue
+                    queue = queues[host]
+                    url = queue.popleft()
+                    buffered -= 1
+                    if queue:
+                        queues.move_to_end(host)
+                    else:
+                        del queues[host]
+                    active_per_host[host] = active_per_host.get(host, 0) + 1
+                    running[asyncio.ensure_future(handle(url))] = host
+                    dispatched = True
+
+            if not running:
+                return
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                host = running.pop(task)
+                active_per_host[host] -= 1
+                if not active_per_host[host]:
+                    del active_per_host[host]
+                yield task.result()
+            if refill:
+                exhausted = False
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        if isinstance(pending_urls, AsyncGenerator):
+            await pending_urls.aclose()
+
+
+__all__ = [
+    "DEFAULT_MAX_CRAWL_DELAY",
+    "DEFAULT_MAX_PER_HOST",
+    "HostScheduler",
+    "host_key",
+    "run_fair",
+]
@@ -0,0 +1,475 @@
+"""Long-running JSON conversion server speaking a minimal subset of HTTP/1.1."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from concurrent.futures import Executor
+from contextlib import AsyncExitStack
+from http import HTTPStatus
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from extract2md._fetch import DEFAULT_USER_AGENT, create_client
+from extract2md._http_cache import http_cache_for
+from extract2md._links import REWRITE_HTML, REWRITE_MODES
+from extract2md._metrics import StageMetrics, observe
+from extract2md._result_cache import ResultCache
+from extract2md._retry import RetryPolicy
+from extract2md._robots import RobotsCache
+from extract2md._scheduler import HostScheduler
+from extract2md.converters import (
+    DEFAULT_CONVERTER,
+    converter_chain,
+    get_converter,
+    get_converter_names,
+)
+from extract2md.core import DEFAULT_CONCURRENCY, _convert_one, ahtml_to_markdown
+from extract2md.models import (
+    Extract2MarkdownContentTypeError,
+    Extract2MarkdownError,
+    Extract2MarkdownFetchError,
+    Extract2MarkdownToMarkdownError,
+)
+
+if TYPE_CHECKING:
+    from httpx import AsyncClient
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_QUEUE = 100
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+_PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_MAX_HEADER_LINES = 100
+
+
+class _HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class ConversionServer:
+    """Serve ``POST /convert`` jobs with warm converters and one pooled HTTP client.
+
+    A job is a JSON object with either ``url`` (fetched like ``fetch_to_markdown``)
+    or ``html`` (converted like ``html_to_markdown``), plus the optional keys
+    ``base_url``, ``content_type``, ``converter``, ``rewrite_relative_urls`` and
+    ``rewrite_mode``. At most ``concurrency`` jobs run at once; up to ``max_queue``
+    more wait for a slot and further jobs are rejected with ``503``.
+    ``GET /health`` reports the number of running and queued jobs and
+    ``GET /metrics`` exports them together with the time spent in each pipeline
+    stage in the Prometheus text format. With
+    ``scheduler``, URL jobs for the same host are paced by its per-host limits.
+    Conversions run on ``executor`` (default: the loop's thread pool).
+    """
+
+    def __init__(
+            self,
+            *,
+            concurrency: int = DEFAULT_CONCURRENCY,
+            max_queue: int = DEFAULT_MAX_QUEUE,
+            user_agent: str | None = None,
+            ignore_robots_txt: bool = False,
+            proxy_url: str | None = None,
+            timeout: float = 30.0,
+            robots_cache: RobotsCache | None = None,
+            max_bytes: int | None = None,
+            cache_dir: Path | str | None = None,
+            converter: str | None = None,
+            result_cache: ResultCache | None = None,
+            scheduler: HostScheduler | None = None,
+            retry: RetryPolicy | None = None,
+            executor: Executor | None = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.user_agent = user_agent or DEFAULT_USER_AGENT
+        self.ignore_robots_txt = ignore_robots_txt
+        self.proxy_url = proxy_url
+        self.timeout = timeout
+        self.robots_cache = robots_cache or RobotsCache()
+        self.max_bytes = max_bytes
+        self.http_cache = http_cache_for(cache_dir)
+        self.converter = converter or DEFAULT_CONVERTER
+        self.result_cache = result_cache
+        self.scheduler = scheduler
+        self.retry = retry
+        self.executor = executor
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.metrics = StageMetrics()
+        self._slots: asyncio.Semaphore | None = None
+        self._exit_stack: AsyncExitStack | None = None
+        self._client: AsyncClient | None = None
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(
+            self,
+            *,
+            host: str = DEFAULT_HOST,
+            port: int = DEFAULT_PORT,
+            unix_socket: Path | str | None = None,
+    ) -> asyncio.AbstractServer:
+        """Warm up the converter, open the HTTP client and start listening."""
+        await asyncio.to_thread(_warm_up, self.converter)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._exit_stack = AsyncExitStack()
+        self._client = await self._exit_stack.enter_async_context(
+            create_client(
+                proxy_url=self.proxy_url,
+                timeout=self.timeout,
+                max_connections=self.concurrency,
+            )
+        )
+        if unix_socket is not None:
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path=str(unix_socket)
+            )
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def close(self) -> None:
+        """Stop accepting connections and release the HTTP client."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+        if self.result_cache is not None:
+            self.result_cache.close()
+
+    async def serve_forever(
+            self,
+            *,
+            host: str = DEFAULT_HOST,
+            port: int = DEFAULT_PORT,
+            unix_socket: Path | str | None = None,
+    ) -> None:
+        """Start the server and handle requests until cancelled."""
+        server = await self.start(host=host, port=port, unix_socket=unix_socket)
+        try:
+            await server.serve_forever()
+        finally:
+            await self.close()
+
+    def stats(self) -> dict[str, int]:
+        """Return the current load of the server."""
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+        }
+
+    async def _handle_connection(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter,
+    ) -> None:
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except _HttpError as exc:
+                    await _write_response(writer, exc.status, {"error": str(exc)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, payload, extra_headers = await self._dispatch(method, path, body)
+                except Exception as exc:  # noqa: BLE001 - answered with 500, then the connection closes
+                    await _write_response(
+                        writer,
+                        HTTPStatus.INTERNAL_SERVER_ERROR,
+                        {"error": str(exc), "type": type(exc).__name__},
+                        keep_alive=False,
+                    )
+                    break
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await _write_response(
+                    writer, status, payload, keep_alive=keep_alive, headers=extra_headers
+                )
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def render_metrics(self) -> str:
+        """Return the stage timings and server load in the Prometheus text format."""
+        stats = self.stats()
+        return self.metrics.render_prometheus(
+            counters={
+                "jobs_completed_total": stats["completed"],
+                "jobs_failed_total": stats["failed"],
+            },
+            gauges={
+                "jobs_active": stats["active"],
+                "jobs_queued": stats["queued"],
+                "concurrency": stats["concurrency"],
+                "max_queue": stats["max_queue"],
+            },
+        )
+
+    async def _dispatch(
+            self,
+            method: str,
+            path: str,
+            body: bytes,
+    ) -> tuple[HTTPStatus, dict[str, Any] | str, dict[str, str]]:
+        route = path.split("?", 1)[0]
+        if route == "/health":
+            if method != "GET":
+                return _method_not_allowed("GET")
+            return HTTPStatus.OK, {"status": "ok", **self.stats()}, {}
+        if route == "/metrics":
+            if method != "GET":
+                return _method_not_allowed("GET")
+            return HTTPStatus.OK, self.render_metrics(), {}
+        if route == "/convert":
+            if method != "POST":
+                return _method_not_allowed("POST")
+            try:
+                job = _parse_job(body)
+            except _HttpError as exc:
+                return exc.status, {"error": str(exc)}, {}
+            return await self._run_job(job)
+        return HTTPStatus.NOT_FOUND, {"error": f"No route for {route}"}, {}
+
+    async def _run_job(
+            self,
+            job: dict[str, Any],
+    ) -> tuple[HTTPStatus, dict[str, Any], dict[str, str]]:
+        assert self._slots is not None
+        if self._slots.locked() and self.queued >= self.max_queue:
+            return (
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": "Conversion queue is full", **self.stats()},
+                {"Retry-After": "1"},
+            )
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        self.active += 1
+        try:
+            with observe(self.metrics):
+                markdown, error = await self._convert(job)
+        except Exception as exc:  # noqa: BLE001 - e.g. a converter bug; answered with 500
+            markdown, error = None, exc
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+        if error is not None:
+            self.failed += 1
+            return (
+                _status_for(error),
+                {"error": str(error), "type": type(error).__name__, "url": job.get("url")},
+                {},
+            )
+        self.completed += 1
+        return HTTPStatus.OK, {"markdown": markdown, "url": job.get("url")}, {}
+
+    async def _convert(self, job: dict[str, Any]) -> tuple[str | None, Exception | None]:
+        converter = job.get("converter") or self.converter
+        rewrite_relative_urls = job.get("rewrite_relative_urls", True)
+        rewrite_mode = job.get("rewrite_mode") or REWRITE_HTML
+        if "html" in job:
+            try:
+                markdown = await ahtml_to_markdown(
+                    job["html"],
+                    job.get("content_type"),
+                    base_url=job.get("base_url"),
+                    rewrite_relative_urls=rewrite_relative_urls,
+                    rewrite_mode=rewrite_mode,
+                    converter=converter,
+                    result_cache=self.result_cache,
+                    executor=self.executor,
+                )
+            except (Extract2MarkdownError, ValueError) as exc:
+                return None, exc
+            return markdown, None
+
+        assert self._client is not None
+        result = await _convert_one(
+            self._client,
+            job["url"],
+            user_agent=self.user_agent,
+            ignore_robots_txt=self.ignore_robots_txt,
+            proxy_url=self.proxy_url,
+            timeout=self.timeout,
+            robots_cache=self.robots_cache,
+            max_bytes=self.max_bytes,
+            http_cache=self.http_cache,
+            rewrite_relative_urls=rewrite_relative_urls,
+            rewrite_mode=rewrite_mode,
+            converter=converter,
+            result_cache=self.result_cache,
+            scheduler=self.scheduler,
+            retry=self.retry,
+            executor=self.executor,
+            base_url=job.get("base_url"),
+        )
+        return result.markdown, result.error
+
+
+def _warm_up(converter: str) -> None:
+    try:
+        get_converter(converter).convert("<html><body><p>warm-up</p></body></html>")
+    except Extract2MarkdownError:
+        pass
+
+
+def _parse_job(body: bytes) -> dict[str, Any]:
+    try:
+        job = json.loads(body or b"null")
+    except ValueError as exc:
+        raise _HttpError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {exc}") from exc
+    if not isinstance(job, dict):
+        raise _HttpError(HTTPStatus.BAD_REQUEST, "Expected a JSON object")
+    if ("url" in job) == ("html" in job):
+        raise _HttpError(HTTPStatus.BAD_REQUEST, "Provide exactly one of 'url' or 'html'")
+    source = job.get("url", job.get("html"))
+    if not isinstance(source, str):
+        raise _HttpError(HTTPStatus.BAD_REQUEST, "'url' and 'html' must be strings")
+    for key in ("base_url", "content_type"):
+        if job.get(key) is not None and not isinstance(job[key], str):
+            raise _HttpError(HTTPStatus.BAD_REQUEST, f"'{key}' must be a string")
+    if job.get("rewrite_mode", REWRITE_HTML) not in REWRITE_MODES:
+        raise _HttpError(
+            HTTPStatus.BAD_REQUEST,
+            f"'rewrite_mode' must be one of: {', '.join(REWRITE_MODES)}",
+        )
+    if not isinstance(job.get("rewrite_relative_urls", True), bool):
+        raise _HttpError(HTTPStatus.BAD_REQUEST, "'rewrite_relative_urls' must be a boolean")
+    converter = job.get("converter")
+    if converter is not None:
+        if not isinstance(converter, str):
+            raise _HttpError(HTTPStatus.BAD_REQUEST, "'converter' must be a string")
+        _check_converter(converter)
+    return job
+
+
+def _check_converter(name: str) -> None:
+    """Reject unknown converter names without importing any converter backend."""
+    try:
+        chain = converter_chain(name)
+    except Extract2MarkdownError as exc:
+        raise _HttpError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+    names = get_converter_names()
+    if chain == (name,) and name not in names:
+        raise _HttpError(
+            HTTPStatus.BAD_REQUEST,
+            f"Unknown converter '{name}'. Available: {', '.join(names)}",
+        )
+
+
+def _status_for(error: Exception) -> HTTPStatus:
+    if isinstance(error, Extract2MarkdownFetchError):
+        return HTTPStatus.BAD_GATEWAY
+    if isinstance(error, (Extract2MarkdownContentTypeError, Extract2MarkdownToMarkdownError)):
+        return HTTPStatus.UNPROCESSABLE_ENTITY
+    if isinstance(error, ValueError):
+        return HTTPStatus.BAD_REQUEST
+    return HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+def _method_not_allowed(allowed: str) -> tuple[HTTPStatus, dict[str, Any], dict[str, str]]:
+    return (
+        HTTPStatus.METHOD_NOT_ALLOWED,
+        {"error": f"Use {allowed}"},
+        {"Allow": allowed},
+    )
+
+
+async def _read_request(
+        reader: asyncio.StreamReader,
+) -> tuple[str, str, dict[str, str], bytes] | None:
+    request_line = await _read_line(reader, HTTPStatus.REQUEST_URI_TOO_LONG, "Request line too long")
+    if not request_line:
+        return None
+    try:
+        method, path, _version = request_line.decode("latin-1").split()
+    except ValueError as exc:
+        raise _HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line") from exc
+
+    headers: dict[str, str] = {}
+    for _ in range(_MAX_HEADER_LINES):
+        line = await _read_line(reader, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Header line too long")
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise _HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers")
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError as exc:
+        raise _HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from exc
+    if length > MAX_REQUEST_BYTES:
+        raise _HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+    body = await reader.readexactly(length) if length > 0 else b""
+    return method.upper(), path, headers, body
+
+
+async def _read_line(reader: asyncio.StreamReader, status: HTTPStatus, message: str) -> bytes:
+    """Read one line, answering ``status`` when it exceeds the stream's limit."""
+    try:
+        return await reader.readline()
+    except ValueError as exc:  # the line overran the StreamReader limit
+        raise _HttpError(status, message) from exc
+
+
+async def _write_response(
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        payload: dict[str, Any] | str,
+        *,
+        keep_alive: bool,
+        headers: dict[str, str] | None = None,
+) -> None:
+    if isinstance(payload, str):
+        body = payload.encode("utf-8")
+        content_type = _PROMETHEUS_CONTENT_TYPE
+    else:
+        body = json.dumps(payload).encode("utf-8")
+        content_type = "application/json"
+    lines = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+__all__ = [
+    "DEFAULT_HOST",
+    "DEFAULT_MAX_QUEUE",
+    "DEFAULT_PORT",
+    "ConversionServer",
+]
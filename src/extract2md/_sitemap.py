@@ -0,0 +1,254 @@
+"""Streaming discovery of page URLs from sitemaps and sitemap indexes."""
+
+from __future__ import annotations
+
+import gzip
+import re
+import tempfile
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import IO, TYPE_CHECKING
+from urllib.parse import urljoin, urlsplit
+
+from extract2md._fetch import _check_size
+from extract2md._robots import DEFAULT_ROBOTS_CACHE
+from extract2md.models import Extract2MarkdownFetchError
+
+if TYPE_CHECKING:
+    from httpx import AsyncClient
+
+    from extract2md._robots import RobotsCache
+
+# Downloaded sitemaps stay in memory up to this size and are spooled to disk beyond it.
+SPOOL_BYTES = 1024 * 1024
+# The size limit of the sitemap protocol, applied to the download and to the
+# decompressed XML so that a gzip bomb cannot fill the disk or the memory.
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_SITEMAP_SUFFIXES = (".xml", ".xml.gz")
+_W3C_DATETIME = re.compile(
+    r"(\d{4})(?:-(\d{2})(?:-(\d{2})"
+    r"(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.\d+)?)?\s*(Z|[+-]\d{2}:?\d{2})?)?)?)?"
+)
+
+
+@dataclass(frozen=True)
+class SitemapEntry:
+    """A ``<url>`` of a sitemap, or a ``<sitemap>`` of a sitemap index."""
+
+    loc: str
+    lastmod: datetime | None = None
+    is_sitemap: bool = False
+
+
+def parse_lastmod(value: str | None) -> datetime | None:
+    """Parse a W3C datetime (``2024``, ``2024-05-01``, ``2024-05-01T10:00:00Z``, ...).
+
+    Values without a time zone are taken as UTC; unparseable values give ``None``.
+    """
+    match = _W3C_DATETIME.fullmatch(value.strip()) if value else None
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, zone = match.groups()
+    tz = timezone.utc
+    if zone and zone != "Z":
+        sign = -1 if zone[0] == "-" else 1
+        digits = zone[1:].replace(":", "")
+        tz = timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:])))
+    try:
+        return datetime(
+            int(year), int(month or 1), int(day or 1),
+            int(hour or 0), int(minute or 0), int(second or 0),
+            tzinfo=tz,
+        )
+    except ValueError:
+        return None
+
+
+def iter_sitemap_entries(
+        source: IO[bytes],
+        *,
+        max_bytes: int | None = MAX_SITEMAP_BYTES,
+) -> Iterator[SitemapEntry]:
+    """Yield the entries of a sitemap or sitemap index read from ``source``.
+
+    ``source`` may be gzip-compressed. It is parsed incrementally and every
+    entry is discarded once yielded, so memory stays flat however many entries
+    the sitemap has. XML beyond ``max_bytes`` (after decompression) is rejected.
+    """
+    from lxml.etree import XMLSyntaxError, iterparse
+
+    magic = source.read(2)
+    source.seek(0)
+    if magic == _GZIP_MAGIC:
+        source = gzip.GzipFile(fileobj=source, mode="rb")
+    events = iterparse(
+        _LimitedReader(source, max_bytes) if max_bytes is not None else source,
+        events=("end",),
+        tag=("{*}url", "{*}sitemap"),
+        resolve_entities=False,
+        no_network=True,
+        remove_comments=True,
+    )
+    try:
+        for _, element in events:
+            loc = lastmod = None
+            for child in element:
+                name = child.tag.rpartition("}")[2] if isinstance(child.tag, str) else None
+                if name == "loc":
+                    loc = (child.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = child.text
+            if loc:
+                yield SitemapEntry(
+                    loc=loc,
+                    lastmod=parse_lastmod(lastmod),
+                    is_sitemap=element.tag.endswith("sitemap"),
+                )
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    except (XMLSyntaxError, OSError, EOFError) as exc:
+        raise ValueError(f"Invalid sitemap: {exc}") from exc
+
+
+async def discover_sitemaps(
+        client: AsyncClient,
+        url: str,
+        *,
+        user_agent: str,
+        robots_cache: RobotsCache | None = None,
+) -> list[str]:
+    """Return the sitemaps to read for the site of ``url``.
+
+    ``url`` itself is used when it names a sitemap (``.xml`` or ``.xml.gz``).
+    Otherwise the ``Sitemap:`` lines of the host's robots.txt are used, falling
+    back to ``/sitemap.xml``.
+    """
+    if urlsplit(url).path.lower().endswith(_SITEMAP_SUFFIXES):
+        return [url]
+    rules = await (robots_cache or DEFAULT_ROBOTS_CACHE).rules_for(client, url, user_agent)
+    return rules.sitemaps() or [urljoin(url, "/sitemap.xml")]
+
+
+async def aiter_sitemap_urls(
+        client: AsyncClient,
+        url: str,
+        *,
+        user_agent: str,
+        robots_cache: RobotsCache | None = None,
+        since: datetime | None = None,
+        max_bytes: int | None = MAX_SITEMAP_BYTES,
+        on_error: Callable[[str, Extract2MarkdownFetchError], None] | None = None,
+) -> AsyncIterator[str]:
+    """Yield the page URLs listed in the sitemaps of ``url``'s site.
+
+    Sitemap indexes are followed breadth-first, each sitemap at most once. With
+    ``since``, pages and nested sitemaps whose ``lastmod`` is not newer are
+    skipped; entries without a ``lastmod`` are always kept. Sitemaps are
+    downloaded to a spool file first, so no connection is held open while the
+    yielded pages are being converted.
+
+    A sitemap that cannot be downloaded, exceeds ``max_bytes`` or is not valid
+    XML raises ``Extract2MarkdownFetchError``. With ``on_error`` it is passed
+    the sitemap URL and the error instead, and the other sitemaps are still read.
+    """
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    try:
+        queue = deque(
+            await discover_sitemaps(client, url, user_agent=user_agent, robots_cache=robots_cache)
+        )
+    except Extract2MarkdownFetchError as exc:
+        if on_error is None:
+            raise
+        on_error(url, exc)
+        return
+    seen = set(queue)
+    while queue:
+        sitemap_url = queue.popleft()
+        try:
+            spool = await _download(client, sitemap_url, user_agent, max_bytes)
+            with spool:
+                try:
+                    for entry in iter_sitemap_entries(spool, max_bytes=max_bytes):
+                        if since is not None and entry.lastmod is not None and entry.lastmod <= since:
+                            continue
+                        if not entry.is_sitemap:
+                            yield entry.loc
+                        elif entry.loc not in seen:
+                            seen.add(entry.loc)
+                            queue.append(entry.loc)
+                except ValueError as exc:
+                    raise Extract2MarkdownFetchError(f"{exc} ({sitemap_url})") from exc
+        except Extract2MarkdownFetchError as exc:
+            if on_error is None:
+                raise
+            on_error(sitemap_url, exc)
+
+
+async def _download(
+        client: AsyncClient,
+        url: str,
+        user_agent: str,
+        max_bytes: int | None,
+) -> IO[bytes]:
+    """Stream ``url`` into a spool file of at most ``max_bytes`` and return it rewound."""
+    from httpx import HTTPError, InvalidURL
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)  # noqa: SIM115
+    try:
+        async with client.stream(
+            "GET",
+            url,
+            follow_redirects=True,
+            headers={"User-Agent": user_agent},
+        ) as response:
+            if response.status_code >= 400:
+                raise Extract2MarkdownFetchError(
+                    f"Failed to fetch sitemap {url} - status code {response.status_code}",
+                    status_code=response.status_code,
+                )
+            _check_size(url, response.headers.get("content-length"), max_bytes)
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                _check_size(url, size, max_bytes)
+                spool.write(chunk)
+    except (HTTPError, InvalidURL) as exc:
+        spool.close()
+        raise Extract2MarkdownFetchError(f"Failed to fetch sitemap {url}: {exc!r}") from exc
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+class _LimitedReader:
+    """File-like view of ``source`` that raises ``ValueError`` past ``max_bytes``."""
+
+    def __init__(self, source: IO[bytes], max_bytes: int) -> None:
+        self._source = source
+        self._max_bytes = max_bytes
+        self._remaining = max_bytes
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._source.read(size if size >= 0 else self._remaining + 1)
+        self._remaining -= len(data)
+        if self._remaining < 0:
+            raise ValueError(f"Sitemap exceeds the limit of {self._max_bytes} bytes")
+        return data
+
+
+__all__ = [
+    "MAX_SITEMAP_BYTES",
+    "SitemapEntry",
+    "aiter_sitemap_urls",
+    "discover_sitemaps",
+    "iter_sitemap_entries",
+    "parse_lastmod",
+]
@@ -0,0 +1,143 @@
+"""Cheap HTML and charset detection on the first bytes of a document."""
+
+from __future__ import annotations
+
+import codecs
+import re
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from mmap import mmap
+
+SNIFF_BYTES = 4096
+FALLBACK_CHARSET = "cp1252"
+
+# Non-ASCII documents are validated as UTF-8 this many bytes at a time.
+_VALIDATE_CHUNK_BYTES = 1024 * 1024
+
+_BOMS: tuple[tuple[bytes, str], ...] = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+_META_CHARSET = re.compile(rb"<meta[^>]+?charset\s*=\s*[\"']?\s*([\w.:-]+)", re.IGNORECASE)
+_PREAMBLE = re.compile(r"\s*(?:<!--.*?-->|<\?.*?\?>|<!doctype[^>]*>)", re.IGNORECASE | re.DOTALL)
+_WHITESPACE = re.compile(r"\s*")
+_DOCUMENT_START = re.compile(r"<(?:html|head|body)[\s/>]", re.IGNORECASE)
+_PENDING_MARKERS: tuple[str, ...] = ("<!--", "<?", "<!doctype", "<html", "<head", "<body")
+
+
+def is_html_content_type(content_type: Any | None) -> bool:
+    """Return True when ``content_type`` is empty or declares HTML."""
+    content_type_value = str(content_type or "")
+    return not content_type_value or "text/html" in content_type_value.lower()
+
+
+def sniff_html(text: str) -> bool | None:
+    """Return whether ``text`` starts like an HTML document.
+
+    Leading whitespace, comments, processing instructions and the doctype are
+    skipped however long they are. ``None`` means ``text`` ends before the
+    answer is known, e.g. inside a long comment, so more input is needed.
+    """
+    position = 1 if text.startswith("\ufeff") else 0
+    while match := _PREAMBLE.match(text, position):
+        preamble = match.group().lstrip()
+        if preamble[:9].lower() == "<!doctype":
+            return "html" in preamble.lower()
+        position = match.end()
+
+    start = _WHITESPACE.match(text, position).end()
+    rest = text[start:start + 16]
+    if _DOCUMENT_START.match(rest):
+        return True
+    lowered = rest.lower()
+    if any(
+            marker.startswith(lowered) or lowered.startswith(marker)
+            for marker in _PENDING_MARKERS
+    ):
+        return None
+    return False
+
+
+def sniff_charset(prefix: bytes, content_type: str | None = None) -> str | None:
+    """Return the document encoding declared by a BOM, the header or a meta tag."""
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    header_match = _HEADER_CHARSET.search(content_type or "")
+    if header_match and _is_known_encoding(header_match.group(1)):
+        return header_match.group(1).lower()
+    meta_match = _META_CHARSET.search(prefix[:SNIFF_BYTES])
+    if meta_match:
+        encoding = meta_match.group(1).decode("ascii", errors="ignore").lower()
+        if encoding.startswith("utf-16"):
+            # A document readable as ASCII cannot really be UTF-16 encoded.
+            return "utf-8"
+        if _is_known_encoding(encoding):
+            return encoding
+    return None
+
+
+def sniff_prefix(prefix: bytes, content_type: str | None = None) -> tuple[bool | None, str | None]:
+    """Return ``(looks_like_html, charset)`` for the first bytes of a document."""
+    charset = sniff_charset(prefix, content_type)
+    text = prefix.decode(charset or "latin-1", errors="replace")
+    return sniff_html(text), charset
+
+
+def detect_charset(data: bytes | mmap, declared: str | None = None) -> str:
+    """Return the encoding to decode ``data`` with.
+
+    ``declared`` (e.g. from a BOM, header or ``<meta>``) wins. Otherwise UTF-8 is
+    assumed when the bytes are valid UTF-8 and windows-1252, the usual encoding
+    of undeclared legacy pages, when they are not.
+    """
+    if declared:
+        return declared
+    return "utf-8" if _is_utf8(data) else FALLBACK_CHARSET
+
+
+def decode_html(data: bytes | mmap, declared: str | None = None) -> str:
+    """Decode ``data`` once, falling back like ``detect_charset`` without a declaration."""
+    if declared:
+        return str(data, declared, "replace")
+    try:
+        return str(data, "utf-8")
+    except UnicodeDecodeError:
+        return str(data, FALLBACK_CHARSET, "replace")
+
+
+def _is_utf8(data: bytes | mmap) -> bool:
+    if isinstance(data, bytes) and data.isascii():
+        return True
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with memoryview(data) as view:
+        try:
+            for start in range(0, len(view), _VALIDATE_CHUNK_BYTES):
+                decoder.decode(view[start:start + _VALIDATE_CHUNK_BYTES])
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return False
+    return True
+
+
+def _is_known_encoding(name: str) -> bool:
+    try:
+        codecs.lookup(name)
+    except LookupError:
+        return False
+    return True
+
+
+__all__ = [
+    "FALLBACK_CHARSET",
+    "SNIFF_BYTES",
+    "decode_html",
+    "detect_charset",
+    "is_html_content_type",
+    "sniff_charset",
+    "sniff_html",
+    "sniff_prefix",
+]
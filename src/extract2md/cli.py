@@ -3,27 +3,120 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import json
 import sys
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any
 from urllib.parse import urlparse
 
-from .converters import DEFAULT_CONVERTER, get_converter_names
-from .core import DEFAULT_USER_AGENT, fetch, html_to_markdown
-from .models import Extract2MarkdownError
+from ._batch import DEFAULT_CHUNK_SIZE, convert_directory
+from ._crawl import DEFAULT_MAX_PAGES, crawl, output_path_for
+from ._dedup import DEFAULT_MAX_DISTANCE, DuplicateIndex
+from ._fetch import fetch_response
+from ._files import read_mapped, write_atomic
+from ._links import REWRITE_HTML, REWRITE_MODES
+from ._manifest import Manifest
+from ._metrics import STAGE_READ, StageMetrics, observe, timed
+from ._result_cache import ResultCache
+from ._retry import RetryPolicy
+from ._robots import DEFAULT_ROBOTS_TTL, RobotsCache
+from ._scheduler import DEFAULT_MAX_PER_HOST, HostScheduler
+from ._server import DEFAULT_HOST, DEFAULT_MAX_QUEUE, DEFAULT_PORT, ConversionServer
+from ._sitemap import parse_lastmod
+from .converters import DEFAULT_CONVERTER, converter_chain, get_converter_names
+from .core import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_USER_AGENT,
+    fetch_many_to_markdown,
+    html_to_markdown,
+)
+from .models import ConversionResult, Extract2MarkdownError
+
+OUTPUT_MARKDOWN = "markdown"
+OUTPUT_JSONL = "jsonl"
+OUTPUT_FORMATS: tuple[str, ...] = (OUTPUT_MARKDOWN, OUTPUT_JSONL)
 
 
 def build_parser() -> argparse.ArgumentParser:
     """Construct and return the CLI argument parser."""
     parser = argparse.ArgumentParser(
         description="Fetch a web page and output cleaned Markdown",
+        epilog=(
+            "Run 'extract2md batch --help' to convert whole directories of HTML files, "
+            "'extract2md crawl --help' to convert whole sites "
+            "or 'extract2md serve --help' to run a conversion server. "
+            "Convert a local file named like a subcommand as './batch' or '-- batch'."
+        ),
     )
-    converter_names = get_converter_names()
     parser.add_argument(
         "source",
+        nargs="?",
         help=(
             "URL to fetch, a local HTML file, or '-' to read HTML from stdin"
         ),
     )
+    parser.add_argument(
+        "--input",
+        metavar="FILE",
+        help=(
+            "Read URLs to convert from FILE ('-' for stdin), one per line, instead of "
+            "a single SOURCE; blank lines and lines starting with '#' are skipped"
+        ),
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        help=(
+            "Print Markdown, or one JSON record per document as it finishes "
+            "(default: markdown, or jsonl with --input)"
+        ),
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Number of URLs from --input converted at once (default: %(default)s)",
+    )
+    _add_dedup_arguments(parser)
+    _add_politeness_arguments(parser)
+    _add_fetch_arguments(parser)
+    parser.add_argument(
+        "--base-url",
+        help=(
+            "Optional base URL used to resolve relative links for stdin or file sources "
+            "(overrides automatic detection)"
+        ),
+    )
+    _add_conversion_arguments(parser)
+    _add_stats_argument(parser)
+    return parser
+
+
+def _add_politeness_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the per-host limits applied when many URLs are fetched."""
+    parser.add_argument(
+        "--max-per-host",
+        type=int,
+        default=DEFAULT_MAX_PER_HOST,
+        help="Maximum number of concurrent requests to one host (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--host-rate",
+        type=float,
+        help=(
+            "Maximum requests per second to one host (default: unlimited); a "
+            "robots.txt Crawl-delay slows a host down further"
+        ),
+    )
+
+
+def _add_fetch_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options controlling how URLs are fetched."""
     parser.add_argument(
         "--user-agent",
         help=(
@@ -35,6 +128,19 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Skip robots.txt validation (use with caution)",
     )
+    parser.add_argument(
+        "--robots-cache-dir",
+        help="Directory used to cache robots.txt rules between runs",
+    )
+    parser.add_argument(
+        "--robots-ttl",
+        type=float,
+        default=DEFAULT_ROBOTS_TTL,
+        help=(
+            "Seconds to cache robots.txt rules when the server sends no "
+            "Cache-Control max-age (default: %(default)s)"
+        ),
+    )
     parser.add_argument(
         "--proxy",
         help="Optional HTTP/HTTPS proxy URL",
@@ -45,6 +151,89 @@ def build_parser() -> argparse.ArgumentParser:
         default=30.0,
         help="Request timeout in seconds (default: 30)",
     )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=0,
+        help=(
+            "Retry timeouts, connection errors and 408/425/429/5xx responses this many "
+            "times with exponential backoff, honouring Retry-After (default: 0)"
+        ),
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        help="Abort downloads whose body exceeds this many bytes (default: no limit)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=(
+            "Directory for an HTTP cache; cached pages are revalidated with "
+            "ETag/Last-Modified instead of being downloaded again"
+        ),
+    )
+
+
+def _add_stats_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the flag printing per-stage timings when the run finishes."""
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print the time spent in each pipeline stage and the bytes handled as JSON on stderr",
+    )
+
+
+def _add_dedup_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options skipping duplicate URLs and near-duplicate pages."""
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help=(
+            "Skip URLs that differ from an earlier one only in tracking parameters, and do not "
+            "convert pages whose text nearly duplicates an earlier page"
+        ),
+    )
+    parser.add_argument(
+        "--dedup-index",
+        metavar="FILE",
+        help="Keep the page fingerprints of --dedup in an SQLite file across runs (implies --dedup)",
+    )
+    parser.add_argument(
+        "--dedup-distance",
+        type=int,
+        default=DEFAULT_MAX_DISTANCE,
+        help="Maximum number of differing SimHash bits of near-duplicates, 0-3 (default: %(default)s)",
+    )
+
+
+def _add_converter_argument(parser: argparse.ArgumentParser, help_text: str) -> None:
+    """Add ``--converter``, which also accepts a comma-separated fallback chain."""
+    parser.add_argument(
+        "--converter",
+        type=_converter_name,
+        default=DEFAULT_CONVERTER,
+        metavar="NAME",
+        help=(
+            f"{help_text}: {', '.join(get_converter_names())}, or converters separated by "
+            "commas to try in turn on the same page (default: %(default)s)"
+        ),
+    )
+
+
+def _converter_name(value: str) -> str:
+    """Validate ``--converter`` without importing any converter backend."""
+    try:
+        chain = converter_chain(value)
+    except Extract2MarkdownError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+    names = get_converter_names()
+    if chain == (value,) and value not in names:
+        raise argparse.ArgumentTypeError(f"invalid choice: {value!r} (choose from {', '.join(names)})")
+    return value
+
+
+def _add_conversion_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options controlling how HTML is converted."""
     parser.add_argument(
         "--rewrite-relative-urls",
         action=argparse.BooleanOptionalAction,
@@ -52,21 +241,217 @@ def build_parser() -> argparse.ArgumentParser:
         help="Rewrite relative href/src attributes (default: enabled)",
     )
     parser.add_argument(
-        "--base-url",
+        "--rewrite-mode",
+        choices=REWRITE_MODES,
+        default=REWRITE_HTML,
         help=(
-            "Optional base URL used to resolve relative links for stdin or file sources "
-            "(overrides automatic detection)"
+            "Rewrite links in the full HTML before conversion or only those left in "
+            "the Markdown output (default: %(default)s)"
         ),
     )
     parser.add_argument(
-        "--converter",
-        choices=converter_names,
-        default=DEFAULT_CONVERTER,
-        help="Choose the HTML conversion strategy (default: %(default)s)",
+        "--result-cache",
+        help=(
+            "SQLite file caching converted Markdown by HTML content and options, "
+            "so unchanged documents are not converted again"
+        ),
+    )
+    _add_converter_argument(parser, "Choose the HTML conversion strategy")
+
+
+def build_batch_parser() -> argparse.ArgumentParser:
+    """Construct and return the parser of the ``batch`` subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="extract2md batch",
+        description=(
+            "Convert every HTML file below a directory into Markdown files "
+            "mirrored below an output directory, using several processes"
+        ),
+    )
+    parser.add_argument("src", help="Directory containing .html/.htm/.xhtml files")
+    parser.add_argument("dst", help="Directory receiving the .md files")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Files handed to a worker at a time (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--encoding",
+        help=(
+            "Encoding of the HTML files (default: detected from the BOM or <meta charset>, "
+            "falling back to UTF-8 or windows-1252)"
+        ),
+    )
+    parser.add_argument(
+        "--rewrite-relative-urls",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Rewrite relative links against each file's URI (default: enabled)",
+    )
+    parser.add_argument(
+        "--rewrite-mode",
+        choices=REWRITE_MODES,
+        default=REWRITE_HTML,
+        help="Rewrite links in the HTML or in the Markdown (default: %(default)s)",
+    )
+    _add_converter_argument(parser, "Choose the HTML conversion strategy")
+    parser.add_argument(
+        "--manifest",
+        metavar="FILE",
+        help=(
+            "Record every converted file in an SQLite manifest and skip files whose size and "
+            "modification time, or content hash, are unchanged since the last run"
+        ),
+    )
+    _add_stats_argument(parser)
+    return parser
+
+
+def build_crawl_parser() -> argparse.ArgumentParser:
+    """Construct and return the parser of the ``crawl`` subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="extract2md crawl",
+        description=(
+            "Crawl a site breadth-first from START_URL, following the links of every "
+            "converted page (or reading its sitemaps), and print one JSON record per page "
+            "as it finishes"
+        ),
+    )
+    parser.add_argument("start_urls", nargs="+", metavar="START_URL", help="URL to start crawling from")
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        help=f"Maximum number of pages fetched (default: {DEFAULT_MAX_PAGES}, unlimited with --sitemap)",
     )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        help="Maximum number of links followed away from START_URL (default: unlimited)",
+    )
+    parser.add_argument(
+        "--same-host",
+        action="store_true",
+        help="Only follow links to the hosts of the START_URLs",
+    )
+    parser.add_argument(
+        "--sitemap",
+        action="store_true",
+        help=(
+            "Convert the pages listed in the sitemaps announced by robots.txt (or "
+            "/sitemap.xml, or START_URL itself when it is a .xml/.xml.gz sitemap) "
+            "instead of following links"
+        ),
+    )
+    parser.add_argument(
+        "--since",
+        type=_parse_since,
+        help="With --sitemap, skip pages whose lastmod is not newer than this ISO date or date-time",
+    )
+    parser.add_argument(
+        "--state-file",
+        help=(
+            "With --sitemap, read --since from FILE when not given and store the start "
+            "time of a run in which every page converted, for the next run"
+        ),
+    )
+    parser.add_argument(
+        "--output-dir",
+        help=(
+            "Write each page to DIR/<host>/<path>.md instead of embedding its Markdown "
+            "in the JSON record, which then names the file under 'output'"
+        ),
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="FILE",
+        help=(
+            "Record every converted page in an SQLite manifest; later runs revalidate pages "
+            "with their ETag/Last-Modified and skip those not modified or with unchanged HTML"
+        ),
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Number of pages fetched and converted at once (default: %(default)s)",
+    )
+    _add_dedup_arguments(parser)
+    _add_politeness_arguments(parser)
+    _add_fetch_arguments(parser)
+    _add_conversion_arguments(parser)
+    _add_stats_argument(parser)
+    return parser
+
+
+def build_serve_parser() -> argparse.ArgumentParser:
+    """Construct and return the parser of the ``serve`` subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="extract2md serve",
+        description=(
+            "Run a JSON conversion server: POST /convert with {\"url\": ...} or "
+            "{\"html\": ...}; GET /health reports running and queued jobs"
+        ),
+    )
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help="Interface to listen on (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help="TCP port to listen on (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--unix-socket",
+        help="Listen on this Unix domain socket instead of TCP",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum number of jobs converted at once (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=DEFAULT_MAX_QUEUE,
+        help=(
+            "Maximum number of jobs waiting for a free slot before new jobs are "
+            "rejected with 503 (default: %(default)s)"
+        ),
+    )
+    _add_politeness_arguments(parser)
+    _add_fetch_arguments(parser)
+    parser.add_argument(
+        "--result-cache",
+        help="SQLite file caching converted Markdown between jobs and restarts",
+    )
+    _add_converter_argument(parser, "Default conversion strategy for jobs that name none")
     return parser
 
 
+def _retry_policy(retries: int) -> RetryPolicy | None:
+    """Return the retry policy for ``--retries``."""
+    if retries < 0:
+        raise ValueError("--retries must not be negative")
+    return RetryPolicy(retries=retries) if retries else None
+
+
+def _duplicate_index(args: argparse.Namespace) -> DuplicateIndex | None:
+    """Return the duplicate index for ``--dedup``/``--dedup-index``, if requested."""
+    if not (args.dedup or args.dedup_index):
+        return None
+    return DuplicateIndex(args.dedup_index, max_distance=args.dedup_distance)
+
+
 def _is_url(value: str) -> bool:
     """Return True when ``value`` looks like an HTTP(S) URL."""
     parsed = urlparse(value)
@@ -75,47 +460,329 @@ def _is_url(value: str) -> bool:
 
 def main(argv: list[str] | None = None) -> int:
     """Entry point used by ``python -m extract2md`` and the console script."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in _SUBCOMMANDS:
+        return _SUBCOMMANDS[argv[0]](argv[1:])
+
     parser = build_parser()
     args = parser.parse_args(argv)
+    if not args.stats:
+        return _run(parser, args)
+    stats = StageMetrics()
+    try:
+        with observe(stats):
+            return _run(parser, args)
+    finally:
+        _write_stats(stats.as_dict())
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    output_format = args.output_format or (OUTPUT_JSONL if args.input else OUTPUT_MARKDOWN)
+
+    if args.input is not None:
+        if args.source is not None:
+            parser.error("pass either SOURCE or --input, not both")
+        if output_format != OUTPUT_JSONL:
+            parser.error("--input requires --output-format jsonl")
+        return _convert_many(parser, args, _read_sources(args.input))
+    if args.source is None:
+        parser.error("SOURCE or --input is required")
+    if output_format == OUTPUT_JSONL and _is_url(args.source):
+        return _convert_many(parser, args, [args.source])
 
+    started = time.perf_counter()
+    # Keeps a memory-mapped SOURCE file open until it has been converted.
+    files = ExitStack()
     try:
-        content, content_type = None, None
+        content, content_type, charset = None, None, None
         base_url: str | None = args.base_url
 
         if args.source == "-":
-            content = sys.stdin.read()
+            content = sys.stdin.buffer.read()
 
         elif _is_url(args.source):
             if base_url is None:
                 base_url = args.source
-            content, content_type = fetch(
+            response = fetch_response(
                 args.source,
                 user_agent=args.user_agent or DEFAULT_USER_AGENT,
                 ignore_robots_txt=args.ignore_robots,
                 proxy_url=args.proxy,
                 timeout=args.timeout,
+                robots_cache=RobotsCache(
+                    ttl=args.robots_ttl,
+                    cache_dir=args.robots_cache_dir,
+                ),
+                max_bytes=args.max_bytes,
+                require_html=True,
+                cache_dir=args.cache_dir,
+                retry=_retry_policy(args.retries),
             )
+            content, content_type, charset = response.body, response.content_type, response.charset
 
         else:
             source_path = Path(args.source)
-            content = source_path.read_text(encoding="utf-8")
+            with timed(STAGE_READ):
+                content = files.enter_context(read_mapped(source_path))
             if base_url is None:
                 base_url = source_path.resolve().as_uri()
 
         content = html_to_markdown(
             content,
             content_type,
+            charset=charset,
             base_url=base_url,
             rewrite_relative_urls=args.rewrite_relative_urls,
+            rewrite_mode=args.rewrite_mode,
+            converter=args.converter,
+            result_cache=ResultCache(path=args.result_cache) if args.result_cache else None,
+        )
+
+    except (Extract2MarkdownError, ValueError, OSError) as exc:
+        if output_format == OUTPUT_JSONL:
+            _write_record(_timed_result(args.source, started, error=exc))
+            return 1
+        parser.exit(1, f"error: {exc}\n")
+    finally:
+        files.close()
+
+    if output_format == OUTPUT_JSONL:
+        _write_record(_timed_result(args.source, started, markdown=content))
+    else:
+        print(content)
+
+    return 0
+
+
+def _convert_many(
+        parser: argparse.ArgumentParser,
+        args: argparse.Namespace,
+        urls: Iterable[str],
+) -> int:
+    """Convert ``urls`` concurrently and stream one JSON record per document."""
+    try:
+        results = fetch_many_to_markdown(
+            urls,
+            concurrency=args.concurrency,
+            user_agent=args.user_agent,
+            ignore_robots_txt=args.ignore_robots,
+            proxy_url=args.proxy,
+            timeout=args.timeout,
+            robots_cache=RobotsCache(ttl=args.robots_ttl, cache_dir=args.robots_cache_dir),
+            max_bytes=args.max_bytes,
+            cache_dir=args.cache_dir,
+            rewrite_relative_urls=args.rewrite_relative_urls,
+            rewrite_mode=args.rewrite_mode,
             converter=args.converter,
+            result_cache=ResultCache(path=args.result_cache) if args.result_cache else None,
+            scheduler=HostScheduler(max_per_host=args.max_per_host, rate=args.host_rate),
+            retry=_retry_policy(args.retries),
+            dedup=_duplicate_index(args),
         )
+        failed = 0
+        for result in results:
+            _write_record(result)
+            failed += not result.ok
+    except (ValueError, OSError) as exc:
+        parser.exit(1, f"error: {exc}\n")
+    return 1 if failed else 0
+
+
+def _read_sources(path: str) -> Iterator[str]:
+    """Yield the URLs listed in ``path`` (or stdin for ``-``) one line at a time."""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")  # noqa: SIM115
+    try:
+        for line in stream:
+            source = line.strip()
+            if source and not source.startswith("#"):
+                yield source
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _timed_result(
+        source: str,
+        started: float,
+        *,
+        markdown: str | None = None,
+        error: Exception | None = None,
+) -> ConversionResult:
+    """Return the record of a single file or stdin conversion."""
+    return ConversionResult(
+        url=source,
+        markdown=markdown,
+        error=error,
+        timings={"total": time.perf_counter() - started},
+    )
+
+
+def _write_record(result: ConversionResult, **overrides: Any) -> None:
+    record = {**result.to_record(), **overrides}
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _write_stats(stats: dict[str, dict[str, Any]]) -> None:
+    print(json.dumps(stats, sort_keys=True), file=sys.stderr)
+    sys.stdout.flush()
+
+
+def main_batch(argv: list[str]) -> int:
+    """Run the ``batch`` subcommand."""
+    parser = build_batch_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        summary = convert_directory(
+            args.src,
+            args.dst,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            converter=args.converter,
+            encoding=args.encoding,
+            rewrite_relative_urls=args.rewrite_relative_urls,
+            rewrite_mode=args.rewrite_mode,
+            collect_stats=args.stats,
+            manifest=Manifest(args.manifest) if args.manifest else None,
+        )
+    except (Extract2MarkdownError, ValueError, OSError) as exc:
+        parser.exit(1, f"error: {exc}\n")
+
+    if summary.stats is not None:
+        _write_stats(summary.stats)
+    for failure in summary.failures:
+        print(f"error: {failure.url}: {failure.error}", file=sys.stderr)
+    unchanged = f", {summary.skipped} unchanged" if args.manifest else ""
+    print(
+        f"converted {summary.converted} file(s), {summary.failed} failed{unchanged}",
+        file=sys.stderr,
+    )
+    return 1 if summary.failed else 0
+
+
+def main_crawl(argv: list[str]) -> int:
+    """Run the ``crawl`` subcommand."""
+    parser = build_crawl_parser()
+    args = parser.parse_args(argv)
+    if not args.stats:
+        return _crawl(parser, args)
+    stats = StageMetrics()
+    try:
+        with observe(stats):
+            return _crawl(parser, args)
+    finally:
+        _write_stats(stats.as_dict())
+
 
+def _crawl(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    if (args.since or args.state_file) and not args.sitemap:
+        parser.error("--since and --state-file require --sitemap")
+    if args.max_pages is None and not args.sitemap:
+        args.max_pages = DEFAULT_MAX_PAGES
+    started = datetime.now(timezone.utc)
+    try:
+        since = args.since
+        if since is None and args.state_file:
+            since = _read_state(args.state_file)
+        results = crawl(
+            args.start_urls,
+            max_pages=args.max_pages,
+            max_depth=args.max_depth,
+            same_host=args.same_host,
+            sitemap=args.sitemap,
+            since=since,
+            concurrency=args.concurrency,
+            user_agent=args.user_agent,
+            ignore_robots_txt=args.ignore_robots,
+            proxy_url=args.proxy,
+            timeout=args.timeout,
+            robots_cache=RobotsCache(ttl=args.robots_ttl, cache_dir=args.robots_cache_dir),
+            max_bytes=args.max_bytes,
+            cache_dir=args.cache_dir,
+            rewrite_relative_urls=args.rewrite_relative_urls,
+            rewrite_mode=args.rewrite_mode,
+            converter=args.converter,
+            result_cache=ResultCache(path=args.result_cache) if args.result_cache else None,
+            scheduler=HostScheduler(max_per_host=args.max_per_host, rate=args.host_rate),
+            retry=_retry_policy(args.retries),
+            output_dir=args.output_dir,
+            manifest=Manifest(args.manifest) if args.manifest else None,
+            dedup=_duplicate_index(args),
+        )
+        failed = 0
+        for result in results:
+            if args.output_dir is None or not result.ok or result.duplicate_of is not None:
+                _write_record(result)
+            else:
+                output = output_path_for(result.url, args.output_dir)
+                _write_record(result, markdown=None, output=str(output))
+            failed += not result.ok
+        if args.state_file and not failed:
+            write_atomic(Path(args.state_file), json.dumps({"last_run": started.isoformat()}) + "\n")
     except (Extract2MarkdownError, ValueError, OSError) as exc:
         parser.exit(1, f"error: {exc}\n")
+    return 1 if failed else 0
 
-    print(content)
 
+def _parse_since(value: str) -> datetime:
+    """Parse ``--since``; dates without a time zone are taken as UTC."""
+    since = parse_lastmod(value)
+    if since is None:
+        raise argparse.ArgumentTypeError(f"invalid ISO date or date-time: {value!r}")
+    return since
+
+
+def _read_state(path: str) -> datetime | None:
+    """Return the start time of the last complete run recorded in ``path``."""
+    try:
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    since = parse_lastmod(payload.get("last_run")) if isinstance(payload, dict) else None
+    if since is None:
+        raise ValueError(f"{path} is not a valid state file")
+    return since
+
+
+def main_serve(argv: list[str]) -> int:
+    """Run the ``serve`` subcommand until interrupted."""
+    parser = build_serve_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        server = ConversionServer(
+            concurrency=args.concurrency,
+            max_queue=args.max_queue,
+            user_agent=args.user_agent,
+            ignore_robots_txt=args.ignore_robots,
+            proxy_url=args.proxy,
+            timeout=args.timeout,
+            robots_cache=RobotsCache(ttl=args.robots_ttl, cache_dir=args.robots_cache_dir),
+            max_bytes=args.max_bytes,
+            cache_dir=args.cache_dir,
+            converter=args.converter,
+            result_cache=ResultCache(path=args.result_cache) if args.result_cache else None,
+            scheduler=HostScheduler(max_per_host=args.max_per_host, rate=args.host_rate),
+            retry=_retry_policy(args.retries),
+        )
+    except ValueError as exc:
+        parser.exit(1, f"error: {exc}\n")
+
+    address = args.unix_socket or f"http://{args.host}:{args.port}"
+    print(f"extract2md serving on {address}", file=sys.stderr)
+    try:
+        asyncio.run(
+            server.serve_forever(host=args.host, port=args.port, unix_socket=args.unix_socket)
+        )
+    except KeyboardInterrupt:
+        pass
+    except OSError as exc:
+        parser.exit(1, f"error: {exc}\n")
     return 0
 
 
+_SUBCOMMANDS = {"batch": main_batch, "crawl": main_crawl, "serve": main_serve}
+
+
 __all__ = ["main"]
@@ -3,12 +3,22 @@
 from __future__ import annotations
 
 import importlib
-import pkgutil
-from typing import Protocol
+import os
+import threading
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING, Protocol
 
 from extract2md.models import Extract2MarkdownConverterError
 
+if TYPE_CHECKING:
+    from lxml.html import HtmlElement
+
 DEFAULT_CONVERTER = "trafilatura"
+AUTO_CONVERTER = "auto"
+# Converters tried in turn by ``auto``, unless the environment names others.
+AUTO_CONVERTERS_ENV_VAR = "EXTRACT2MD_AUTO_CONVERTERS"
+DEFAULT_AUTO_CONVERTERS: tuple[str, ...] = ("trafilatura", "readability")
 
 
 class HtmlConverter(Protocol):
@@ -21,8 +31,54 @@ class HtmlConverter(Protocol):
         """Return Markdown content extracted from ``html``."""
 
 
+class TreeHtmlConverter(HtmlConverter, Protocol):
+    """Converter that can also consume an already parsed lxml document."""
+
+    def convert_tree(self, tree: HtmlElement) -> str:
+        """Return Markdown content extracted from the parsed ``tree``."""
+
+
+@dataclass(frozen=True)
+class ConverterSpec:
+    """Static description of a converter that can be imported on demand.
+
+    ``target`` is ``"module"`` for modules that call ``register_converter`` when
+    imported, or ``"module:attribute"`` naming a converter class or instance.
+    ``distributions`` names the installed packages whose versions determine its
+    output.
+    """
+
+    name: str
+    target: str
+    description: str = ""
+    distributions: tuple[str, ...] = ()
+
+
+ENTRY_POINT_GROUP = "extract2md.converters"
+
+_BUILTIN_CONVERTERS: tuple[ConverterSpec, ...] = (
+    ConverterSpec(
+        AUTO_CONVERTER,
+        "extract2md.converters.auto:FallbackConverter",
+        "Try each converter of a fallback chain until one extracts enough text",
+    ),
+    ConverterSpec(
+        "readability",
+        "extract2md.converters.readability",
+        "Readabilipy simple_json + markdownify",
+        ("readabilipy", "markdownify"),
+    ),
+    ConverterSpec(
+        "trafilatura",
+        "extract2md.converters.trafilatura",
+        "Trafilatura markdown output",
+        ("trafilatura",),
+    ),
+)
+
 _REGISTRY: dict[str, HtmlConverter] = {}
-_DISCOVERED = False
+_SPECS: dict[str, ConverterSpec] | None = None
+_LOCK = threading.Lock()
 
 
 def register_converter(converter: HtmlConverter) -> None:
@@ -30,46 +86,154 @@ def register_converter(converter: HtmlConverter) -> None:
     _REGISTRY[converter.name] = converter
 
 
-def _discover_converters() -> None:
-    """Import converter modules to populate the registry."""
-    global _DISCOVERED
-    if _DISCOVERED:
-        return
+def get_converter_specs() -> dict[str, ConverterSpec]:
+    """Return the available converters by name without importing any of them.
+
+    Built-in converters are listed in a static manifest; third-party packages can
+    add their own through the ``extract2md.converters`` entry point group, e.g.
+    ``myconv = "my_package.converter:MyConverter"``.
+    """
+    global _SPECS
+    if _SPECS is None:
+        specs = {spec.name: spec for spec in _entry_point_specs()}
+        specs.update((spec.name, spec) for spec in _BUILTIN_CONVERTERS)
+        _SPECS = specs
+    return _SPECS
+
+
+def _entry_point_specs() -> list[ConverterSpec]:
+    from importlib.metadata import entry_points
 
-    _DISCOVERED = True
-    package_prefix = __name__ + "."
-    for module_info in pkgutil.iter_modules(__path__, package_prefix):
-        importlib.import_module(module_info.name)
+    return [
+        ConverterSpec(
+            entry_point.name,
+            entry_point.value,
+            distributions=(entry_point.dist.name,) if entry_point.dist else (),
+        )
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP)
+    ]
 
 
-def _ensure_registry() -> None:
-    if not _DISCOVERED:
-        _discover_converters()
+def _load(spec: ConverterSpec) -> None:
+    module_name, _, attribute = spec.target.partition(":")
+    module = importlib.import_module(module_name)
+    if not attribute:
+        return
+    converter = getattr(module, attribute)
+    if isinstance(converter, type):
+        converter = converter()
+    _REGISTRY.setdefault(spec.name, converter)
 
 
 def get_converter(name: str | None = None) -> HtmlConverter:
-    """Return the registered converter matching ``name``."""
-    _ensure_registry()
+    """Return the converter matching ``name``, importing its backend on first use.
+
+    A comma-separated ``name`` such as ``"trafilatura,readability"`` returns a
+    fallback chain trying those converters in order, like ``"auto"`` does.
+    """
     selected_name = name or DEFAULT_CONVERTER
-    try:
-        return _REGISTRY[selected_name]
-    except KeyError as exc:  # pragma: no cover - simple defensive logic
-        available = ", ".join(sorted(_REGISTRY))
+    converter = _REGISTRY.get(selected_name)
+    if converter is not None:
+        return converter
+
+    if "," in selected_name:
+        from extract2md.converters.auto import FallbackConverter
+
+        chain = FallbackConverter(converter_chain(selected_name), name=selected_name)
+        with _LOCK:
+            return _REGISTRY.setdefault(selected_name, chain)
+
+    spec = get_converter_specs().get(selected_name)
+    if spec is not None:
+        with _LOCK:
+            if selected_name not in _REGISTRY:
+                try:
+                    _load(spec)
+                except (ImportError, AttributeError) as exc:
+                    raise Extract2MarkdownConverterError(
+                        f"Converter '{selected_name}' could not be loaded: {exc}"
+                    ) from exc
+        converter = _REGISTRY.get(selected_name)
+    if converter is None:
+        available = ", ".join(get_converter_names())
         raise Extract2MarkdownConverterError(
             f"Unknown converter '{selected_name}'. Available: {available}"
-        ) from exc
+        )
+    return converter
+
+
+def converter_chain(name: str | None = None) -> tuple[str, ...]:
+    """Return the converters that ``name`` tries in order, validating their names.
+
+    That is the comma-separated names of a chain, the ``EXTRACT2MD_AUTO_CONVERTERS``
+    list (default: trafilatura, then readability) for ``auto``, else ``name``
+    itself.
+    """
+    selected_name = name or DEFAULT_CONVERTER
+    if selected_name == AUTO_CONVERTER:
+        configured = os.environ.get(AUTO_CONVERTERS_ENV_VAR, "")
+        selected_name = configured if configured.strip() else ",".join(DEFAULT_AUTO_CONVERTERS)
+    elif "," not in selected_name:
+        return (selected_name,)
+    chain = tuple(part.strip() for part in selected_name.split(",") if part.strip())
+    known = get_converter_names()
+    for member in chain:
+        if member == AUTO_CONVERTER or member not in known:
+            available = ", ".join(known)
+            raise Extract2MarkdownConverterError(
+                f"Invalid converter '{member}' in fallback chain. Available: {available}"
+            )
+    if not chain:
+        raise Extract2MarkdownConverterError("A converter fallback chain needs at least one converter")
+    return chain
+
+
+def converter_version(name: str | None = None) -> str:
+    """Return a string that changes whenever converter ``name`` may convert differently.
+
+    It combines the versions of extract2md and of the converter's packages (of
+    every member for a fallback chain), without importing the converter.
+    """
+    selected_name = name or DEFAULT_CONVERTER
+    specs = get_converter_specs()
+    packages = ["extract2md"]
+    for member in converter_chain(selected_name):
+        spec = specs.get(member)
+        packages.extend(package for package in (spec.distributions if spec else ()) if package not in packages)
+    versions = " ".join(f"{package}=={_distribution_version(package)}" for package in packages)
+    chain = converter_chain(selected_name)
+    label = selected_name if chain == (selected_name,) else f"{selected_name}={','.join(chain)}"
+    return f"{label} {versions}"
+
+
+@cache
+def _distribution_version(package: str) -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return "unknown"
 
 
 def get_converter_names() -> list[str]:
-    """Return the known converter names."""
-    _ensure_registry()
-    return sorted(_REGISTRY.keys())
+    """Return the known converter names without importing their backends."""
+    return sorted(set(get_converter_specs()) | set(_REGISTRY))
 
 
 __all__ = [
+    "AUTO_CONVERTER",
+    "AUTO_CONVERTERS_ENV_VAR",
+    "DEFAULT_AUTO_CONVERTERS",
     "DEFAULT_CONVERTER",
+    "ENTRY_POINT_GROUP",
+    "ConverterSpec",
     "HtmlConverter",
+    "TreeHtmlConverter",
+    "converter_chain",
+    "converter_version",
     "get_converter",
     "get_converter_names",
+    "get_converter_specs",
     "register_converter",
 ]
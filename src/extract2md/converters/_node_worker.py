@@ -0,0 +1,190 @@
+"""Persistent subprocess workers speaking length-prefixed JSON over stdio."""
+
+from __future__ import annotations
+
+import json
+import queue
+import struct
+import subprocess
+import threading
+from collections.abc import Mapping, Sequence
+from typing import IO, Any
+
+from extract2md.models import Extract2MarkdownConverterError
+
+DEFAULT_TIMEOUT = 30.0
+
+_HEADER = struct.Struct(">I")
+
+
+class _WorkerExited(Exception):
+    """Raised internally when the worker process has gone away."""
+
+
+class NodeWorker:
+    """A single long-lived worker process handling one request at a time.
+
+    The process is started lazily, restarted after it crashes and killed when a
+    request exceeds ``timeout`` seconds.
+    """
+
+    def __init__(
+            self,
+            command: Sequence[str],
+            *,
+            env: Mapping[str, str] | None = None,
+            timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        self.command = list(command)
+        self.env = dict(env) if env is not None else None
+        self.timeout = timeout
+        self._process: subprocess.Popen[bytes] | None = None
+        self._responses: queue.Queue[dict[str, Any] | None] = queue.Queue()
+        self._next_id = 0
+
+    @property
+    def alive(self) -> bool:
+        """Return True while the worker process is running."""
+        return self._process is not None and self._process.poll() is None
+
+    def request(self, payload: Mapping[str, Any]) -> dict[str, Any]:
+        """Send ``payload`` to the worker and return its decoded response.
+
+        A worker that died before answering is restarted and the request is
+        retried once.
+        """
+        for attempt in range(2):
+            if not self.alive:
+                self._start()
+            try:
+                return self._round_trip(payload)
+            except _WorkerExited:
+                self.close()
+                if attempt:
+                    raise Extract2MarkdownConverterError(
+                        "Worker process exited while handling the document."
+                    ) from None
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def close(self) -> None:
+        """Terminate the worker process if it is running."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if process.stdin is not None:
+            try:
+                process.stdin.close()
+            except OSError:  # pragma: no cover - pipe already gone
+                pass
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+    def _start(self) -> None:
+        try:
+            process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                env=self.env,
+            )
+        except OSError as exc:
+            raise Extract2MarkdownConverterError(
+                f"Unable to start worker process {self.command[0]}: {exc}"
+            ) from exc
+        self._process = process
+        self._responses = queue.Queue()
+        reader = threading.Thread(
+            target=_read_frames,
+            args=(process.stdout, self._responses),
+            daemon=True,
+        )
+        reader.start()
+
+    def _round_trip(self, payload: Mapping[str, Any]) -> dict[str, Any]:
+        assert self._process is not None and self._process.stdin is not None
+        self._next_id += 1
+        request_id = self._next_id
+        body = json.dumps({**payload, "id": request_id}).encode("utf-8")
+        try:
+            self._process.stdin.write(_HEADER.pack(len(body)) + body)
+            self._process.stdin.flush()
+        except OSError as exc:
+            raise _WorkerExited from exc
+
+        try:
+            response = self._responses.get(timeout=self.timeout)
+        except queue.Empty:
+            self.close()
+            raise Extract2MarkdownConverterError(
+                f"Worker process did not answer within {self.timeout} seconds."
+            ) from None
+        if response is None:
+            raise _WorkerExited
+        if response.get("id") != request_id:
+            self.close()
+            raise Extract2MarkdownConverterError("Worker process answered out of order.")
+        if "error" in response:
+            raise Extract2MarkdownConverterError(
+                f"Worker process failed to handle the document: {response['error']}"
+            )
+        return response
+
+
+class NodeWorkerPool:
+    """Fixed-size pool of ``NodeWorker`` instances shared between threads."""
+
+    def __init__(
+            self,
+            command: Sequence[str],
+            *,
+            size: int = 1,
+            env: Mapping[str, str] | None = None,
+            timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self._workers = [
+            NodeWorker(command, env=env, timeout=timeout) for _ in range(size)
+        ]
+        self._idle: queue.LifoQueue[NodeWorker] = queue.LifoQueue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def request(self, payload: Mapping[str, Any]) -> dict[str, Any]:
+        """Run ``payload`` on the next idle worker, blocking until one is free."""
+        worker = self._idle.get()
+        try:
+            return worker.request(payload)
+        finally:
+            self._idle.put(worker)
+
+    def close(self) -> None:
+        """Terminate every worker process."""
+        for worker in self._workers:
+            worker.close()
+
+
+def _read_frames(
+        stream: IO[bytes],
+        responses: queue.Queue[dict[str, Any] | None],
+) -> None:
+    """Decode frames from ``stream`` until EOF, then post ``None``."""
+    try:
+        while True:
+            header = stream.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                break
+            (length,) = _HEADER.unpack(header)
+            body = stream.read(length)
+            if len(body) < length:
+                break
+            responses.put(json.loads(body.decode("utf-8")))
+    except (OSError, ValueError):
+        pass
+    finally:
+        responses.put(None)
+
+
+__all__ = ["DEFAULT_TIMEOUT", "NodeWorker", "NodeWorkerPool"]
@@ -0,0 +1,61 @@
+/*
+ * Long-running Readability.js worker used by extract2md.
+ *
+ * Requests and responses are framed as a 4-byte big-endian length followed by
+ * a UTF-8 JSON body. Requests look like {"id": 1, "html": "..."} and responses
+ * like {"id": 1, "article": {...}} or {"id": 1, "error": "..."}.
+ */
+
+'use strict';
+
+const { Readability } = require('@mozilla/readability');
+const { JSDOM } = require('jsdom');
+
+const HEADER_SIZE = 4;
+
+let chunks = [];
+let buffered = 0;
+
+function send(message) {
+	const body = Buffer.from(JSON.stringify(message), 'utf-8');
+	const header = Buffer.alloc(HEADER_SIZE);
+	header.writeUInt32BE(body.length, 0);
+	process.stdout.write(Buffer.concat([header, body]));
+}
+
+function handle(request) {
+	let dom;
+	try {
+		dom = new JSDOM(String(request.html || '').trim());
+		const article = new Readability(dom.window.document).parse();
+		send({ id: request.id, article: article });
+	} catch (err) {
+		send({ id: request.id, error: String((err && err.stack) || err) });
+	} finally {
+		if (dom) {
+			dom.window.close();
+		}
+	}
+}
+
+function drain() {
+	let buffer = Buffer.concat(chunks, buffered);
+	while (buffer.length >= HEADER_SIZE) {
+		const length = buffer.readUInt32BE(0);
+		if (buffer.length < HEADER_SIZE + length) {
+			break;
+		}
+		const body = buffer.subarray(HEADER_SIZE, HEADER_SIZE + length);
+		buffer = buffer.subarray(HEADER_SIZE + length);
+		handle(JSON.parse(body.toString('utf-8')));
+	}
+	chunks = buffer.length ? [buffer] : [];
+	buffered = buffer.length;
+}
+
+process.stdin.on('data', (chunk) => {
+	chunks.push(chunk);
+	buffered += chunk.length;
+	drain();
+});
+process.stdin.on('end', () => process.exit(0));
@@ -0,0 +1,109 @@
+"""Fallback chain trying several converters on the same parsed document."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from extract2md._parse import parse_html
+from extract2md.models import Extract2MarkdownConverterError
+
+from . import AUTO_CONVERTER, TreeHtmlConverter, converter_chain, get_converter
+
+if TYPE_CHECKING:
+    from lxml.html import HtmlElement
+
+# A result is accepted once it holds this many characters of text, or half the
+# page's text on shorter pages ...
+MIN_TEXT_CHARS = 250
+# ... and at least this share of the page's visible text.
+MIN_TEXT_RATIO = 0.1
+
+_VISIBLE_TEXT = (
+    "//body//text()[not(ancestor::script or ancestor::style"
+    " or ancestor::noscript or ancestor::template)]"
+)
+# Link and image targets, which say nothing about how much text was extracted.
+_MARKDOWN_TARGET = re.compile(r"\]\([^)]*\)")
+
+
+class FallbackConverter(TreeHtmlConverter):
+    """Try converters in order until one extracts enough of the page's text.
+
+    Every converter gets the same parsed document, so the page is fetched and
+    parsed once however many converters run. A converter falls through when it
+    fails or when its output holds less text than ``min_chars`` (half the page's
+    text on shorter pages) or than ``min_ratio`` of the page's visible text.
+    When none is good enough the longest output wins. Without ``names`` the
+    chain of ``auto`` is read from the environment again on every conversion.
+    """
+
+    def __init__(
+            self,
+            names: Iterable[str] | None = None,
+            *,
+            name: str = AUTO_CONVERTER,
+            min_chars: int = MIN_TEXT_CHARS,
+            min_ratio: float = MIN_TEXT_RATIO,
+    ) -> None:
+        self._names = tuple(names) if names is not None else None
+        self.name = name
+        self.min_chars = min_chars
+        self.min_ratio = min_ratio
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """Return the converters tried in order."""
+        return self._names if self._names is not None else converter_chain(AUTO_CONVERTER)
+
+    @property
+    def description(self) -> str:
+        return "Fallback chain: " + " -> ".join(self.names)
+
+    def convert(self, html: str) -> str:
+        return self.convert_tree(parse_html(html))
+
+    def convert_tree(self, tree: HtmlElement) -> str:
+        page_chars = _text_chars("".join(tree.xpath(_VISIBLE_TEXT)))
+        needed = max(min(self.min_chars, page_chars // 2), self.min_ratio * page_chars)
+        best: tuple[int, str] | None = None
+        html: str | None = None
+        errors: list[str] = []
+        for name in self.names:
+            try:
+                converter = get_converter(name)
+                convert_tree = getattr(converter, "convert_tree", None)
+                if convert_tree is not None:
+                    markdown = convert_tree(tree)
+                else:
+                    if html is None:
+                        html = _serialize(tree)
+                    markdown = converter.convert(html)
+            except Extract2MarkdownConverterError as exc:
+                errors.append(f"{name}: {exc}")
+                continue
+            chars = _text_chars(_MARKDOWN_TARGET.sub("]", markdown))
+            if chars >= needed:
+                return markdown
+            if best is None or chars > best[0]:
+                best = (chars, markdown)
+        if best is not None:
+            return best[1]
+        raise Extract2MarkdownConverterError(
+            "No converter of the fallback chain returned any content. " + " ".join(errors)
+        )
+
+
+def _text_chars(text: str) -> int:
+    """Return the number of non-whitespace characters in ``text``."""
+    return len("".join(text.split()))
+
+
+def _serialize(tree: HtmlElement) -> str:
+    from lxml.html import tostring
+
+    return tostring(tree, encoding="unicode")
+
+
+__all__ = ["MIN_TEXT_CHARS", "MIN_TEXT_RATIO", "FallbackConverter"]
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import atexit
 import os
+import shutil
+import threading
 from pathlib import Path
 
 import markdownify
@@ -11,6 +14,12 @@ import readabilipy.simple_json
 from extract2md.models import Extract2MarkdownConverterError
 
 from . import HtmlConverter, register_converter
+from ._node_worker import DEFAULT_TIMEOUT, NodeWorkerPool
+
+WORKER_SCRIPT = Path(__file__).with_name("_readability_worker.js")
+
+_pool: NodeWorkerPool | None = None
+_pool_lock = threading.Lock()
 
 
 class ReadabilityConverter(HtmlConverter):
@@ -21,10 +30,14 @@ class ReadabilityConverter(HtmlConverter):
 
     def convert(self, html: str) -> str:
         _ensure_node_path()
-        result = readabilipy.simple_json.simple_json_from_html_string(
-            html,
-            use_readability=True,
-        )
+        pool = _get_worker_pool()
+        if pool is None:
+            result = readabilipy.simple_json.simple_json_from_html_string(
+                html,
+                use_readability=True,
+            )
+        else:
+            result = pool.request({"html": html}).get("article")
         content = result.get("content") if isinstance(result, dict) else None
         if not content:
             raise Extract2MarkdownConverterError(
@@ -59,6 +72,48 @@ def _ensure_node_path() -> None:
     os.environ["PATH"] = os.pathsep.join([dir_str, *filtered_entries])
 
 
+def _get_worker_pool() -> NodeWorkerPool | None:
+    """Return the shared Readability.js worker pool, or None when unavailable.
+
+    The pool needs a ``node`` binary and the Node.js dependencies installed by
+    readabilipy. Without them the converter falls back to readabilipy, which
+    installs them or reverts to its pure-Python extraction.
+    """
+    global _pool
+    if _pool is not None:
+        return _pool
+
+    node_modules = Path(readabilipy.__file__).parent / "javascript" / "node_modules"
+    node_binary = shutil.which("node")
+    if node_binary is None or not node_modules.is_dir():
+        return None
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = NodeWorkerPool(
+                [node_binary, str(WORKER_SCRIPT)],
+                size=_env_int("EXTRACT2MD_READABILITY_WORKERS", min(4, os.cpu_count() or 1)),
+                env={**os.environ, "NODE_PATH": str(node_modules)},
+                timeout=_env_float("EXTRACT2MD_READABILITY_TIMEOUT", DEFAULT_TIMEOUT),
+            )
+            atexit.register(_pool.close)
+    return _pool
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ[name]))
+    except (KeyError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ[name])
+    except (KeyError, ValueError):
+        return default
+
+
 register_converter(ReadabilityConverter())
 
 __all__ = ["ReadabilityConverter"]
@@ -2,22 +2,33 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import trafilatura
 
 from extract2md.models import Extract2MarkdownConverterError
 
-from . import HtmlConverter, register_converter
+from . import TreeHtmlConverter, register_converter
+
+if TYPE_CHECKING:
+    from lxml.html import HtmlElement
 
 
-class TrafilaturaConverter(HtmlConverter):
+class TrafilaturaConverter(TreeHtmlConverter):
     """Use trafilatura.extract() to convert HTML into Markdown."""
 
     name = "trafilatura"
     description = "Trafilatura markdown output"
 
     def convert(self, html: str) -> str:
+        return self._extract(html)
+
+    def convert_tree(self, tree: HtmlElement) -> str:
+        return self._extract(tree)
+
+    def _extract(self, document: str | HtmlElement) -> str:
         result = trafilatura.extract(
-            html,
+            document,
             output_format="markdown",
             include_links=True,
         )
@@ -2,56 +2,249 @@
 
 from __future__ import annotations
 
+import asyncio
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import ExitStack, aclosing
+from contextvars import copy_context
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, TypeVar
 
+from extract2md._dedup import DuplicateIndex, canonical_url, html_fingerprint
 from extract2md._fetch import DEFAULT_USER_AGENT as _DEFAULT_USER_AGENT
-from extract2md._fetch import fetch_url
-from extract2md._html import to_markdown
-from extract2md._links import rewrite_relative_links
+from extract2md._fetch import (
+    FetchResponse,
+    _fetch_async,
+    create_client,
+    fetch_response,
+    fetch_url,
+)
+from extract2md._files import read_mapped
+from extract2md._html import to_markdown, to_markdown_with_links
+from extract2md._http_cache import HttpCache, http_cache_for
+from extract2md._links import REWRITE_HTML
+from extract2md._manifest import ManifestEntry, content_hash
+from extract2md._metrics import STAGE_READ, StageMetrics, is_observed, observe, timed
+from extract2md._result_cache import ResultCache
+from extract2md._retry import RetryPolicy
+from extract2md._robots import RobotsCache
+from extract2md._scheduler import HostScheduler, run_fair
+from extract2md._sniff import sniff_charset
+from extract2md.converters import converter_version
+from extract2md.models import ConversionResult, Extract2MarkdownError
+
+if TYPE_CHECKING:
+    from mmap import mmap
+
+    from httpx import AsyncClient
+
+DEFAULT_CONCURRENCY = 10
+
+_T = TypeVar("_T")
 
 DEFAULT_USER_AGENT = _DEFAULT_USER_AGENT
 
 
 def html_to_markdown(
-        html: str,
+        html: str | bytes | mmap,
         content_type: Any | None = None,
         *,
+        charset: str | None = None,
         base_url: str | None = None,
         rewrite_relative_urls: bool = True,
+        rewrite_mode: str = REWRITE_HTML,
         converter: str | None = None,
+        result_cache: ResultCache | None = None,
 ) -> str:
-    """Convert HTML into Markdown."""
+    """Convert HTML into Markdown.
+
+    ``rewrite_mode`` chooses where relative URLs are resolved: ``"html"`` rewrites
+    every href/src before conversion, ``"markdown"`` only the links and images
+    left in the converter output. With ``result_cache``, converting the same
+    HTML with the same options again returns the cached Markdown.
 
-    processed_html = (
-        rewrite_relative_links(html, base_url=base_url)
-        if rewrite_relative_urls
-        else html
+    ``html`` may be undecoded bytes, decoded with ``charset`` or else with the
+    encoding declared by a BOM, ``content_type`` or a ``<meta>`` tag.
+    """
+
+    resolved_base_url = base_url if rewrite_relative_urls else None
+    cache_key = _result_cache_key(
+        result_cache,
+        html,
+        charset=charset or _declared_charset(content_type),
+        converter=converter,
+        base_url=resolved_base_url,
+        rewrite_mode=rewrite_mode,
     )
-    return to_markdown(processed_html, content_type, converter=converter)
+    if cache_key is not None and (cached := result_cache.get(cache_key)) is not None:
+        return cached
 
+    markdown = to_markdown(
+        html,
+        content_type,
+        charset=charset,
+        converter=converter,
+        base_url=resolved_base_url,
+        rewrite_mode=rewrite_mode,
+    )
+    if cache_key is not None:
+        result_cache.set(cache_key, markdown)
+    return markdown
 
-def file_to_markdown(
-        path: Path | str,
+
+async def ahtml_to_markdown(
+        html: str | bytes | mmap,
+        content_type: Any | None = None,
         *,
-        encoding: str | None = "utf-8",
+        charset: str | None = None,
         base_url: str | None = None,
         rewrite_relative_urls: bool = True,
+        rewrite_mode: str = REWRITE_HTML,
         converter: str | None = None,
+        result_cache: ResultCache | None = None,
+        executor: Executor | None = None,
 ) -> str:
-    """Convert a local HTML file into Markdown."""
+    """Asynchronous variant of ``html_to_markdown``.
 
-    file_path = Path(path)
-    html = file_path.read_text(encoding=encoding)
-    resolved_base_url = base_url or file_path.resolve().as_uri()
-    return html_to_markdown(
+    The CPU-bound conversion runs on ``executor`` (default: the event loop's
+    default thread pool) so the loop stays responsive. A ``ProcessPoolExecutor``
+    spreads conversions over several cores, but its per-stage metrics stay in the
+    worker processes; the result cache is consulted in the calling thread either way.
+    """
+    markdown, _ = await _ahtml_to_markdown(
         html,
-        base_url=resolved_base_url,
+        content_type,
+        charset=charset,
+        base_url=base_url,
         rewrite_relative_urls=rewrite_relative_urls,
+        rewrite_mode=rewrite_mode,
         converter=converter,
+        result_cache=result_cache,
+        executor=executor,
+        collect_links=False,
+    )
+    return markdown
+
+
+async def _ahtml_to_markdown(
+        html: str | bytes | mmap,
+        content_type: Any | None,
+        *,
+        charset: str | None,
+        base_url: str | None,
+        rewrite_relative_urls: bool,
+        rewrite_mode: str,
+        converter: str | None,
+        result_cache: ResultCache | None,
+        executor: Executor | None,
+        collect_links: bool,
+) -> tuple[str, list[str]]:
+    """Convert ``html`` on ``executor``, also returning its links when ``collect_links`` is set.
+
+    Links are resolved against ``base_url`` only when relative URLs are rewritten.
+    Cached Markdown carries no links, so the result cache is only written to then.
+    """
+    resolved_base_url = base_url if rewrite_relative_urls else None
+    cache_key = _result_cache_key(
+        result_cache,
+        html,
+        charset=charset or _declared_charset(content_type),
+        converter=converter,
+        base_url=resolved_base_url,
+        rewrite_mode=rewrite_mode,
+    )
+    if (
+        cache_key is not None
+        and not collect_links
+        and (cached := result_cache.get(cache_key)) is not None
+    ):
+        return cached, []
+
+    call = partial(
+        to_markdown_with_links if collect_links else to_markdown,
+        html,
+        content_type,
+        charset=charset,
+        converter=converter,
+        base_url=resolved_base_url,
+        rewrite_mode=rewrite_mode,
+    )
+    if is_observed() and (executor is None or isinstance(executor, ThreadPoolExecutor)):
+        # Threads do not inherit context variables; carry the metrics observers over.
+        call = partial(copy_context().run, call)
+    result = await asyncio.get_running_loop().run_in_executor(executor, call)
+    markdown, links = result if collect_links else (result, [])
+    if cache_key is not None:
+        result_cache.set(cache_key, markdown)
+    return markdown, links
+
+
+def _result_cache_key(
+        result_cache: ResultCache | None,
+        html: str | bytes | mmap,
+        *,
+        charset: str | None,
+        converter: str | None,
+        base_url: str | None,
+        rewrite_mode: str,
+) -> str | None:
+    """Return the key of ``html`` in ``result_cache``, or ``None`` without a cache.
+
+    The key includes the ``converter_version``, so Markdown cached by another
+    fallback chain or converter release is not served.
+    """
+    if result_cache is None:
+        return None
+    return ResultCache.key_for(
+        html,
+        charset=charset,
+        converter=converter_version(converter),
+        base_url=base_url,
+        rewrite_mode=rewrite_mode if base_url else None,
     )
 
 
+def _declared_charset(content_type: Any | None) -> str | None:
+    return sniff_charset(b"", str(content_type)) if content_type else None
+
+
+def file_to_markdown(
+        path: Path | str,
+        *,
+        encoding: str | None = None,
+        base_url: str | None = None,
+        rewrite_relative_urls: bool = True,
+        rewrite_mode: str = REWRITE_HTML,
+        converter: str | None = None,
+        result_cache: ResultCache | None = None,
+) -> str:
+    """Convert a local HTML file into Markdown.
+
+    The file is read as bytes and decoded with ``encoding``, or by default with
+    the encoding declared by its BOM or ``<meta charset>`` (UTF-8, else
+    windows-1252, when it declares none). Files of 4 MiB or more are
+    memory-mapped and fed to the parser in chunks instead of being read into
+    memory.
+    """
+
+    file_path = Path(path)
+    resolved_base_url = base_url or file_path.resolve().as_uri()
+    with ExitStack() as files:
+        with timed(STAGE_READ):
+            html = files.enter_context(read_mapped(file_path))
+        return html_to_markdown(
+            html,
+            charset=encoding,
+            base_url=resolved_base_url,
+            rewrite_relative_urls=rewrite_relative_urls,
+            rewrite_mode=rewrite_mode,
+            converter=converter,
+            result_cache=result_cache,
+        )
+
+
 def fetch(
         url: str,
         *,
@@ -59,6 +252,11 @@ def fetch(
         ignore_robots_txt: bool = False,
         proxy_url: str | None = None,
         timeout: float = 30.0,
+        robots_cache: RobotsCache | None = None,
+        max_bytes: int | None = None,
+        cache_dir: Path | str | None = None,
+        require_html: bool = False,
+        retry: RetryPolicy | None = None,
 ) -> tuple[str, str]:
     """Fetch the given URL and return the content and content-type."""
 
@@ -68,6 +266,11 @@ def fetch(
         ignore_robots_txt=ignore_robots_txt,
         proxy_url=proxy_url,
         timeout=timeout,
+        robots_cache=robots_cache,
+        max_bytes=max_bytes,
+        require_html=require_html,
+        cache_dir=cache_dir,
+        retry=retry,
     )
 
 
@@ -78,32 +281,499 @@ def fetch_to_markdown(
         ignore_robots_txt: bool = False,
         proxy_url: str | None = None,
         timeout: float = 30.0,
+        robots_cache: RobotsCache | None = None,
+        max_bytes: int | None = None,
+        cache_dir: Path | str | None = None,
         base_url: str | None = None,
         rewrite_relative_urls: bool = True,
+        rewrite_mode: str = REWRITE_HTML,
         converter: str | None = None,
+        result_cache: ResultCache | None = None,
+        retry: RetryPolicy | None = None,
 ) -> str:
     """Fetch the given URL and return the simplified Markdown content."""
 
-    content, content_type = fetch(
+    response = fetch_response(
         url,
         user_agent=user_agent,
         ignore_robots_txt=ignore_robots_txt,
         proxy_url=proxy_url,
         timeout=timeout,
+        robots_cache=robots_cache,
+        max_bytes=max_bytes,
+        require_html=True,
+        cache_dir=cache_dir,
+        retry=retry,
     )
     return html_to_markdown(
-        content,
-        content_type,
+        response.body,
+        response.content_type,
+        charset=response.charset,
+        base_url=base_url or url,
+        rewrite_relative_urls=rewrite_relative_urls,
+        rewrite_mode=rewrite_mode,
+        converter=converter,
+        result_cache=result_cache,
+    )
+
+
+async def afetch(
+        url: str,
+        *,
+        user_agent: str | None = None,
+        ignore_robots_txt: bool = False,
+        proxy_url: str | None = None,
+        timeout: float = 30.0,
+        robots_cache: RobotsCache | None = None,
+        max_bytes: int | None = None,
+        cache_dir: Path | str | None = None,
+        require_html: bool = False,
+        retry: RetryPolicy | None = None,
+        client: AsyncClient | None = None,
+        scheduler: HostScheduler | None = None,
+) -> tuple[str, str]:
+    """Asynchronous variant of ``fetch`` for use inside a running event loop.
+
+    Pass a long-lived ``client`` from ``create_client`` to reuse its connection
+    pool across calls; otherwise a client is opened for this request only.
+    """
+    response = await _afetch_response(
+        url,
+        user_agent=user_agent,
+        ignore_robots_txt=ignore_robots_txt,
+        proxy_url=proxy_url,
+        timeout=timeout,
+        robots_cache=robots_cache,
+        max_bytes=max_bytes,
+        cache_dir=cache_dir,
+        require_html=require_html,
+        retry=retry,
+        client=client,
+        scheduler=scheduler,
+    )
+    return response.content, response.content_type
+
+
+async def _afetch_response(
+        url: str,
+        *,
+        user_agent: str | None,
+        ignore_robots_txt: bool,
+        proxy_url: str | None,
+        timeout: float,
+        robots_cache: RobotsCache | None,
+        max_bytes: int | None,
+        cache_dir: Path | str | None,
+        require_html: bool,
+        retry: RetryPolicy | None,
+        client: AsyncClient | None,
+        scheduler: HostScheduler | None,
+) -> FetchResponse:
+    if not url:
+        raise ValueError("A non-empty URL is required")
+
+    return await _fetch_async(
+        url,
+        user_agent=user_agent or DEFAULT_USER_AGENT,
+        ignore_robots_txt=ignore_robots_txt,
+        proxy_url=proxy_url,
+        timeout=timeout,
+        client=client,
+        robots_cache=robots_cache,
+        max_bytes=max_bytes,
+        require_html=require_html,
+        http_cache=http_cache_for(cache_dir),
+        scheduler=scheduler,
+        retry=retry,
+    )
+
+
+async def afetch_to_markdown(
+        url: str,
+        *,
+        user_agent: str | None = None,
+        ignore_robots_txt: bool = False,
+        proxy_url: str | None = None,
+        timeout: float = 30.0,
+        robots_cache: RobotsCache | None = None,
+        max_bytes: int | None = None,
+        cache_dir: Path | str | None = None,
+        base_url: str | None = None,
+        rewrite_relative_urls: bool = True,
+        rewrite_mode: str = REWRITE_HTML,
+        converter: str | None = None,
+        result_cache: ResultCache | None = None,
+        retry: RetryPolicy | None = None,
+        client: AsyncClient | None = None,
+        scheduler: HostScheduler | None = None,
+        executor: Executor | None = None,
+) -> str:
+    """Asynchronous variant of ``fetch_to_markdown``; see ``afetch`` and ``ahtml_to_markdown``."""
+
+    response = await _afetch_response(
+        url,
+        user_agent=user_agent,
+        ignore_robots_txt=ignore_robots_txt,
+        proxy_url=proxy_url,
+        timeout=timeout,
+        robots_cache=robots_cache,
+        max_bytes=max_bytes,
+        cache_dir=cache_dir,
+        require_html=True,
+        retry=retry,
+        client=client,
+        scheduler=scheduler,
+    )
+    return await ahtml_to_markdown(
+        response.body,
+        response.content_type,
+        charset=response.charset,
         base_url=base_url or url,
         rewrite_relative_urls=rewrite_relative_urls,
+        rewrite_mode=rewrite_mode,
         converter=converter,
+        result_cache=result_cache,
+        executor=executor,
+    )
+
+
+async def _convert_one(
+        client: AsyncClient,
+        url: str,
+        *,
+        user_agent: str,
+        ignore_robots_txt: bool,
+        proxy_url: str | None,
+        timeout: float,
+        robots_cache: RobotsCache | None,
+        max_bytes: int | None,
+        http_cache: HttpCache | None,
+        rewrite_relative_urls: bool,
+        rewrite_mode: str,
+        converter: str | None,
+        result_cache: ResultCache | None,
+        scheduler: HostScheduler | None = None,
+        retry: RetryPolicy | None = None,
+        executor: Executor | None = None,
+        collect_links: bool = False,
+        previous: ManifestEntry | None = None,
+        hash_content: bool = False,
+        dedup: DuplicateIndex | None = None,
+        base_url: str | None = None,
+) -> ConversionResult:
+    """Fetch and convert ``url`` on the shared client, capturing failures.
+
+    Relative links are resolved against ``base_url``, by default the URL the
+    page was served from after redirects.
+    With ``collect_links`` the page's ``<a href>`` targets end up in ``links``.
+    With ``hash_content`` the result carries the hash of the downloaded HTML.
+    ``previous`` is the manifest entry of the last conversion: its validators
+    are sent with the request, and a page the server reports as not modified,
+    or whose HTML hashes the same, comes back ``unchanged`` with the links
+    recorded last time instead of being converted again. With ``dedup``, a page
+    whose text nearly duplicates an indexed page is not converted either and
+    names that page in ``duplicate_of``.
+    """
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+    stages = StageMetrics()
+    response = None
+    digest = None
+    try:
+        if not url:
+            raise ValueError("A non-empty URL is required")
+        with observe(stages):
+            response = await _fetch_async(
+                url,
+                user_agent=user_agent,
+                ignore_robots_txt=ignore_robots_txt,
+                proxy_url=proxy_url,
+                timeout=timeout,
+                client=client,
+                robots_cache=robots_cache,
+                max_bytes=max_bytes,
+                require_html=True,
+                http_cache=http_cache,
+                scheduler=scheduler,
+                retry=retry,
+                validators=previous.conditional_headers() if previous is not None else None,
+            )
+            fetched = time.perf_counter()
+            timings["fetch"] = fetched - started
+            if previous is not None and response.not_modified:
+                digest = previous.content_hash
+            elif previous is not None or hash_content:
+                digest = content_hash(response.body)
+            if previous is not None and digest == previous.content_hash:
+                return _unconverted_result(
+                    url,
+                    response,
+                    started,
+                    timings,
+                    stages,
+                    links=previous.links or (),
+                    unchanged=True,
+                    etag=response.etag or previous.etag,
+                    last_modified=response.last_modified or previous.last_modified,
+                    content_hash=digest,
+                )
+            if dedup is not None:
+                fingerprint = await asyncio.get_running_loop().run_in_executor(
+                    executor, html_fingerprint, response.body, response.charset
+                )
+                original = dedup.check(url, fingerprint) if fingerprint is not None else None
+                if original is not None:
+                    return _unconverted_result(
+                        url,
+                        response,
+                        started,
+                        timings,
+                        stages,
+                        duplicate_of=original,
+                        etag=response.etag,
+                        last_modified=response.last_modified,
+                        content_hash=digest,
+                    )
+            markdown, links = await _ahtml_to_markdown(
+                response.body,
+                response.content_type,
+                charset=response.charset,
+                base_url=base_url or response.final_url or url,
+                rewrite_relative_urls=rewrite_relative_urls,
+                rewrite_mode=rewrite_mode,
+                converter=converter,
+                result_cache=result_cache,
+                executor=executor,
+                collect_links=collect_links,
+            )
+            timings["convert"] = time.perf_counter() - fetched
+    except (Extract2MarkdownError, ValueError) as exc:
+        timings["total"] = time.perf_counter() - started
+        measured = stages.as_dict()
+        return ConversionResult(
+            url=url,
+            error=exc,
+            final_url=response.final_url if response is not None else None,
+            status_code=(
+                response.status_code
+                if response is not None
+                else getattr(exc, "status_code", None)
+            ),
+            content_type=response.content_type if response is not None else None,
+            timings={**measured["timings"], **timings},
+            sizes=measured["sizes"],
+        )
+    timings["total"] = time.perf_counter() - started
+    measured = stages.as_dict()
+    return ConversionResult(
+        url=url,
+        markdown=markdown,
+        final_url=response.final_url,
+        status_code=response.status_code,
+        content_type=response.content_type,
+        timings={**measured["timings"], **timings},
+        sizes=measured["sizes"],
+        links=tuple(links),
+        etag=response.etag,
+        last_modified=response.last_modified,
+        content_hash=digest,
+        from_cache=response.from_cache,
+    )
+
+
+def _unconverted_result(
+        url: str,
+        response: FetchResponse,
+        started: float,
+        timings: dict[str, float],
+        stages: StageMetrics,
+        **fields: Any,
+) -> ConversionResult:
+    """Return the result of a page that was fetched but deliberately not converted."""
+    timings["total"] = time.perf_counter() - started
+    measured = stages.as_dict()
+    return ConversionResult(
+        url=url,
+        final_url=response.final_url,
+        status_code=response.status_code,
+        content_type=response.content_type or None,
+        timings={**measured["timings"], **timings},
+        sizes=measured["sizes"],
+        from_cache=response.from_cache,
+        **fields,
+    )
+
+
+async def afetch_many_to_markdown(
+        urls: Iterable[str],
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        user_agent: str | None = None,
+        ignore_robots_txt: bool = False,
+        proxy_url: str | None = None,
+        timeout: float = 30.0,
+        robots_cache: RobotsCache | None = None,
+        max_bytes: int | None = None,
+        cache_dir: Path | str | None = None,
+        rewrite_relative_urls: bool = True,
+        rewrite_mode: str = REWRITE_HTML,
+        converter: str | None = None,
+        result_cache: ResultCache | None = None,
+        scheduler: HostScheduler | None = None,
+        retry: RetryPolicy | None = None,
+        executor: Executor | None = None,
+        dedup: DuplicateIndex | None = None,
+) -> AsyncIterator[ConversionResult]:
+    """Fetch and convert many URLs, yielding results as they complete.
+
+    All requests share one pooled HTTP client, so connections (and HTTP/2
+    sessions when available) are reused across pages on the same host. At most
+    ``concurrency`` URLs are in flight at any time; ``urls`` is consumed lazily
+    and hosts are served round-robin. With ``scheduler``, each host is further
+    limited to its ``max_per_host`` requests, rate and robots.txt Crawl-delay.
+    Conversions run on ``executor`` as in ``ahtml_to_markdown``.
+    Failures are reported through ``ConversionResult.error`` instead of raising.
+
+    With ``dedup``, URLs equal after ``canonical_url`` to one already fetched
+    successfully are not fetched again, and pages nearly duplicating a page in the
+    index are not converted; both are yielded with ``duplicate_of`` set.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    resolved_user_agent = user_agent or DEFAULT_USER_AGENT
+    http_cache = http_cache_for(cache_dir)
+    claimed: dict[str, str] = {}
+    fetching: dict[str, asyncio.Event] = {}
+
+    async with create_client(
+        proxy_url=proxy_url,
+        timeout=timeout,
+        max_connections=concurrency,
+    ) as client:
+
+        async def convert(url: str) -> ConversionResult:
+            if dedup is None:
+                return await fetch_and_convert(url)
+            key = canonical_url(url)
+            while key not in claimed and key in fetching:
+                # Another spelling of this URL is in flight; only its success claims it.
+                await fetching[key].wait()
+            if key in claimed:
+                return ConversionResult(url=url, duplicate_of=claimed[key])
+            fetching[key] = asyncio.Event()
+            try:
+                result = await fetch_and_convert(url)
+            finally:
+                fetching.pop(key).set()
+            if result.error is None:
+                claimed[key] = url
+            return result
+
+        async def fetch_and_convert(url: str) -> ConversionResult:
+            return await _convert_one(
+                client,
+                url,
+                user_agent=resolved_user_agent,
+                ignore_robots_txt=ignore_robots_txt,
+                proxy_url=proxy_url,
+                timeout=timeout,
+                robots_cache=robots_cache,
+                max_bytes=max_bytes,
+                http_cache=http_cache,
+                rewrite_relative_urls=rewrite_relative_urls,
+                rewrite_mode=rewrite_mode,
+                converter=converter,
+                result_cache=result_cache,
+                scheduler=scheduler,
+                retry=retry,
+                executor=executor,
+                dedup=dedup,
+            )
+
+        results = run_fair(
+            urls,
+            convert,
+            concurrency=concurrency,
+            max_per_host=scheduler.max_per_host if scheduler else None,
+        )
+        async with aclosing(results):
+            async for result in results:
+                yield result
+
+
+def fetch_many_to_markdown(
+        urls: Iterable[str],
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        user_agent: str | None = None,
+        ignore_robots_txt: bool = False,
+        proxy_url: str | None = None,
+        timeout: float = 30.0,
+        robots_cache: RobotsCache | None = None,
+        max_bytes: int | None = None,
+        cache_dir: Path | str | None = None,
+        rewrite_relative_urls: bool = True,
+        rewrite_mode: str = REWRITE_HTML,
+        converter: str | None = None,
+        result_cache: ResultCache | None = None,
+        scheduler: HostScheduler | None = None,
+        retry: RetryPolicy | None = None,
+        executor: Executor | None = None,
+        dedup: DuplicateIndex | None = None,
+) -> Iterator[ConversionResult]:
+    """Synchronous variant of ``afetch_many_to_markdown``."""
+
+    return _iterate_sync(
+        afetch_many_to_markdown(
+            urls,
+            concurrency=concurrency,
+            user_agent=user_agent,
+            ignore_robots_txt=ignore_robots_txt,
+            proxy_url=proxy_url,
+            timeout=timeout,
+            robots_cache=robots_cache,
+            max_bytes=max_bytes,
+            cache_dir=cache_dir,
+            rewrite_relative_urls=rewrite_relative_urls,
+            rewrite_mode=rewrite_mode,
+            converter=converter,
+            result_cache=result_cache,
+            scheduler=scheduler,
+            retry=retry,
+            executor=executor,
+            dedup=dedup,
+        )
     )
 
 
+def _iterate_sync(iterator: AsyncIterator[_T]) -> Iterator[_T]:
+    """Drive ``iterator`` on a private event loop and yield its items."""
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(anext(iterator))
+            except StopAsyncIteration:
+                return
+    finally:
+        try:
+            loop.run_until_complete(iterator.aclose())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            loop.close()
+
+
 __all__ = [
+    "DEFAULT_CONCURRENCY",
     "DEFAULT_USER_AGENT",
-    "file_to_markdown",
+    "afetch",
+    "afetch_many_to_markdown",
+    "afetch_to_markdown",
+    "ahtml_to_markdown",
     "fetch",
+    "fetch_many_to_markdown",
     "fetch_to_markdown",
+    "file_to_markdown",
     "html_to_markdown",
 ]
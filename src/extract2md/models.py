@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
+from typing import Any
+
 
 class Extract2MarkdownError(RuntimeError):
     """Base class for errors in this package."""
@@ -14,8 +17,101 @@ class Extract2MarkdownToMarkdownError(Extract2MarkdownError):
 
 
 class Extract2MarkdownFetchError(Extract2MarkdownError):
-    """Raised when a URL cannot be fetched."""
+    """Raised when a URL cannot be fetched.
+
+    ``status_code`` and ``retry_after`` are set when the server answered with an
+    error status (and a ``Retry-After`` header).
+    """
+
+    def __init__(
+            self,
+            message: str,
+            *,
+            status_code: int | None = None,
+            retry_after: str | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
 
 
 class Extract2MarkdownConverterError(Extract2MarkdownError):
     """Raised when an HTML conversion backend fails."""
+
+
+@dataclass(frozen=True)
+class ConversionResult:
+    """Outcome of converting a single source as part of a batch.
+
+    ``timings`` maps stage names (``"fetch"``, ``"convert"``, ``"total"`` and the
+    finer pipeline stages such as ``"robots"`` or ``"download"``) to seconds
+    spent; ``sizes`` holds byte counts such as ``"download_bytes"``. ``links``
+    lists the page's ``<a href>`` targets when they were collected for crawling.
+
+    With a manifest, ``etag``, ``last_modified`` and ``content_hash`` describe
+    the fetched page, and ``unchanged`` is set (without ``markdown``) when it
+    was not converted because it had not changed since the last run.
+    ``duplicate_of`` names the page this one was found to (nearly) duplicate
+    when duplicate detection skipped its conversion. ``from_cache`` is set when
+    the server confirmed a response kept in the HTTP cache, whose body was used.
+    """
+
+    url: str
+    markdown: str | None = None
+    error: Exception | None = None
+    final_url: str | None = None
+    status_code: int | None = None
+    content_type: str | None = None
+    timings: dict[str, float] = field(default_factory=dict)
+    sizes: dict[str, int] = field(default_factory=dict)
+    links: tuple[str, ...] = ()
+    unchanged: bool = False
+    etag: str | None = None
+    last_modified: str | None = None
+    content_hash: str | None = None
+    duplicate_of: str | None = None
+    from_cache: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """Return True when the source did not fail.
+
+        ``markdown`` may still be ``None`` for ``unchanged`` and ``duplicate_of`` results.
+        """
+        return self.error is None
+
+    def to_record(self) -> dict[str, Any]:
+        """Return a JSON-serialisable summary, as written by ``--output-format jsonl``."""
+        return {
+            "url": self.url,
+            "final_url": self.final_url,
+            "status": self.status_code,
+            "content_type": self.content_type,
+            "markdown": self.markdown,
+            "unchanged": self.unchanged,
+            "duplicate_of": self.duplicate_of,
+            "from_cache": self.from_cache,
+            "timings": {stage: round(seconds, 6) for stage, seconds in self.timings.items()},
+            "sizes": dict(self.sizes),
+            "error": str(self.error) if self.error is not None else None,
+            "error_type": type(self.error).__name__ if self.error is not None else None,
+        }
+
+
+@dataclass
+class BatchSummary:
+    """Totals of a ``convert_directory`` run; only failures are kept individually.
+
+    ``stats`` holds the per-stage totals gathered by the workers when requested.
+    ``skipped`` counts the files a manifest showed to be unchanged.
+    """
+
+    converted: int = 0
+    skipped: int = 0
+    failures: list[ConversionResult] = field(default_factory=list)
+    stats: dict[str, dict[str, Any]] | None = None
+
+    @property
+    def failed(self) -> int:
+        """Return the number of files that could not be converted."""
+        return len(self.failures)
@@ -0,0 +1,60 @@
+"""Tests for the process-pool directory converter."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from extract2md import convert_directory
+from extract2md._batch import iter_html_files, output_path_for
+
+ARTICLE = (
+    "<html><head><title>{title}</title></head><body><article>"
+    "<h1>{title}</h1>"
+    "<p>This paragraph is long enough for the extractor to keep it as the main "
+    "content of the page, which is what we want to see in the output.</p>"
+    "<p>A second paragraph links to <a href=\"other.html\">another page</a>.</p>"
+    "</article></body></html>"
+)
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_iter_html_files_is_sorted_and_filtered(tmp_path: Path) -> None:
+    for name in ("b.html", "a.htm", "notes.txt", "sub/c.xhtml"):
+        _write(tmp_path / name, "")
+
+    found = [path.relative_to(tmp_path).as_posix() for path in iter_html_files(tmp_path)]
+
+    assert found == ["a.htm", "b.html", "sub/c.xhtml"]
+    assert output_path_for(tmp_path / "sub/c.xhtml", tmp_path, Path("/out")) == Path(
+        "/out/sub/c.md"
+    )
+
+
+def test_convert_directory_mirrors_tree_and_reports_failures(tmp_path: Path) -> None:
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    _write(src / "first.html", ARTICLE.format(title="First"))
+    _write(src / "nested/second.html", ARTICLE.format(title="Second"))
+    _write(src / "broken.html", "\x00\x01 not html")
+
+    summary = convert_directory(src, dst, workers=2, chunk_size=1)
+
+    assert summary.converted == 2
+    assert [Path(failure.url).name for failure in summary.failures] == ["broken.html"]
+    first = (dst / "first.md").read_text(encoding="utf-8")
+    assert "First" in first
+    assert (src / "other.html").resolve().as_uri() in first
+    assert "Second" in (dst / "nested/second.md").read_text(encoding="utf-8")
+    assert not (dst / "broken.md").exists()
+    assert not list(dst.rglob("*.tmp"))
+
+
+def test_convert_directory_requires_existing_source(tmp_path: Path) -> None:
+    with pytest.raises(NotADirectoryError):
+        convert_directory(tmp_path / "missing", tmp_path / "out", workers=1)
@@ -3,35 +3,45 @@
 from __future__ import annotations
 
 import io
+import json
 from pathlib import Path
 
+import httpx
+import pytest
+
 from extract2md import cli
+from extract2md._fetch import FetchResponse
 from extract2md.converters import DEFAULT_CONVERTER
+from extract2md.models import BatchSummary, ConversionResult, Extract2MarkdownFetchError
 
 
 def test_cli_prints_stdout(monkeypatch, capsys):
     """CLI should print converted Markdown to stdout by default."""
 
-    def fake_fetch(url, **kwargs):  # noqa: ANN001
+    def fake_fetch_response(url, **kwargs):
         assert url == "https://example.com"
-        return "<html>hello</html>", "text/html"
+        return FetchResponse(url, url, 200, b"<html>hello</html>", "text/html", charset="windows-1252")
 
-    def fake_html_to_markdown(  # noqa: ANN001
+    def fake_html_to_markdown(
             html,
             content_type=None,
             *,
+            charset=None,
             base_url=None,
             rewrite_relative_urls=None,
+            rewrite_mode=None,
             converter=None,
+            result_cache=None,
     ):
-        assert html == "<html>hello</html>"
+        assert html == b"<html>hello</html>"
         assert content_type == "text/html"
+        assert charset == "windows-1252"
         assert base_url == "https://example.com"
         assert rewrite_relative_urls is True
         assert converter == DEFAULT_CONVERTER
         return "hello"
 
-    monkeypatch.setattr(cli, "fetch", fake_fetch)
+    monkeypatch.setattr(cli, "fetch_response", fake_fetch_response)
     monkeypatch.setattr(cli, "html_to_markdown", fake_html_to_markdown)
 
     exit_code = cli.main(["https://example.com"])
@@ -48,15 +58,18 @@ def test_cli_reads_file_source(monkeypatch, tmp_path: Path, capsys):
 
     expected_base = html_file.resolve().as_uri()
 
-    def fake_html_to_markdown(  # noqa: ANN001
+    def fake_html_to_markdown(
             html,
             content_type=None,
             *,
+            charset=None,
             base_url=None,
             rewrite_relative_urls=None,
+            rewrite_mode=None,
             converter=None,
+            result_cache=None,
     ):
-        assert html == "<html>file</html>"
+        assert html == b"<html>file</html>"
         assert content_type is None
         assert base_url == expected_base
         assert rewrite_relative_urls is True
@@ -74,9 +87,9 @@ def test_cli_reads_file_source(monkeypatch, tmp_path: Path, capsys):
 
 def test_cli_reads_stdin_source(monkeypatch, capsys):
     """CLI should pipe stdin when '-' is used as the source."""
-    monkeypatch.setattr(cli.sys, "stdin", io.StringIO("<html>stdin</html>"))
+    monkeypatch.setattr(cli.sys, "stdin", io.TextIOWrapper(io.BytesIO(b"<html>stdin</html>")))
 
-    def fake_html_to_markdown(*args, **kwargs):  # noqa: ANN001
+    def fake_html_to_markdown(*args, **kwargs):
         return "converted-stdin"
 
     monkeypatch.setattr(cli, "html_to_markdown", fake_html_to_markdown)
@@ -91,22 +104,25 @@ def test_cli_reads_stdin_source(monkeypatch, capsys):
 def test_cli_disable_relative_rewrite(monkeypatch, capsys):
     """Users can opt out of rewriting relative links."""
 
-    def fake_fetch(url, **kwargs):  # noqa: ANN001
-        return "<html>body</html>", "text/html"
+    def fake_fetch_response(url, **kwargs):
+        return FetchResponse(url, url, 200, b"<html>body</html>", "text/html")
 
-    def fake_html_to_markdown(  # noqa: ANN001
+    def fake_html_to_markdown(
             html,
             content_type=None,
             *,
+            charset=None,
             base_url=None,
             rewrite_relative_urls=None,
+            rewrite_mode=None,
             converter=None,
+            result_cache=None,
     ):
         assert rewrite_relative_urls is False
         assert converter == DEFAULT_CONVERTER
         return "body"
 
-    monkeypatch.setattr(cli, "fetch", fake_fetch)
+    monkeypatch.setattr(cli, "fetch_response", fake_fetch_response)
     monkeypatch.setattr(cli, "html_to_markdown", fake_html_to_markdown)
 
     exit_code = cli.main(["https://example.com", "--no-rewrite-relative-urls"])
@@ -118,15 +134,18 @@ def test_cli_disable_relative_rewrite(monkeypatch, capsys):
 
 def test_cli_base_url_override_for_stdin(monkeypatch, capsys):
     """Users may set a base URL explicitly when using stdin."""
-    monkeypatch.setattr(cli.sys, "stdin", io.StringIO("<html>stdin</html>"))
+    monkeypatch.setattr(cli.sys, "stdin", io.TextIOWrapper(io.BytesIO(b"<html>stdin</html>")))
 
-    def fake_html_to_markdown(  # noqa: ANN001
+    def fake_html_to_markdown(
             html,
             content_type=None,
             *,
+            charset=None,
             base_url=None,
             rewrite_relative_urls=None,
+            rewrite_mode=None,
             converter=None,
+            result_cache=None,
     ):
         assert base_url == "https://override.test"
         assert rewrite_relative_urls is True
@@ -145,21 +164,24 @@ def test_cli_base_url_override_for_stdin(monkeypatch, capsys):
 def test_cli_supports_custom_converter(monkeypatch, capsys):
     """--converter should be forwarded to html_to_markdown."""
 
-    def fake_fetch(url, **kwargs):  # noqa: ANN001
-        return "<html>body</html>", "text/html"
+    def fake_fetch_response(url, **kwargs):
+        return FetchResponse(url, url, 200, b"<html>body</html>", "text/html")
 
-    def fake_html_to_markdown(  # noqa: ANN001
+    def fake_html_to_markdown(
             html,
             content_type=None,
             *,
+            charset=None,
             base_url=None,
             rewrite_relative_urls=None,
+            rewrite_mode=None,
             converter=None,
+            result_cache=None,
     ):
         assert converter == "trafilatura"
         return "body"
 
-    monkeypatch.setattr(cli, "fetch", fake_fetch)
+    monkeypatch.setattr(cli, "fetch_response", fake_fetch_response)
     monkeypatch.setattr(cli, "html_to_markdown", fake_html_to_markdown)
 
     exit_code = cli.main(["https://example.com", "--converter", "trafilatura"])
@@ -167,3 +189,149 @@ def test_cli_supports_custom_converter(monkeypatch, capsys):
 
     assert exit_code == 0
     assert "body" in captured.out
+
+
+def test_cli_forwards_rewrite_mode(monkeypatch, capsys):
+    """--rewrite-mode should be forwarded to html_to_markdown."""
+    monkeypatch.setattr(cli.sys, "stdin", io.TextIOWrapper(io.BytesIO(b"<html>stdin</html>")))
+
+    def fake_html_to_markdown(html, content_type=None, **kwargs):
+        assert kwargs["rewrite_mode"] == "markdown"
+        return "converted"
+
+    monkeypatch.setattr(cli, "html_to_markdown", fake_html_to_markdown)
+
+    exit_code = cli.main(["-", "--rewrite-mode", "markdown"])
+
+    assert exit_code == 0
+    assert "converted" in capsys.readouterr().out
+
+
+def test_cli_batch_subcommand(monkeypatch, tmp_path: Path, capsys):
+    """The batch subcommand should forward its options to convert_directory."""
+    calls = {}
+
+    def fake_convert_directory(src, dst, **kwargs):
+        calls.update(src=src, dst=dst, **kwargs)
+        return BatchSummary(converted=3)
+
+    monkeypatch.setattr(cli, "convert_directory", fake_convert_directory)
+
+    exit_code = cli.main(["batch", str(tmp_path), str(tmp_path / "out"), "--workers", "4"])
+    captured = capsys.readouterr()
+
+    assert exit_code == 0
+    assert calls["src"] == str(tmp_path)
+    assert calls["workers"] == 4
+    assert calls["converter"] == DEFAULT_CONVERTER
+    assert "converted 3 file(s), 0 failed" in captured.err
+
+
+def test_cli_streams_jsonl_records_for_input_file(monkeypatch, tmp_path: Path, capsys):
+    """--input should convert every listed URL and print one JSON record each."""
+    input_file = tmp_path / "urls.txt"
+    input_file.write_text(
+        "# seed list\nhttps://example.com/a\n\nhttps://example.com/b\n",
+        encoding="utf-8",
+    )
+    seen = {}
+
+    def fake_fetch_many_to_markdown(urls, **kwargs):
+        seen["urls"] = list(urls)
+        seen.update(kwargs)
+        yield ConversionResult(
+            url="https://example.com/a",
+            markdown="# A",
+            final_url="https://example.com/a/",
+            status_code=200,
+            content_type="text/html",
+            timings={"fetch": 0.25, "convert": 0.5, "total": 0.75},
+            sizes={"download_bytes": 120},
+        )
+        yield ConversionResult(
+            url="https://example.com/b",
+            error=Extract2MarkdownFetchError("gone", status_code=410),
+            status_code=410,
+        )
+
+    monkeypatch.setattr(cli, "fetch_many_to_markdown", fake_fetch_many_to_markdown)
+
+    exit_code = cli.main(["--input", str(input_file), "--concurrency", "4"])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    assert exit_code == 1
+    assert seen["urls"] == ["https://example.com/a", "https://example.com/b"]
+    assert seen["concurrency"] == 4
+    assert records[0] == {
+        "url": "https://example.com/a",
+        "final_url": "https://example.com/a/",
+        "status": 200,
+        "content_type": "text/html",
+        "markdown": "# A",
+        "unchanged": False,
+        "duplicate_of": None,
+        "from_cache": False,
+        "timings": {"fetch": 0.25, "convert": 0.5, "total": 0.75},
+        "sizes": {"download_bytes": 120},
+        "error": None,
+        "error_type": None,
+    }
+    assert records[1]["status"] == 410
+    assert records[1]["error"] == "gone"
+    assert records[1]["error_type"] == "Extract2MarkdownFetchError"
+
+
+def test_cli_reports_malformed_input_lines(monkeypatch, tmp_path: Path, capsys):
+    """A malformed --input line gets an error record and the stream goes on."""
+    input_file = tmp_path / "urls.txt"
+    input_file.write_text("http://example.com:abc/\nhttps://example.com/\n", encoding="utf-8")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, headers={"content-type": "text/html"}, text="<html><body><p>Page</p></body></html>"
+        )
+
+    monkeypatch.setattr(
+        "extract2md.core.create_client",
+        lambda **kwargs: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr("extract2md.core.to_markdown", lambda html, *args, **kwargs: "Page")
+
+    exit_code = cli.main(["--input", str(input_file), "--ignore-robots"])
+    records = {record["url"]: record for record in map(json.loads, capsys.readouterr().out.splitlines())}
+
+    assert exit_code == 1
+    assert records["http://example.com:abc/"]["error_type"] == "Extract2MarkdownFetchError"
+    assert records["https://example.com/"]["markdown"] == "Page"
+
+
+def test_cli_rejects_source_together_with_input(capsys):
+    """SOURCE and --input are mutually exclusive."""
+    with pytest.raises(SystemExit):
+        cli.main(["https://example.com", "--input", "-"])
+
+    assert "either SOURCE or --input" in capsys.readouterr().err
+
+
+def test_cli_writes_jsonl_record_for_file_source(tmp_path: Path, capsys):
+    """A single file source can also be reported as a JSON record."""
+    html_file = tmp_path / "page.html"
+    html_file.write_text("<html><body><p>Record body</p></body></html>", encoding="utf-8")
+
+    exit_code = cli.main([str(html_file), "--output-format", "jsonl"])
+    record = json.loads(capsys.readouterr().out)
+
+    assert exit_code == 0
+    assert record["url"] == str(html_file)
+    assert "Record body" in record["markdown"]
+    assert set(record["timings"]) == {"total"}
+
+
+@pytest.mark.parametrize("argv", [["./batch"], ["--", "batch"]])
+def test_cli_converts_files_named_like_subcommands(monkeypatch, tmp_path: Path, capsys, argv) -> None:
+    (tmp_path / "batch").write_text("<html>file</html>", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli, "html_to_markdown", lambda html, content_type=None, **kwargs: bytes(html).decode())
+
+    assert cli.main(argv) == 0
+    assert "<html>file</html>" in capsys.readouterr().out
@@ -0,0 +1,167 @@
+"""Tests for the lazily loaded converter registry."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from extract2md import converters
+from extract2md.converters import ConverterSpec
+from extract2md.models import Extract2MarkdownConverterError
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+
+class EntryPointConverter:
+    name = "entry-point"
+    description = "converter loaded from an entry point"
+
+    def convert(self, html: str) -> str:
+        return "converted"
+
+
+def _loaded_modules(code: str) -> set[str]:
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    output = subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys; print(' '.join(sys.modules))"],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    ).stdout
+    return set(output.split())
+
+
+def test_building_the_cli_parser_imports_no_backend() -> None:
+    modules = _loaded_modules("from extract2md import cli; cli.build_parser()")
+
+    assert not modules & {"trafilatura", "readabilipy", "markdownify"}
+
+
+def test_get_converter_imports_only_the_selected_backend() -> None:
+    modules = _loaded_modules(
+        "from extract2md.converters import get_converter; get_converter('trafilatura')"
+    )
+
+    assert "trafilatura" in modules
+    assert "readabilipy" not in modules
+
+
+def test_entry_point_converters_are_loaded_on_demand(monkeypatch) -> None:
+    spec = ConverterSpec("entry-point", f"{__name__}:EntryPointConverter")
+    monkeypatch.setattr(converters, "_SPECS", None)
+    monkeypatch.setattr(converters, "_entry_point_specs", lambda: [spec])
+    monkeypatch.setattr(converters, "_REGISTRY", dict(converters._REGISTRY))
+
+    assert "entry-point" in converters.get_converter_names()
+    assert converters.get_converter("entry-point").convert("<html></html>") == "converted"
+
+
+def test_unknown_converter_lists_available_names() -> None:
+    with pytest.raises(Extract2MarkdownConverterError, match="trafilatura"):
+        converters.get_converter("does-not-exist")
+
+
+class _FakeConverter:
+    description = "fake converter"
+
+    def __init__(self, name: str, output: str | None, calls: list) -> None:
+        self.name = name
+        self.output = output
+        self.calls = calls
+
+    def convert(self, html: str) -> str:
+        self.calls.append((self.name, html))
+        if self.output is None:
+            raise Extract2MarkdownConverterError(f"{self.name} found nothing")
+        return self.output
+
+
+class _FakeTreeConverter(_FakeConverter):
+    def convert_tree(self, tree) -> str:
+        return self.convert(tree)
+
+
+ARTICLE = "<html><body><nav>Home</nav><article><p>" + "Plenty of article text. " * 40 + "</p></article></body></html>"
+
+
+@pytest.fixture
+def fake_converters(monkeypatch) -> list:
+    calls: list = []
+    registry = dict(converters._REGISTRY)
+    registry.update(
+        (fake.name, fake)
+        for fake in (
+            _FakeTreeConverter("fails", None, calls),
+            _FakeTreeConverter("tiny", "[Home](https://example.com/a/very/long/link/target)", calls),
+            _FakeConverter("full", "Plenty of article text. " * 40, calls),
+        )
+    )
+    monkeypatch.setattr(converters, "_REGISTRY", registry)
+    return calls
+
+
+def test_fallback_chain_tries_converters_on_one_parsed_page(fake_converters) -> None:
+    from extract2md import html_to_markdown
+
+    markdown = html_to_markdown(ARTICLE, converter="fails,tiny,full")
+
+    assert markdown.startswith("Plenty of article text.")
+    assert [name for name, _ in fake_converters] == ["fails", "tiny", "full"]
+    assert fake_converters[0][1] is fake_converters[1][1]  # tree converters share one parsed tree
+    assert "Plenty of article text." in fake_converters[2][1]  # string converters get it serialized
+
+
+def test_fallback_chain_keeps_the_longest_output_or_reports_every_failure(fake_converters) -> None:
+    chain = converters.get_converter("fails,tiny")
+
+    assert chain.convert(ARTICLE).startswith("[Home]")
+    with pytest.raises(Extract2MarkdownConverterError, match="fails: fails found nothing"):
+        converters.get_converter("fails,fails").convert(ARTICLE)
+
+
+def test_auto_chain_is_configurable_and_versioned(monkeypatch) -> None:
+    assert converters.converter_chain("auto") == converters.DEFAULT_AUTO_CONVERTERS
+    monkeypatch.setenv(converters.AUTO_CONVERTERS_ENV_VAR, "readability, trafilatura")
+    assert converters.converter_chain("auto") == ("readability", "trafilatura")
+    assert "readabilipy==" in converters.converter_version("auto")
+    with pytest.raises(Extract2MarkdownConverterError, match="nope"):
+        converters.converter_chain("trafilatura,nope")
+
+
+def test_result_cache_keys_include_the_resolved_auto_chain(fake_converters, monkeypatch, tmp_path) -> None:
+    from extract2md import ResultCache, html_to_markdown
+
+    def convert_in_new_process(chain: str) -> str:
+        monkeypatch.setenv(converters.AUTO_CONVERTERS_ENV_VAR, chain)
+        converters._REGISTRY.pop("auto", None)
+        return html_to_markdown(ARTICLE, converter="auto", result_cache=ResultCache(path=tmp_path / "cache.sqlite"))
+
+    assert convert_in_new_process("tiny").startswith("[Home]")
+    assert convert_in_new_process("full").startswith("Plenty of article text.")
+    assert convert_in_new_process("tiny").startswith("[Home]")
+    assert [name for name, _ in fake_converters] == ["tiny", "full"]
+
+
+def test_auto_converter_follows_the_configured_chain(fake_converters, monkeypatch) -> None:
+    auto = converters.get_converter("auto")
+
+    monkeypatch.setenv(converters.AUTO_CONVERTERS_ENV_VAR, "tiny")
+    assert auto.convert(ARTICLE).startswith("[Home]")
+    monkeypatch.setenv(converters.AUTO_CONVERTERS_ENV_VAR, "full")
+    assert auto.convert(ARTICLE).startswith("Plenty of article text.")
+    assert converters.get_converter("auto") is auto
+    assert auto.description == "Fallback chain: full"
+
+
+def test_cli_rejects_unknown_converters_in_a_chain(capsys) -> None:
+    from extract2md import cli
+
+    with pytest.raises(SystemExit):
+        cli.build_parser().parse_args(["page.html", "--converter", "trafilatura,nope"])
+    assert cli.build_parser().parse_args(["page.html", "--converter", "auto"]).converter == "auto"
+    assert "nope" in capsys.readouterr().err
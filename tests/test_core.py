@@ -2,14 +2,27 @@
 
 from __future__ import annotations
 
+import asyncio
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from extract2md import (
     Extract2MarkdownContentTypeError,
+    Extract2MarkdownFetchError,
+    ResultCache,
+    RobotsCache,
+    afetch_to_markdown,
+    ahtml_to_markdown,
+    fetch_many_to_markdown,
     fetch_to_markdown,
     file_to_markdown,
     html_to_markdown,
 )
+from extract2md._fetch import FetchResponse
+from extract2md._files import read_mapped
+from extract2md._parse import parse_html_bytes
 
 
 def test_html_to_markdown_simplifies() -> None:
@@ -39,15 +52,18 @@ def test_html_to_markdown_rejects_non_html() -> None:
 def test_html_to_markdown_makes_relative_links_absolute(monkeypatch) -> None:
     """Relative URLs should be resolved when a base URL is provided."""
 
-    def fake_rewrite(html, *, base_url):  # noqa: ANN001
+    def fake_to_markdown(
+            html,
+            content_type=None,
+            *,
+            charset=None,
+            converter=None,
+            base_url=None,
+            rewrite_mode=None,
+    ):
         assert base_url == "https://example.com/home/"
-        return '<html><body><a href="https://example.com/docs">Docs</a></body></html>'
-
-    def fake_to_markdown(html, content_type=None, *, converter=None):  # noqa: ANN001
-        assert "https://example.com/docs" in html
         return "[Docs](https://example.com/docs)"
 
-    monkeypatch.setattr("extract2md.core.rewrite_relative_links", fake_rewrite)
     monkeypatch.setattr("extract2md.core.to_markdown", fake_to_markdown)
 
     markdown = html_to_markdown("<html></html>", base_url="https://example.com/home/")
@@ -55,17 +71,64 @@ def test_html_to_markdown_makes_relative_links_absolute(monkeypatch) -> None:
     assert "[Docs](https://example.com/docs)" in markdown
 
 
+def test_html_to_markdown_resolves_links_end_to_end() -> None:
+    """The default converter should emit absolute links for relative hrefs."""
+    html = (
+        "<html><body><article><h1>Guide</h1>"
+        "<p>Read the <a href=\"../docs/intro\">introduction</a> before you start, "
+        "it explains every concept used throughout the rest of this guide.</p>"
+        "</article></body></html>"
+    )
+
+    markdown = html_to_markdown(html, base_url="https://example.com/guide/page")
+
+    assert "(https://example.com/docs/intro)" in markdown
+
+
+def test_html_to_markdown_rewrites_links_in_markdown_mode(monkeypatch) -> None:
+    """Markdown mode should only resolve the links left in the converter output."""
+
+    def fail_rewrite(*args, **kwargs):
+        raise AssertionError("HTML links should not be rewritten in markdown mode")
+
+    monkeypatch.setattr("extract2md._html.rewrite_relative_links_in_tree", fail_rewrite)
+    html = (
+        "<html><body><nav><a href=\"/nav\">Navigation</a></nav><article><h1>Guide</h1>"
+        "<p>Read the <a href=\"../docs/intro\">introduction</a> before you start, "
+        "it explains every concept used throughout the rest of this guide.</p>"
+        "</article></body></html>"
+    )
+
+    markdown = html_to_markdown(
+        html,
+        base_url="https://example.com/guide/page",
+        rewrite_mode="markdown",
+    )
+
+    assert "(https://example.com/docs/intro)" in markdown
+
+
+def test_html_to_markdown_rejects_unknown_rewrite_mode() -> None:
+    with pytest.raises(ValueError):
+        html_to_markdown("<html></html>", rewrite_mode="nope")
+
+
 def test_html_to_markdown_can_skip_relative_rewrite(monkeypatch) -> None:
     """Relative URLs remain untouched when rewriting is disabled."""
 
-    def fake_rewrite(*args, **kwargs):  # noqa: ANN001
-        raise AssertionError("rewrite_relative_links should not run")
-
-    def fake_to_markdown(html, content_type=None, *, converter=None):  # noqa: ANN001
+    def fake_to_markdown(
+            html,
+            content_type=None,
+            *,
+            charset=None,
+            converter=None,
+            base_url=None,
+            rewrite_mode=None,
+    ):
         assert '<a href="/docs">Docs</a>' in html
+        assert base_url is None
         return "[Docs](/docs)"
 
-    monkeypatch.setattr("extract2md.core.rewrite_relative_links", fake_rewrite)
     monkeypatch.setattr("extract2md.core.to_markdown", fake_to_markdown)
 
     markdown = html_to_markdown(
@@ -77,18 +140,71 @@ def test_html_to_markdown_can_skip_relative_rewrite(monkeypatch) -> None:
     assert "[Docs](/docs)" in markdown
 
 
+def test_file_to_markdown_detects_declared_encoding(tmp_path) -> None:
+    """Files are decoded with their <meta charset>, not a fixed UTF-8."""
+    html_file = tmp_path / "legacy.html"
+    html_file.write_bytes(
+        "<html><head><meta charset='iso-8859-1'></head><body><article><h1>Café</h1>"
+        "<p>Crème brûlée is a dessert with a layer of hardened caramelized sugar.</p>"
+        "</article></body></html>".encode("iso-8859-1")
+    )
+
+    markdown = file_to_markdown(html_file)
+
+    assert "Café" in markdown
+    assert "Crème brûlée" in markdown
+
+
+def test_html_to_markdown_parses_memory_mapped_files(tmp_path) -> None:
+    """Mapped files are read by lxml itself and convert like the same bytes."""
+    html = (
+        "<html><head><meta charset='utf-8'></head><body><article><h1>Größe</h1>"
+        + "<p>Grüße aus Köln, a paragraph long enough to be kept as content.</p>" * 2000
+        + "<a href='next.html'>next</a></article></body></html>"
+    ).encode()
+    html_file = tmp_path / "large.html"
+    html_file.write_bytes(html)
+
+    with read_mapped(html_file, threshold=0) as mapping:
+        assert isinstance(mapping, mmap.mmap)
+        markdown = html_to_markdown(mapping, base_url="https://example.com/")
+
+    assert markdown == html_to_markdown(html, base_url="https://example.com/")
+    assert "Grüße aus Köln" in markdown
+    assert "https://example.com/next.html" in markdown
+    with read_mapped(html_file, threshold=0) as mapping:
+        assert parse_html_bytes(mapping, "utf-8").findtext(".//h1") == "Größe"
+    with read_mapped(html_file) as small:
+        assert small == html
+
+
+def test_html_to_markdown_accepts_bytes_with_declared_charset() -> None:
+    """Undecoded input uses the explicit charset, then the header, then detection."""
+    html = "<html><body><h1>Größe</h1><p>Grüße aus Köln</p></body></html>"
+
+    assert "Grüße" in html_to_markdown(html.encode("cp1252"))
+    assert "Grüße" in html_to_markdown(html.encode("latin-1"), charset="latin-1")
+    assert "Grüße" in html_to_markdown(
+        html.encode("utf-16"), "text/html; charset=utf-16"
+    )
+    assert "Grüße" in html_to_markdown(html.encode("euc_jp"), charset="euc_jp")
+
+
 def test_file_to_markdown_accepts_custom_base_url(monkeypatch, tmp_path) -> None:
     """Custom base_url overrides the auto-generated file URI."""
     html_file = tmp_path / "page.html"
     html_file.write_text("<html>content</html>", encoding="utf-8")
 
-    def fake_html_to_markdown(  # noqa: ANN001
+    def fake_html_to_markdown(
             html,
             content_type=None,
             *,
+            charset=None,
             base_url=None,
             rewrite_relative_urls=None,
+            rewrite_mode=None,
             converter=None,
+            result_cache=None,
     ):
         assert base_url == "https://override/"
         assert rewrite_relative_urls is False
@@ -108,22 +224,25 @@ def test_file_to_markdown_accepts_custom_base_url(monkeypatch, tmp_path) -> None
 def test_fetch_to_markdown_allows_custom_base_url(monkeypatch) -> None:
     """fetch_to_markdown should respect an explicit base_url value."""
 
-    def fake_fetch(*args, **kwargs):  # noqa: ANN001
-        return "<html></html>", "text/html"
+    def fake_fetch_response(url, **kwargs):
+        return FetchResponse(url, url, 200, b"<html></html>", "text/html")
 
-    def fake_html_to_markdown(  # noqa: ANN001
+    def fake_html_to_markdown(
             html,
             content_type=None,
             *,
+            charset=None,
             base_url=None,
             rewrite_relative_urls=None,
+            rewrite_mode=None,
             converter=None,
+            result_cache=None,
     ):
         assert base_url == "https://override/"
         assert rewrite_relative_urls is False
         return "converted"
 
-    monkeypatch.setattr("extract2md.core.fetch", fake_fetch)
+    monkeypatch.setattr("extract2md.core.fetch_response", fake_fetch_response)
     monkeypatch.setattr("extract2md.core.html_to_markdown", fake_html_to_markdown)
 
     markdown = fetch_to_markdown(
@@ -138,23 +257,164 @@ def test_fetch_to_markdown_allows_custom_base_url(monkeypatch) -> None:
 def test_fetch_to_markdown_defaults_base_url_to_source(monkeypatch) -> None:
     """When base_url is omitted, the fetched URL is used."""
 
-    def fake_fetch(*args, **kwargs):  # noqa: ANN001
-        return "<html></html>", "text/html"
+    def fake_fetch_response(url, **kwargs):
+        return FetchResponse(url, url, 200, b"<html></html>", "text/html")
 
-    def fake_html_to_markdown(  # noqa: ANN001
+    def fake_html_to_markdown(
             html,
             content_type=None,
             *,
+            charset=None,
             base_url=None,
             rewrite_relative_urls=None,
+            rewrite_mode=None,
             converter=None,
+            result_cache=None,
     ):
         assert base_url == "https://example.com/article"
         return "converted"
 
-    monkeypatch.setattr("extract2md.core.fetch", fake_fetch)
+    monkeypatch.setattr("extract2md.core.fetch_response", fake_fetch_response)
     monkeypatch.setattr("extract2md.core.html_to_markdown", fake_html_to_markdown)
 
     markdown = fetch_to_markdown("https://example.com/article")
 
     assert markdown == "converted"
+
+
+def test_fetch_many_to_markdown_shares_one_client(monkeypatch) -> None:
+    """Batch conversion should reuse a single pooled client for every URL."""
+    import httpx
+
+    clients = []
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        if request.url.path == "/missing":
+            return httpx.Response(500)
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html"},
+            text=f"<html><body><p>Page {request.url.path}</p></body></html>",
+        )
+
+    def fake_create_client(**kwargs):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        clients.append(client)
+        return client
+
+    def fake_html_to_markdown(html, content_type=None, **kwargs):
+        return html.decode("utf-8")
+
+    monkeypatch.setattr("extract2md.core.create_client", fake_create_client)
+    monkeypatch.setattr("extract2md.core.to_markdown", fake_html_to_markdown)
+
+    urls = [f"https://example.com/page-{index}" for index in range(5)]
+    results = list(
+        fetch_many_to_markdown(
+            [*urls, "https://example.com/missing"],
+            concurrency=3,
+            robots_cache=RobotsCache(),
+        )
+    )
+
+    assert len(clients) == 1
+    assert sorted(result.url for result in results if result.ok) == urls
+    failed = [result for result in results if not result.ok]
+    assert [result.url for result in failed] == ["https://example.com/missing"]
+    assert isinstance(failed[0].error, Extract2MarkdownFetchError)
+    assert "Page /page-0" in next(
+        result.markdown for result in results if result.url == urls[0]
+    )
+    assert requested.count("https://example.com/robots.txt") == 1
+
+
+def test_fetch_many_to_markdown_reports_malformed_urls(monkeypatch) -> None:
+    """A URL httpx cannot parse fails on its own instead of ending the batch."""
+    import httpx
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        return httpx.Response(
+            200, headers={"content-type": "text/html"}, text="<html><body><p>Page</p></body></html>"
+        )
+
+    monkeypatch.setattr(
+        "extract2md.core.create_client",
+        lambda **kwargs: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    urls = ["http://example.com:abc/", "https://example.com/"]
+
+    for kwargs in ({"robots_cache": RobotsCache()}, {"ignore_robots_txt": True}):
+        results = {result.url: result for result in fetch_many_to_markdown(urls, **kwargs)}
+
+        assert isinstance(results["http://example.com:abc/"].error, Extract2MarkdownFetchError)
+        assert results["https://example.com/"].ok
+
+
+def test_fetch_many_to_markdown_rejects_invalid_concurrency() -> None:
+    """A concurrency below one cannot make progress."""
+    with pytest.raises(ValueError):
+        list(fetch_many_to_markdown(["https://example.com"], concurrency=0))
+
+
+def test_afetch_to_markdown_runs_concurrently_on_a_shared_client() -> None:
+    """The async API should work inside an existing event loop with one client."""
+    import httpx
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html"},
+            text=f"<html><body><p>Async {request.url.path}</p></body></html>",
+        )
+
+    async def run() -> list[str]:
+        robots_cache = RobotsCache()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await asyncio.gather(
+                *(
+                    afetch_to_markdown(
+                        f"https://example.com/page-{index}",
+                        client=client,
+                        robots_cache=robots_cache,
+                    )
+                    for index in range(20)
+                )
+            )
+
+    results = asyncio.run(run())
+
+    assert len(results) == 20
+    assert "Async /page-7" in results[7]
+
+
+def test_ahtml_to_markdown_uses_executor_and_result_cache() -> None:
+    """Conversions should run on the given executor unless the result is cached."""
+    submitted = []
+
+    class CountingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, /, *args, **kwargs):
+            submitted.append(fn)
+            return super().submit(fn, *args, **kwargs)
+
+    html = "<html><body><p>Executor</p></body></html>"
+    result_cache = ResultCache()
+
+    async def run() -> list[str]:
+        with CountingExecutor(max_workers=1) as executor:
+            first = await ahtml_to_markdown(html, result_cache=result_cache, executor=executor)
+            second = await ahtml_to_markdown(html, result_cache=result_cache, executor=executor)
+        return [first, second]
+
+    first, second = asyncio.run(run())
+
+    assert "Executor" in first
+    assert second == first
+    assert len(submitted) == 1
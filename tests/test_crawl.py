@@ -0,0 +1,170 @@
+"""Tests for the breadth-first site crawler."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from extract2md import ConversionResult, CrawlFrontier, RobotsCache, cli, crawl
+from extract2md._crawl import output_path_for
+
+PARAGRAPH = (
+    "<p>This paragraph is long enough for the extractor to keep it as the main "
+    "content of the page being converted.</p>"
+)
+
+
+def test_frontier_deduplicates_and_enforces_its_bounds() -> None:
+    frontier = CrawlFrontier(["https://example.com"], max_pages=4, max_depth=1, same_host=True)
+
+    assert next(frontier) == "https://example.com/"
+    assert not frontier.add("https://example.com/#top", depth=1)
+    assert frontier.add("https://example.com/a#section", depth=1)
+    assert not frontier.add("https://example.com/a", depth=1)
+    assert not frontier.add("https://other.test/", depth=1)
+    assert not frontier.add("mailto:me@example.com", depth=1)
+    assert not frontier.add("https://example.com/deep", depth=2)
+    frontier.mark_seen("https://example.com/redirected")
+    assert not frontier.add("https://example.com/redirected", depth=1)
+    assert frontier.add("https://example.com/b", depth=1)
+    assert frontier.add("https://example.com/c", depth=1)
+    assert not frontier.add("https://example.com/d", depth=1)
+
+    assert list(frontier) == ["https://example.com/a", "https://example.com/b", "https://example.com/c"]
+    assert frontier.admitted == 4
+    assert frontier.depth("https://example.com/b#x") == 1
+    assert frontier.expands("https://example.com/")
+    assert not frontier.expands("https://example.com/b")
+    with pytest.raises(ValueError):
+        CrawlFrontier(["https://example.com/"], max_pages=0)
+
+
+def test_crawl_fetches_every_page_once_within_depth(monkeypatch) -> None:
+    pages = {
+        "/": '<a href="/a">A</a> <a href="b.html#part">B</a> <a href="https://other.test/">Other</a>',
+        "/a": '<a href="/">Home</a> <a href="/a/deep">Deep</a> <a href="/old">Old</a>',
+        "/b.html": '<a href="/a">A</a>',
+        "/old": "",
+        "/new": '<a href="/beyond">Beyond</a>',
+        "/a/deep": '<a href="/too-deep">Too deep</a>',
+    }
+    requested: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        if request.url.path == "/old":
+            return httpx.Response(301, headers={"location": "https://example.com/new"})
+        body = pages[request.url.path]
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html"},
+            text=f"<html><body><article><h1>{request.url.path}</h1>{PARAGRAPH}{body}</article></body></html>",
+        )
+
+    def fake_create_client(**kwargs):
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+
+    monkeypatch.setattr("extract2md._crawl.create_client", fake_create_client)
+
+    results = list(
+        crawl("https://example.com/", max_depth=2, same_host=True, concurrency=2, robots_cache=RobotsCache())
+    )
+
+    assert [result.url for result in results if not result.ok] == []
+    assert sorted(result.url for result in results) == [
+        "https://example.com/",
+        "https://example.com/a",
+        "https://example.com/a/deep",
+        "https://example.com/b.html",
+        "https://example.com/old",
+    ]
+    pages_requested = [url for url in requested if not url.endswith("/robots.txt")]
+    assert len(pages_requested) == len(set(pages_requested)) == 6  # /old redirects to /new
+    assert "https://example.com/too-deep" not in requested
+    assert "https://example.com/beyond" not in requested
+
+
+def test_crawl_resolves_links_against_the_redirect_target(monkeypatch, tmp_path: Path) -> None:
+    requested: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        if request.url.path == "/docs":
+            return httpx.Response(301, headers={"location": "https://example.com/docs/"})
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html"},
+            text=f'<html><body><article>{PARAGRAPH}<a href="intro">Intro</a></article></body></html>',
+        )
+
+    monkeypatch.setattr(
+        "extract2md._crawl.create_client",
+        lambda **kwargs: httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True),
+    )
+    (tmp_path / "example.com").write_text("not a directory", encoding="utf-8")
+
+    results = list(
+        crawl("https://example.com/docs", max_depth=1, ignore_robots_txt=True, output_dir=tmp_path)
+    )
+
+    assert requested == ["/docs", "/docs/", "/docs/intro"]
+    assert all(isinstance(result.error, OSError) for result in results)
+
+
+def test_crawl_stops_at_max_pages(monkeypatch) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        index = int(request.url.path.strip("/") or 0)
+        links = "".join(f'<a href="/{index * 10 + child}">{child}</a>' for child in range(1, 10))
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html"},
+            text=f"<html><body><article>{PARAGRAPH}{links}</article></body></html>",
+        )
+
+    monkeypatch.setattr(
+        "extract2md._crawl.create_client",
+        lambda **kwargs: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    results = list(crawl("https://example.com/", max_pages=5, robots_cache=RobotsCache()))
+
+    assert len(results) == 5
+    assert all(result.ok for result in results)
+
+
+def test_output_path_for_mirrors_the_site(tmp_path: Path) -> None:
+    assert output_path_for("https://Example.com/", tmp_path) == tmp_path / "example.com" / "index.md"
+    assert output_path_for("https://example.com/docs/", tmp_path) == tmp_path / "example.com/docs/index.md"
+    assert output_path_for("https://example.com/a/b.html", tmp_path) == tmp_path / "example.com/a/b.md"
+    assert output_path_for("https://example.com/../x", tmp_path) == tmp_path / "example.com/x.md"
+    assert output_path_for("https://example.com/p?id=1", tmp_path).name.startswith("p_")
+
+
+def test_cli_crawl_writes_markdown_files(monkeypatch, tmp_path: Path, capsys) -> None:
+    seen = {}
+
+    def fake_crawl(start_urls, **kwargs):
+        seen.update(start_urls=start_urls, **kwargs)
+        yield ConversionResult(url="https://example.com/docs/", markdown="# Docs", status_code=200)
+
+    monkeypatch.setattr(cli, "crawl", fake_crawl)
+
+    exit_code = cli.main([
+        "crawl", "https://example.com/docs/", "--max-pages", "20", "--max-depth", "3",
+        "--same-host", "--output-dir", str(tmp_path),
+    ])
+    record = json.loads(capsys.readouterr().out)
+
+    assert exit_code == 0
+    assert seen["start_urls"] == ["https://example.com/docs/"]
+    assert (seen["max_pages"], seen["max_depth"], seen["same_host"]) == (20, 3, True)
+    assert seen["output_dir"] == str(tmp_path)
+    assert record["output"] == str(tmp_path / "example.com" / "docs" / "index.md")
+    assert record["markdown"] is None
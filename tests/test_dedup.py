@@ -0,0 +1,219 @@
+"""Tests for URL normalization and near-duplicate page detection."""
+
+from __future__ import annotations
+
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+import pytest
+
+from extract2md import (
+    DuplicateIndex,
+    RobotsCache,
+    canonical_url,
+    cli,
+    crawl,
+    fetch_many_to_markdown,
+)
+from extract2md._dedup import hamming_distance, html_fingerprint
+
+WORDS = [
+    "archive", "request", "server", "parser", "element", "table", "column", "value",
+    "network", "latency", "document", "article", "section", "summary", "content",
+    "markdown", "browser", "cache", "header", "response", "encoding",
+]
+
+
+def _article(seed: int, *, extra: str = "") -> str:
+    rng = random.Random(seed)
+    words = [rng.choice(WORDS) for _ in range(300)]
+    return (
+        "<html><body><nav><a href='/'>Home</a> <a href='/about'>About</a></nav>"
+        f"<article><h1>Article {seed}</h1><p>{' '.join(words)}</p>{extra}</article>"
+        "<footer>Copyright Example Corp.</footer></body></html>"
+    )
+
+
+def test_canonical_url_drops_tracking_parameters_and_trivial_differences() -> None:
+    assert canonical_url("HTTPS://Example.COM:443?utm_source=feed&b=2&a=1&fbclid=x#top") == (
+        "https://example.com/?a=1&b=2"
+    )
+    assert canonical_url("http://example.com:8080/p?page=2") == "http://example.com:8080/p?page=2"
+    assert canonical_url("https://user@example.com/p") == "https://user@example.com/p"
+    assert canonical_url("http://[::1]:8080/p") == "http://[::1]:8080/p"
+
+
+def test_canonical_url_keeps_query_spelling_and_unparsable_ports() -> None:
+    assert canonical_url("https://example.com/p?print&next=/a/b") == "https://example.com/p?next=/a/b&print"
+    assert canonical_url("http://Example.com:abc/p#x") == "http://Example.com:abc/p"
+
+
+def test_fingerprint_is_close_for_near_duplicates_only() -> None:
+    original = html_fingerprint(_article(1))
+    print_view = html_fingerprint(_article(1, extra="<p>Printed from example.com</p>").encode("utf-8"))
+    other = html_fingerprint(_article(2))
+
+    assert original is not None and print_view is not None and other is not None
+    assert hamming_distance(original, print_view) <= 3
+    assert hamming_distance(original, other) > 3
+    assert html_fingerprint("<p>Too short to tell.</p>") is None
+
+
+def test_duplicate_index_persists_and_ignores_the_page_itself(tmp_path: Path) -> None:
+    fingerprint = html_fingerprint(_article(1))
+    index = DuplicateIndex(tmp_path / "dedup.sqlite")
+
+    assert index.check("https://example.com/a?utm_medium=mail", fingerprint) is None
+    assert index.check("https://example.com/print/a", fingerprint ^ 0b101) == "https://example.com/a"
+    index.close()
+
+    reopened = DuplicateIndex(tmp_path / "dedup.sqlite")
+    assert reopened.check("https://example.com/a", fingerprint ^ 1) is None  # same page, next run
+    assert reopened.check("https://example.com/b", fingerprint ^ (1 << 63)) == "https://example.com/a"
+    assert len(reopened) == 1
+    with pytest.raises(ValueError):
+        DuplicateIndex(max_distance=4)
+
+
+def test_fetch_many_skips_duplicate_urls_and_pages(monkeypatch) -> None:
+    requested: list[str] = []
+    pages = {
+        "/a": _article(1),
+        "/a/print": _article(1, extra="<p>Printed from example.com</p>"),
+        "/b": _article(2),
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        requested.append(request.url.path)
+        return httpx.Response(200, headers={"content-type": "text/html"}, text=pages[request.url.path])
+
+    monkeypatch.setattr(
+        "extract2md.core.create_client",
+        lambda **kwargs: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    urls = [
+        "https://example.com/a",
+        "https://example.com/a?utm_source=feed",
+        "https://example.com/b",
+        "https://example.com/a/print",
+        "https://example.com:abc/a",
+    ]
+
+    results = {
+        result.url: result
+        for result in fetch_many_to_markdown(
+            urls, concurrency=1, robots_cache=RobotsCache(), dedup=DuplicateIndex()
+        )
+    }
+
+    assert results["https://example.com/a?utm_source=feed"].duplicate_of == "https://example.com/a"
+    assert results["https://example.com/a/print"].duplicate_of == "https://example.com/a"
+    assert results["https://example.com/a/print"].markdown is None
+    assert results["https://example.com/b"].duplicate_of is None
+    assert "Article 2" in results["https://example.com/b"].markdown
+    assert results["https://example.com:abc/a"].error is not None
+    assert requested == ["/a", "/b", "/a/print"]
+
+
+def test_fetch_many_refetches_a_url_whose_first_spelling_failed(monkeypatch) -> None:
+    requested: list[str] = []
+    submitted: list[object] = []
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, /, *args, **kwargs):
+            submitted.append(fn)
+            return super().submit(fn, *args, **kwargs)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        if len(requested) == 1:
+            return httpx.Response(404)
+        return httpx.Response(200, headers={"content-type": "text/html"}, text=_article(1))
+
+    monkeypatch.setattr(
+        "extract2md.core.create_client",
+        lambda **kwargs: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    urls = [
+        "https://example.com/a",
+        "https://example.com/a?utm_source=feed",
+        "https://example.com/a?utm_medium=mail",
+    ]
+
+    with RecordingExecutor(max_workers=1) as executor:
+        results = list(
+            fetch_many_to_markdown(
+                urls, concurrency=1, ignore_robots_txt=True, dedup=DuplicateIndex(), executor=executor
+            )
+        )
+
+    assert [result.ok for result in results] == [False, True, True]
+    assert results[2].duplicate_of == "https://example.com/a?utm_source=feed"
+    assert requested == urls[:2]
+    assert html_fingerprint in submitted
+
+
+def test_crawl_fetches_each_canonical_url_once_and_skips_near_duplicates(monkeypatch, tmp_path: Path, capsys) -> None:
+    pages = {
+        "/": _article(3, extra='<a href="/a">A</a> <a href="/a?utm_campaign=x">A</a> <a href="/copy">Copy</a>'),
+        "/a": _article(1),
+        "/copy": _article(1, extra="<p>Printed from example.com</p>"),
+        "/about": _article(4),
+    }
+    requested: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        requested.append(str(request.url))
+        return httpx.Response(200, headers={"content-type": "text/html"}, text=pages[request.url.path])
+
+    monkeypatch.setattr(
+        "extract2md._crawl.create_client",
+        lambda **kwargs: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    exit_code = cli.main([
+        "crawl", "https://example.com/?utm_source=x", "--concurrency", "1", "--dedup",
+        "--output-dir", str(tmp_path), "--ignore-robots",
+    ])
+    records = {record["url"]: record for record in map(json.loads, capsys.readouterr().out.splitlines())}
+
+    assert exit_code == 0
+    assert requested == [
+        "https://example.com/?utm_source=x",
+        "https://example.com/about",
+        "https://example.com/a",
+        "https://example.com/copy",
+    ]
+    assert records["https://example.com/copy"]["duplicate_of"] == "https://example.com/a"
+    assert "output" not in records["https://example.com/copy"]
+    assert not (tmp_path / "example.com" / "copy.md").exists()
+    assert (tmp_path / "example.com" / "a.md").exists()
+
+
+def test_crawl_reports_links_with_unparsable_ports(monkeypatch) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html"},
+            text=_article(1, extra='<a href="http://example.com:abc/">Broken</a>'),
+        )
+
+    monkeypatch.setattr(
+        "extract2md._crawl.create_client",
+        lambda **kwargs: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    results = {
+        result.url: result
+        for result in crawl("https://example.com/", ignore_robots_txt=True, max_depth=1, dedup=DuplicateIndex())
+    }
+
+    assert results["https://example.com/"].ok
+    assert results["http://example.com:abc/"].error is not None
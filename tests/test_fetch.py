@@ -0,0 +1,159 @@
+"""Unit tests for the HTTP fetching helpers."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from extract2md._fetch import _fetch_url
+from extract2md._http_cache import HttpCache
+from extract2md.models import (
+    Extract2MarkdownContentTypeError,
+    Extract2MarkdownFetchError,
+    Extract2MarkdownToMarkdownError,
+)
+
+USER_AGENT = "extract2md-test"
+
+
+class CountingStream(httpx.AsyncByteStream):
+    """Response body that records how many chunks were pulled."""
+
+    def __init__(self, chunk: bytes, count: int) -> None:
+        self.chunk = chunk
+        self.count = count
+        self.served = 0
+
+    async def __aiter__(self):
+        for _ in range(self.count):
+            self.served += 1
+            yield self.chunk
+
+
+def _fetch(handler, url: str = "https://example.com/page", **kwargs):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await _fetch_url(client, url, USER_AGENT, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_fetch_url_returns_body_and_metadata() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html; charset=utf-8"},
+            content="<html>café</html>".encode(),
+        )
+
+    response = _fetch(handler)
+
+    assert response.content == "<html>café</html>"
+    assert response.content_type == "text/html; charset=utf-8"
+    assert response.status_code == 200
+    assert response.final_url == "https://example.com/page"
+
+
+def test_fetch_url_aborts_streams_beyond_max_bytes() -> None:
+    stream = CountingStream(b"x" * 1024, count=1000)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-type": "text/html"}, stream=stream)
+
+    with pytest.raises(Extract2MarkdownFetchError, match="exceeds"):
+        _fetch(handler, max_bytes=4096)
+
+    assert stream.served == 5
+
+
+def test_fetch_url_rejects_large_content_length_up_front() -> None:
+    stream = CountingStream(b"x", count=10)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html", "content-length": "10000000"},
+            stream=stream,
+        )
+
+    with pytest.raises(Extract2MarkdownFetchError, match="exceeds"):
+        _fetch(handler, max_bytes=1024)
+
+    assert stream.served == 0
+
+
+def test_fetch_url_checks_content_type_before_download() -> None:
+    stream = CountingStream(b"%PDF", count=10)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-type": "application/pdf"}, stream=stream)
+
+    with pytest.raises(Extract2MarkdownContentTypeError):
+        _fetch(handler, require_html=True)
+
+    assert stream.served == 0
+
+
+def test_fetch_url_decodes_with_meta_charset() -> None:
+    body = '<html><head><meta charset="windows-1252"></head><body>café</body></html>'
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html"},
+            content=body.encode("windows-1252"),
+        )
+
+    response = _fetch(handler)
+
+    assert response.body == body.encode("windows-1252")
+    assert response.charset == "windows-1252"
+    assert response.content == body
+
+
+def test_fetch_url_sniffs_body_before_full_download() -> None:
+    stream = CountingStream(b"\x00" * 1024, count=1000)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, stream=stream)
+
+    with pytest.raises(Extract2MarkdownToMarkdownError):
+        _fetch(handler, require_html=True)
+
+    assert stream.served == 4
+
+
+def test_fetch_url_revalidates_cached_responses(tmp_path) -> None:
+    cache = HttpCache(tmp_path)
+    seen_headers = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_headers.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"abc"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html", "etag": '"abc"'},
+            content=b"<html><body>cached</body></html>",
+        )
+
+    first = _fetch(handler, http_cache=cache)
+    second = _fetch(handler, http_cache=cache)
+
+    assert seen_headers == [None, '"abc"']
+    assert (first.status_code, first.from_cache) == (200, False)
+    assert (second.status_code, second.from_cache) == (200, True)
+    assert second.content == "<html><body>cached</body></html>"
+    assert second.content_type == "text/html"
+
+
+def test_fetch_url_rejects_304_without_a_cached_response() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(304, headers={"content-type": "text/html"})
+
+    with pytest.raises(Extract2MarkdownFetchError, match="304") as excinfo:
+        _fetch(handler)
+
+    assert excinfo.value.status_code == 304
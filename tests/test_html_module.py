@@ -9,7 +9,10 @@ import pytest
 
 from extract2md._html import to_markdown
 from extract2md.converters.readability import ReadabilityConverter, _ensure_node_path
-from extract2md.models import Extract2MarkdownConverterError
+from extract2md.models import (
+    Extract2MarkdownConverterError,
+    Extract2MarkdownToMarkdownError,
+)
 
 
 def test_to_markdown_delegates_to_named_converter(monkeypatch):
@@ -28,7 +31,7 @@ def test_to_markdown_delegates_to_named_converter(monkeypatch):
 
     fake = FakeConverter()
 
-    def fake_get(name=None):  # noqa: ANN001
+    def fake_get(name=None):
         assert name == "fake"
         return fake
 
@@ -41,6 +44,30 @@ def test_to_markdown_delegates_to_named_converter(monkeypatch):
     assert fake.html == html
 
 
+def test_to_markdown_hands_parsed_tree_to_tree_converters(monkeypatch):
+    """Tree-capable converters receive the rewritten lxml tree, not a string."""
+
+    class FakeTreeConverter:
+        name = "fake-tree"
+        description = "fake tree converter"
+
+        def convert(self, html: str) -> str:
+            raise AssertionError("convert() should not be used")
+
+        def convert_tree(self, tree) -> str:
+            return tree.xpath("//a/@href")[0]
+
+    monkeypatch.setattr("extract2md._html.get_converter", lambda name=None: FakeTreeConverter())
+
+    result = to_markdown(
+        '<html><body><a href="docs">Docs</a></body></html>',
+        converter="fake-tree",
+        base_url="https://example.com/",
+    )
+
+    assert result == "https://example.com/docs"
+
+
 def test_to_markdown_unknown_converter_raises() -> None:
     """Unknown converter names should raise converter errors."""
     html = "<html><body>content</body></html>"
@@ -48,16 +75,34 @@ def test_to_markdown_unknown_converter_raises() -> None:
         to_markdown(html, converter="doesnotexist")
 
 
+def test_to_markdown_sniffs_bytes_past_long_preambles(monkeypatch):
+    """A comment longer than the sniffed prefix must not reject undecoded input."""
+
+    class FakeConverter:
+        name = "fake"
+        description = "fake converter"
+
+        def convert(self, html: str) -> str:
+            return "Body"
+
+    monkeypatch.setattr("extract2md._html.get_converter", lambda name=None: FakeConverter())
+    preamble = "<!-- " + "x" * 5000 + " -->\n"
+
+    assert to_markdown((preamble + "<html><body><p>Body</p></body></html>").encode()) == "Body"
+    with pytest.raises(Extract2MarkdownToMarkdownError):
+        to_markdown(preamble.encode())
+
+
 def test_readability_converter_uses_readability_and_markdownify(monkeypatch):
     """Successful conversion should invoke both readabilipy and markdownify."""
     recorded = {}
 
-    def fake_simple_json_from_html_string(html, use_readability):  # noqa: ANN001
+    def fake_simple_json_from_html_string(html, use_readability):
         recorded["html"] = html
         recorded["use_readability"] = use_readability
         return {"content": "<p>Body</p>"}
 
-    def fake_markdownify(value, heading_style=None):  # noqa: ANN001
+    def fake_markdownify(value, heading_style=None):
         recorded["markdown_input"] = value
         recorded["heading_style"] = heading_style
         return "Body"
@@ -66,6 +111,7 @@ def test_readability_converter_uses_readability_and_markdownify(monkeypatch):
         "extract2md.converters.readability.readabilipy.simple_json.simple_json_from_html_string",
         fake_simple_json_from_html_string,
     )
+    monkeypatch.setattr("extract2md.converters.readability._get_worker_pool", lambda: None)
     monkeypatch.setattr(
         "extract2md.converters.readability.markdownify.markdownify",
         fake_markdownify,
@@ -83,19 +129,42 @@ def test_readability_converter_uses_readability_and_markdownify(monkeypatch):
 def test_readability_converter_handles_empty_payload(monkeypatch):
     """Empty Readability content should raise a clear error."""
 
-    def fake_simple_json_from_html_string(*args, **kwargs):  # noqa: ANN001
+    def fake_simple_json_from_html_string(*args, **kwargs):
         return {"content": ""}
 
     monkeypatch.setattr(
         "extract2md.converters.readability.readabilipy.simple_json.simple_json_from_html_string",
         fake_simple_json_from_html_string,
     )
+    monkeypatch.setattr("extract2md.converters.readability._get_worker_pool", lambda: None)
 
     converter = ReadabilityConverter()
     with pytest.raises(Extract2MarkdownConverterError):
         converter.convert("<html></html>")
 
 
+def test_readability_converter_prefers_worker_pool(monkeypatch):
+    """A running worker pool should be used instead of spawning readabilipy."""
+
+    class FakePool:
+        def request(self, payload):
+            assert payload == {"html": "<html><body><p>Body</p></body></html>"}
+            return {"id": 1, "article": {"content": "<p>Body</p>"}}
+
+    def fail_simple_json(*args, **kwargs):
+        raise AssertionError("readabilipy should not be spawned")
+
+    monkeypatch.setattr("extract2md.converters.readability._get_worker_pool", FakePool)
+    monkeypatch.setattr(
+        "extract2md.converters.readability.readabilipy.simple_json.simple_json_from_html_string",
+        fail_simple_json,
+    )
+
+    result = ReadabilityConverter().convert("<html><body><p>Body</p></body></html>")
+
+    assert result.strip() == "Body"
+
+
 def test_ensure_node_path_inserts_directory(monkeypatch, tmp_path: Path):
     """EXTRACT2MD_NODE_PATH should be prepended to PATH when valid."""
     node_dir = tmp_path / "node"
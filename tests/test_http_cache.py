@@ -0,0 +1,51 @@
+"""Unit tests for the on-disk HTTP cache."""
+
+from __future__ import annotations
+
+import os
+
+from extract2md._http_cache import HttpCache
+
+
+def _store(cache: HttpCache, url: str, body: bytes, etag: str | None = '"v1"') -> None:
+    cache.store(
+        url,
+        final_url=url,
+        content_type="text/html",
+        etag=etag,
+        last_modified=None,
+        body=body,
+    )
+
+
+def test_http_cache_round_trips_entries(tmp_path) -> None:
+    cache = HttpCache(tmp_path)
+    _store(cache, "https://example.com/a", b"<html>a</html>")
+
+    entry = HttpCache(tmp_path).get("https://example.com/a")
+
+    assert entry is not None
+    assert entry.read_body() == b"<html>a</html>"
+    assert entry.conditional_headers() == {"If-None-Match": '"v1"'}
+
+
+def test_http_cache_skips_responses_without_validators(tmp_path) -> None:
+    cache = HttpCache(tmp_path)
+    _store(cache, "https://example.com/a", b"<html>a</html>", etag=None)
+
+    assert cache.get("https://example.com/a") is None
+
+
+def test_http_cache_evicts_least_recently_used(tmp_path) -> None:
+    cache = HttpCache(tmp_path, max_bytes=250)
+    for index, name in enumerate("abc"):
+        _store(cache, f"https://example.com/{name}", b"x" * 100)
+        metadata_path, _ = cache._paths_for(f"https://example.com/{name}")
+        os.utime(metadata_path, (1000 + index, 1000 + index))
+        if name == "b":
+            # Reading "a" makes "b" the least recently used entry.
+            cache.get("https://example.com/a")
+
+    assert cache.get("https://example.com/a") is not None
+    assert cache.get("https://example.com/b") is None
+    assert cache.get("https://example.com/c") is not None
@@ -2,7 +2,13 @@
 
 from __future__ import annotations
 
-from extract2md._links import rewrite_relative_links
+from extract2md._links import (
+    collect_links,
+    rewrite_markdown_links,
+    rewrite_relative_links,
+    rewrite_relative_links_in_tree,
+)
+from extract2md._parse import parse_html
 
 
 def test_rewrite_relative_links_updates_href_and_src() -> None:
@@ -20,3 +26,53 @@ def test_rewrite_relative_links_no_base_url_noop() -> None:
     rewritten = rewrite_relative_links(html, base_url=None)
 
     assert rewritten == html
+
+
+def test_rewrite_relative_links_in_tree_updates_parsed_document() -> None:
+    tree = parse_html('<html><body><a href="page#top">Page</a><a>No link</a></body></html>')
+
+    rewrite_relative_links_in_tree(tree, base_url="https://example.com/docs/")
+
+    assert [a.get("href") for a in tree.iter("a")] == ["https://example.com/docs/page#top", None]
+
+
+def test_rewrite_relative_links_in_tree_collects_document_links() -> None:
+    html = (
+        '<html><head><link href="style.css" rel="stylesheet"></head><body>'
+        '<a href="page#top">Page</a><img src="logo.png"><map><area href="/area"></map>'
+        "</body></html>"
+    )
+    links: list[str] = []
+
+    rewrite_relative_links_in_tree(parse_html(html), base_url="https://example.com/docs/", links=links)
+
+    assert links == ["https://example.com/docs/page#top", "https://example.com/area"]
+
+    unresolved: list[str] = []
+    collect_links(parse_html(html), base_url=None, links=unresolved)
+
+    assert unresolved == ["page#top", "/area"]
+
+
+def test_rewrite_markdown_links_updates_links_and_images() -> None:
+    markdown = (
+        'Read [the docs](/docs "Docs") or [![logo](img/logo.png)](../home).\n'
+        "[ref]: guide/intro\n"
+        "[absolute](https://other.test/x) and [mail](mailto:me@example.com)\n"
+    )
+
+    rewritten = rewrite_markdown_links(markdown, base_url="https://example.com/base/")
+
+    assert '[the docs](https://example.com/docs "Docs")' in rewritten
+    assert "[![logo](https://example.com/base/img/logo.png)](https://example.com/home)" in rewritten
+    assert "[ref]: https://example.com/base/guide/intro" in rewritten
+    assert "[absolute](https://other.test/x)" in rewritten
+    assert "[mail](mailto:me@example.com)" in rewritten
+
+
+def test_rewrite_markdown_links_skips_fenced_code() -> None:
+    markdown = "```\n[code](/path)\n```\n[text](/path)"
+
+    rewritten = rewrite_markdown_links(markdown, base_url="https://example.com/")
+
+    assert rewritten == "```\n[code](/path)\n```\n[text](https://example.com/path)"
@@ -0,0 +1,154 @@
+"""Tests for the incremental re-conversion manifest."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+
+import httpx
+
+from extract2md import Manifest, RobotsCache, cli, convert_directory, crawl
+from extract2md._manifest import conversion_version
+
+ARTICLE = (
+    "<html><body><article><h1>{title}</h1><p>This paragraph is long enough for the "
+    "extractor to keep it as the main content of the page being converted.</p>"
+    "{links}</article></body></html>"
+)
+
+
+def test_manifest_round_trips_entries(tmp_path: Path) -> None:
+    manifest = Manifest(tmp_path / "manifest.sqlite")
+    version = conversion_version("trafilatura", rewrite_relative_urls=True, rewrite_mode="html")
+    output = tmp_path / "out.md"
+    manifest.record(
+        "https://example.com/",
+        etag='"v1"',
+        last_modified=None,
+        content_hash="abc",
+        converter_version=version,
+        output_path=output,
+        links=["https://example.com/a"],
+    )
+    manifest.close()
+
+    entry = Manifest(tmp_path / "manifest.sqlite").get("https://example.com/")
+
+    assert entry is not None
+    assert entry.links == ("https://example.com/a",)
+    assert entry.conditional_headers() == {"If-None-Match": '"v1"'}
+    assert not entry.is_current(version, output)  # the output file is missing
+    output.write_text("# Out", encoding="utf-8")
+    assert entry.is_current(version, output)
+    assert not entry.is_current(version.replace("rewrite=html", "rewrite=off"), output)
+
+
+def test_crawl_skips_pages_unchanged_since_the_last_run(monkeypatch, tmp_path: Path) -> None:
+    pages = {
+        "/": ARTICLE.format(title="Home", links='<a href="/a">A</a>'),
+        "/a": ARTICLE.format(title="First", links=""),
+    }
+    requested: list[tuple[str, str | None]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        requested.append((request.url.path, request.headers.get("if-none-match")))
+        if request.url.path == "/":
+            if request.headers.get("if-none-match") == '"home"':
+                return httpx.Response(304, headers={"etag": '"home"'})
+            return httpx.Response(
+                200, headers={"content-type": "text/html", "etag": '"home"'}, text=pages["/"]
+            )
+        return httpx.Response(200, headers={"content-type": "text/html"}, text=pages["/a"])
+
+    monkeypatch.setattr(
+        "extract2md._crawl.create_client",
+        lambda **kwargs: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    manifest = Manifest(tmp_path / "manifest.sqlite")
+    output_dir = tmp_path / "out"
+
+    def run() -> dict[str, bool]:
+        requested.clear()
+        results = crawl(
+            "https://example.com/",
+            robots_cache=RobotsCache(),
+            output_dir=output_dir,
+            manifest=manifest,
+        )
+        return {result.url: result.unchanged for result in results if result.ok}
+
+    assert run() == {"https://example.com/": False, "https://example.com/a": False}
+    assert "First" in (output_dir / "example.com" / "a.md").read_text(encoding="utf-8")
+
+    assert run() == {"https://example.com/": True, "https://example.com/a": True}
+    assert requested == [("/", '"home"'), ("/a", None)]  # /a is still followed
+
+    pages["/a"] = ARTICLE.format(title="Second", links="")
+    assert run() == {"https://example.com/": True, "https://example.com/a": False}
+    assert "Second" in (output_dir / "example.com" / "a.md").read_text(encoding="utf-8")
+
+
+def test_convert_directory_skips_unchanged_files(tmp_path: Path) -> None:
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    src.mkdir()
+    first, second = src / "first.html", src / "second.html"
+    first.write_text(ARTICLE.format(title="First", links=""), encoding="utf-8")
+    second.write_text(ARTICLE.format(title="Second", links=""), encoding="utf-8")
+    manifest = Manifest(tmp_path / "manifest.sqlite")
+
+    def run() -> tuple[int, int]:
+        summary = convert_directory(src, dst, workers=1, manifest=manifest)
+        assert summary.failed == 0
+        return summary.converted, summary.skipped
+
+    assert run() == (2, 0)
+    assert run() == (0, 2)
+    entry = manifest.get(str(first.resolve()))
+    assert entry is not None
+    assert (entry.etag, entry.last_modified) == (None, None)
+    assert entry.file_stamp == f"{first.stat().st_size}-{first.stat().st_mtime_ns}"
+
+    stat = first.stat()
+    os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    second.write_text(ARTICLE.format(title="Changed", links=""), encoding="utf-8")
+    assert run() == (1, 1)  # first was touched but hashes the same
+    assert "Changed" in (dst / "second.md").read_text(encoding="utf-8")
+
+    (dst / "first.md").unlink()
+    assert run() == (1, 1)
+    assert (dst / "first.md").exists()
+
+
+def test_manifest_adds_the_file_stamp_column_to_older_manifests(tmp_path: Path) -> None:
+    path = tmp_path / "manifest.sqlite"
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE sources (source TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_hash TEXT,"
+            " converter_version TEXT NOT NULL, output_path TEXT, links TEXT, updated_at REAL NOT NULL)"
+        )
+        connection.execute("INSERT INTO sources VALUES ('page.html', '1-2', NULL, 'abc', 'v1', NULL, NULL, 0)")
+    connection.close()
+    manifest = Manifest(path)
+
+    assert manifest.get("page.html").file_stamp is None
+    manifest.record(
+        "page.html", etag=None, last_modified=None, content_hash="abc", converter_version="v1", file_stamp="1-2"
+    )
+    assert manifest.get("page.html").file_stamp == "1-2"
+    manifest.close()
+
+
+def test_cli_batch_reports_unchanged_files(tmp_path: Path, capsys) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "page.html").write_text(ARTICLE.format(title="Page", links=""), encoding="utf-8")
+    argv = ["batch", str(src), str(tmp_path / "dst"), "--workers", "1", "--manifest", str(tmp_path / "m.sqlite")]
+
+    assert cli.main(argv) == 0
+    assert cli.main(argv) == 0
+
+    assert "converted 0 file(s), 0 failed, 1 unchanged" in capsys.readouterr().err
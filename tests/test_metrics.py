@@ -0,0 +1,148 @@
+"""Tests for per-stage timing and size metrics."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+
+from extract2md import StageMetrics, cli, convert_directory, html_to_markdown, observe
+from extract2md._metrics import is_observed, record_size, record_timing, timed
+from extract2md._server import ConversionServer
+from extract2md.core import _convert_one
+
+ARTICLE = (
+    "<html><body><article><h1>Measured</h1><p>This paragraph is long enough for the "
+    "extractor to keep it as the main content of the page being converted.</p>"
+    "<a href='/next'>next</a></article></body></html>"
+)
+
+
+def test_observers_nest_and_timed_is_inert_without_them() -> None:
+    outer, inner = StageMetrics(), StageMetrics()
+
+    with timed("convert"):
+        pass
+    assert not is_observed()
+
+    with observe(outer):
+        record_timing("download", 0.5)
+        with observe(inner):
+            record_size("download_bytes", 10)
+            with timed("converter"):
+                pass
+
+    assert not is_observed()
+    assert outer.timings["download"] == 0.5
+    assert outer.sizes == inner.sizes == {"download_bytes": 10}
+    assert outer.counts["converter"] == inner.counts["converter"] == 1
+    assert "download" not in inner.timings
+
+
+def test_stage_metrics_merge_and_render_prometheus() -> None:
+    metrics = StageMetrics()
+    metrics.record_timing("parse", 0.25)
+    metrics.merge({"timings": {"parse": 0.5}, "counts": {"parse": 2}, "sizes": {"output_bytes": 7}})
+
+    text = metrics.render_prometheus(counters={"jobs_total": 3}, gauges={"jobs_active": 1})
+
+    assert 'extract2md_stage_seconds_sum{stage="parse"} 0.750000' in text
+    assert 'extract2md_stage_seconds_count{stage="parse"} 3' in text
+    assert 'extract2md_bytes_total{kind="output"} 7' in text
+    assert "# TYPE extract2md_jobs_total counter\nextract2md_jobs_total 3" in text
+    assert "# TYPE extract2md_jobs_active gauge\nextract2md_jobs_active 1" in text
+
+
+def test_html_to_markdown_reports_conversion_stages() -> None:
+    with observe(StageMetrics()) as metrics:
+        markdown = html_to_markdown(ARTICLE, base_url="https://example.com/")
+
+    assert set(metrics.timings) >= {"parse", "rewrite", "converter"}
+    assert metrics.sizes["output_bytes"] == len(markdown.encode("utf-8"))
+
+
+def test_convert_one_records_fetch_stages_per_document() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        return httpx.Response(200, headers={"content-type": "text/html"}, text=ARTICLE)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await _convert_one(
+                client,
+                "https://example.com/page",
+                user_agent="test",
+                ignore_robots_txt=False,
+                proxy_url=None,
+                timeout=5.0,
+                robots_cache=None,
+                max_bytes=None,
+                http_cache=None,
+                rewrite_relative_urls=True,
+                rewrite_mode="html",
+                converter=None,
+                result_cache=None,
+            )
+
+    result = asyncio.run(run())
+
+    assert result.ok
+    assert set(result.timings) >= {
+        "robots", "download", "parse", "converter", "fetch", "convert", "total",
+    }
+    assert "decode" not in result.timings  # lxml parsed the downloaded bytes directly
+    assert result.sizes["download_bytes"] == len(ARTICLE.encode("utf-8"))
+    assert result.to_record()["sizes"] == result.sizes
+
+
+def test_convert_directory_collects_worker_stats(tmp_path: Path) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "page.html").write_text(ARTICLE, encoding="utf-8")
+
+    summary = convert_directory(src, tmp_path / "dst", workers=1, collect_stats=True)
+
+    assert summary.converted == 1
+    assert summary.stats is not None
+    assert summary.stats["counts"]["read"] == 1
+    assert summary.stats["sizes"]["output_bytes"] > 0
+    assert convert_directory(src, tmp_path / "dst", workers=1).stats is None
+
+
+def test_server_exports_prometheus_metrics() -> None:
+    server = ConversionServer(concurrency=2)
+
+    async def run():
+        listener = await server.start(host="127.0.0.1", port=0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+                await client.post("/convert", json={"html": ARTICLE})
+                return await client.get("/metrics")
+        finally:
+            await server.close()
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'extract2md_stage_seconds_count{stage="converter"} 1' in response.text
+    assert "extract2md_jobs_completed_total 1" in response.text
+    assert "extract2md_jobs_active 0" in response.text
+
+
+def test_cli_stats_prints_stage_totals(tmp_path: Path, capsys) -> None:
+    html_file = tmp_path / "page.html"
+    html_file.write_text(ARTICLE, encoding="utf-8")
+
+    exit_code = cli.main([str(html_file), "--stats"])
+    captured = capsys.readouterr()
+    stats = json.loads(captured.err)
+
+    assert exit_code == 0
+    assert "Measured" in captured.out
+    assert set(stats) == {"timings", "counts", "sizes"}
+    assert stats["counts"]["read"] == 1
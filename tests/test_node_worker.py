@@ -0,0 +1,83 @@
+"""Tests for the persistent stdio worker used by the Readability converter."""
+
+from __future__ import annotations
+
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from extract2md.converters._node_worker import NodeWorker, NodeWorkerPool
+from extract2md.models import Extract2MarkdownConverterError
+
+FAKE_WORKER = textwrap.dedent(
+    """
+    import json, os, struct, sys, time
+
+    header = struct.Struct(">I")
+    while True:
+        raw = sys.stdin.buffer.read(header.size)
+        if len(raw) < header.size:
+            break
+        request = json.loads(sys.stdin.buffer.read(header.unpack(raw)[0]))
+        html = request["html"]
+        if html == "crash":
+            os._exit(1)
+        if html == "hang":
+            time.sleep(60)
+        reply = {"id": request["id"], "article": {"content": html, "pid": os.getpid()}}
+        body = json.dumps(reply).encode()
+        sys.stdout.buffer.write(header.pack(len(body)) + body)
+        sys.stdout.buffer.flush()
+    """
+)
+
+
+@pytest.fixture
+def worker_command(tmp_path: Path) -> list[str]:
+    script = tmp_path / "worker.py"
+    script.write_text(FAKE_WORKER, encoding="utf-8")
+    return [sys.executable, str(script)]
+
+
+def test_worker_reuses_one_process(worker_command):
+    worker = NodeWorker(worker_command)
+    try:
+        first = worker.request({"html": "<p>one</p>"})
+        second = worker.request({"html": "<p>two</p>"})
+    finally:
+        worker.close()
+
+    assert first["article"]["content"] == "<p>one</p>"
+    assert second["article"]["content"] == "<p>two</p>"
+    assert first["article"]["pid"] == second["article"]["pid"]
+
+
+def test_worker_restarts_after_crash(worker_command):
+    worker = NodeWorker(worker_command)
+    try:
+        before = worker.request({"html": "ok"})["article"]["pid"]
+        with pytest.raises(Extract2MarkdownConverterError):
+            worker.request({"html": "crash"})
+        after = worker.request({"html": "ok"})["article"]["pid"]
+    finally:
+        worker.close()
+
+    assert before != after
+
+
+def test_worker_enforces_timeout(worker_command):
+    worker = NodeWorker(worker_command, timeout=0.5)
+    try:
+        with pytest.raises(Extract2MarkdownConverterError, match="within"):
+            worker.request({"html": "hang"})
+        assert not worker.alive
+        assert worker.request({"html": "ok"})["article"]["content"] == "ok"
+    finally:
+        worker.close()
+
+
+def test_pool_rejects_empty_size(worker_command):
+    with pytest.raises(ValueError):
+        NodeWorkerPool(worker_command, size=0)
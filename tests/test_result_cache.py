@@ -0,0 +1,90 @@
+"""Unit tests for the content-addressed Markdown cache."""
+
+from __future__ import annotations
+
+from extract2md import ResultCache, html_to_markdown
+
+HTML = "<html><body><article><p>Cached paragraph with enough text.</p></article></body></html>"
+
+
+def _counting_to_markdown(monkeypatch) -> list[str]:
+    calls = []
+
+    def fake_to_markdown(
+            html,
+            content_type=None,
+            *,
+            charset=None,
+            converter=None,
+            base_url=None,
+            rewrite_mode=None,
+    ):
+        calls.append(html)
+        return f"converted:{base_url}"
+
+    monkeypatch.setattr("extract2md.core.to_markdown", fake_to_markdown)
+    return calls
+
+
+def test_result_cache_skips_repeated_conversion(monkeypatch) -> None:
+    calls = _counting_to_markdown(monkeypatch)
+    cache = ResultCache()
+
+    first = html_to_markdown(HTML, base_url="https://example.com/", result_cache=cache)
+    second = html_to_markdown(HTML, base_url="https://example.com/", result_cache=cache)
+
+    assert first == second == "converted:https://example.com/"
+    assert len(calls) == 1
+
+
+def test_result_cache_keys_on_conversion_options(monkeypatch) -> None:
+    calls = _counting_to_markdown(monkeypatch)
+    cache = ResultCache()
+
+    html_to_markdown(HTML, base_url="https://a.test/", result_cache=cache)
+    html_to_markdown(HTML, base_url="https://b.test/", result_cache=cache)
+    html_to_markdown(HTML, base_url="https://a.test/", rewrite_mode="markdown", result_cache=cache)
+    html_to_markdown(HTML, base_url="https://a.test/", converter="readability", result_cache=cache)
+
+    assert len(calls) == 4
+
+
+def test_result_cache_keys_undecoded_html_on_its_charset(monkeypatch) -> None:
+    calls = _counting_to_markdown(monkeypatch)
+    cache = ResultCache()
+    data = HTML.encode("utf-8")
+
+    html_to_markdown(data, result_cache=cache)
+    html_to_markdown(data, result_cache=cache)
+    html_to_markdown(data, charset="latin-1", result_cache=cache)
+    html_to_markdown(data, "text/html; charset=latin-1", result_cache=cache)
+
+    assert len(calls) == 2
+
+
+def test_result_cache_persists_in_sqlite(monkeypatch, tmp_path) -> None:
+    calls = _counting_to_markdown(monkeypatch)
+    path = tmp_path / "results.sqlite"
+
+    first_cache = ResultCache(path=path)
+    html_to_markdown(HTML, result_cache=first_cache)
+    first_cache.close()
+
+    second_cache = ResultCache(path=path)
+    markdown = html_to_markdown(HTML, result_cache=second_cache)
+    second_cache.close()
+
+    assert markdown == "converted:None"
+    assert len(calls) == 1
+
+
+def test_result_cache_evicts_least_recently_used() -> None:
+    cache = ResultCache(max_entries=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    cache.get("a")
+    cache.set("c", "C")
+
+    assert cache.get("a") == "A"
+    assert cache.get("b") is None
+    assert cache.get("c") == "C"
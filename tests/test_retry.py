@@ -0,0 +1,106 @@
+"""Tests for retrying transient fetch failures."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from email.utils import formatdate
+
+import httpx
+import pytest
+
+from extract2md._fetch import _fetch_async
+from extract2md._retry import RetryPolicy, parse_retry_after
+from extract2md.models import Extract2MarkdownFetchError
+
+USER_AGENT = "extract2md-test"
+FAST = RetryPolicy(retries=2, backoff=0.001)
+
+
+def _fetch(handler, retry: RetryPolicy | None):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await _fetch_async(
+                "https://example.com/page",
+                user_agent=USER_AGENT,
+                ignore_robots_txt=True,
+                proxy_url=None,
+                timeout=5,
+                client=client,
+                retry=retry,
+            )
+
+    return asyncio.run(run())
+
+
+def test_parse_retry_after_accepts_seconds_and_dates() -> None:
+    assert parse_retry_after("7") == 7.0
+    assert 25 <= parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+    assert parse_retry_after("soon") is None
+
+
+def test_next_delay_follows_status_rules_and_retry_after() -> None:
+    policy = RetryPolicy(retries=3, backoff=1.0, jitter=False, max_retry_after=10)
+    unavailable = Extract2MarkdownFetchError("503", status_code=503)
+    throttled = Extract2MarkdownFetchError("429", status_code=429, retry_after="4")
+    too_long = Extract2MarkdownFetchError("429", status_code=429, retry_after="60")
+
+    assert [policy.next_delay(unavailable, attempt) for attempt in range(4)] == [
+        1.0, 2.0, 4.0, None,
+    ]
+    assert policy.next_delay(throttled, 0) == 4.0
+    assert policy.next_delay(too_long, 0) is None
+    assert policy.next_delay(Extract2MarkdownFetchError("404", status_code=404), 0) is None
+
+
+def test_fetch_retries_server_errors_until_success() -> None:
+    statuses = iter([503, 429, 200])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = next(statuses)
+        return httpx.Response(status, headers={"content-type": "text/html"}, text="<html>ok</html>")
+
+    response = _fetch(handler, FAST)
+
+    assert response.status_code == 200
+    assert response.content == "<html>ok</html>"
+
+
+def test_fetch_retries_transport_errors() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, text="<html>ok</html>")
+
+    assert _fetch(handler, FAST).content == "<html>ok</html>"
+    assert len(calls) == 2
+
+
+def test_fetch_gives_up_after_configured_retries() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(502)
+
+    with pytest.raises(Extract2MarkdownFetchError, match="502") as excinfo:
+        _fetch(handler, FAST)
+
+    assert excinfo.value.status_code == 502
+    assert len(calls) == 3
+
+
+def test_fetch_does_not_retry_without_policy() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(503)
+
+    with pytest.raises(Extract2MarkdownFetchError):
+        _fetch(handler, None)
+
+    assert len(calls) == 1
@@ -0,0 +1,105 @@
+"""Unit tests for the robots.txt cache."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from extract2md._robots import RobotsCache
+from extract2md.models import Extract2MarkdownFetchError
+
+USER_AGENT = "extract2md-test"
+
+
+def _lookup(cache: RobotsCache, handler, urls: list[str]) -> list:
+    async def run() -> list:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return [await cache.rules_for(client, url, USER_AGENT) for url in urls]
+
+    return asyncio.run(run())
+
+
+def test_robots_cache_downloads_once_per_host() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        return httpx.Response(200, text="User-agent: *\nDisallow: /private\n")
+
+    cache = RobotsCache()
+    rules = _lookup(
+        cache,
+        handler,
+        ["https://example.com/a", "https://example.com/private/b", "https://other.test/"],
+    )
+
+    assert calls == ["https://example.com/robots.txt", "https://other.test/robots.txt"]
+    rules[0].check("https://example.com/a", USER_AGENT)
+    with pytest.raises(Extract2MarkdownFetchError):
+        rules[1].check("https://example.com/private/b", USER_AGENT)
+
+
+def test_robots_cache_caches_deny_and_allow_outcomes() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.host)
+        return httpx.Response(403 if request.url.host == "deny.test" else 404)
+
+    cache = RobotsCache()
+    rules = _lookup(
+        cache,
+        handler,
+        ["https://deny.test/", "https://deny.test/x", "https://allow.test/", "https://allow.test/y"],
+    )
+
+    assert calls == ["deny.test", "allow.test"]
+    with pytest.raises(Extract2MarkdownFetchError):
+        rules[0].check("https://deny.test/", USER_AGENT)
+    rules[2].check("https://allow.test/anything", USER_AGENT)
+
+
+def test_robots_cache_honours_cache_control() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.host)
+        return httpx.Response(200, headers={"cache-control": "no-store"}, text="")
+
+    cache = RobotsCache()
+    _lookup(cache, handler, ["https://example.com/", "https://example.com/"])
+
+    assert calls == ["example.com", "example.com"]
+
+
+def test_robots_cache_persists_to_disk(tmp_path) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text="User-agent: *\nDisallow: /\n")
+
+    _lookup(RobotsCache(cache_dir=tmp_path), handler, ["https://example.com/"])
+
+    def failing_handler(request: httpx.Request) -> httpx.Response:
+        raise AssertionError("robots.txt should be served from disk")
+
+    (rules,) = _lookup(RobotsCache(cache_dir=tmp_path), failing_handler, ["https://example.com/"])
+    with pytest.raises(Extract2MarkdownFetchError):
+        rules.check("https://example.com/page", USER_AGENT)
+
+
+def test_robots_cache_ignores_downloads_left_behind_by_closed_loops() -> None:
+    dead_loop = asyncio.new_event_loop()
+    abandoned = dead_loop.create_future()
+    dead_loop.close()
+    cache = RobotsCache()
+
+    async def run():
+        # Pretend the closed loop's id was reused by the running loop.
+        cache._pending[(id(asyncio.get_running_loop()), "https://example.com")] = abandoned
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, text="User-agent: *\nAllow: /\n"))
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await asyncio.wait_for(cache.rules_for(client, "https://example.com/a", USER_AGENT), 5)
+
+    asyncio.run(run()).check("https://example.com/a", USER_AGENT)
+    assert cache._pending == {}
@@ -0,0 +1,156 @@
+"""Tests for per-host politeness scheduling."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+
+from extract2md._fetch import _fetch_async
+from extract2md._robots import RULES, RobotsCache, RobotsRules
+from extract2md._scheduler import HostScheduler, host_key, run_fair
+
+USER_AGENT = "extract2md-test"
+
+
+def test_host_key_ignores_scheme_port_and_case() -> None:
+    assert host_key("https://Example.com:8443/a") == "example.com"
+    assert host_key("http://example.com/b") == "example.com"
+
+
+def test_robots_rules_expose_crawl_delay() -> None:
+    rules = RobotsRules(RULES, robots_txt="User-agent: *\nCrawl-delay: 2.5\n")
+
+    assert rules.crawl_delay(USER_AGENT) == 2.5
+    assert RobotsRules(RULES, robots_txt="User-agent: *\n").crawl_delay(USER_AGENT) is None
+
+
+def test_scheduler_caps_in_flight_requests_per_host() -> None:
+    scheduler = HostScheduler(max_per_host=2)
+    peak = {"a.test": 0, "b.test": 0}
+
+    async def request(url: str) -> None:
+        async with scheduler.slot(url):
+            host = host_key(url)
+            peak[host] = max(peak[host], scheduler.in_flight(url))
+            await asyncio.sleep(0.01)
+
+    async def run() -> None:
+        await asyncio.gather(
+            *(request(f"https://{host}/{i}") for host in peak for i in range(6))
+        )
+
+    asyncio.run(run())
+
+    assert peak == {"a.test": 2, "b.test": 2}
+
+
+def test_scheduler_passes_on_wakeups_of_cancelled_waiters() -> None:
+    scheduler = HostScheduler(max_per_host=1)
+    url = "https://a.test/"
+
+    async def run() -> int:
+        await scheduler.acquire(url)
+        first = asyncio.create_task(scheduler.acquire(url))
+        second = asyncio.create_task(scheduler.acquire(url))
+        await asyncio.sleep(0)
+        scheduler.release(url)  # wakes first ...
+        first.cancel()  # ... which leaves before taking the slot
+        await asyncio.wait_for(second, 1)
+        return scheduler.in_flight(url)
+
+    assert asyncio.run(run()) == 1
+
+
+def test_scheduler_forgets_idle_hosts(monkeypatch) -> None:
+    monkeypatch.setattr("extract2md._scheduler._PRUNE_HOSTS", 4)
+    unlimited = HostScheduler()
+    paced = HostScheduler(rate=1000.0)
+
+    async def run() -> None:
+        for index in range(10):
+            for scheduler in (unlimited, paced):
+                async with scheduler.slot(f"https://host{index}.test/"):
+                    pass
+            await asyncio.sleep(0.002)
+
+    asyncio.run(run())
+
+    assert unlimited._hosts == {}
+    assert len(paced._hosts) < 4
+
+
+def test_scheduler_spaces_requests_by_rate_and_crawl_delay() -> None:
+    scheduler = HostScheduler(max_per_host=10, rate=100.0)
+    starts: dict[str, list[float]] = {"fast.test": [], "slow.test": []}
+
+    async def request(url: str, crawl_delay: float | None) -> None:
+        async with scheduler.slot(url, crawl_delay=crawl_delay):
+            starts[host_key(url)].append(time.monotonic())
+
+    async def run() -> None:
+        await asyncio.gather(
+            *(request(f"https://fast.test/{i}", None) for i in range(3)),
+            *(request(f"https://slow.test/{i}", 0.05) for i in range(3)),
+        )
+
+    asyncio.run(run())
+
+    slow = starts["slow.test"]
+    assert slow[2] - slow[0] >= 0.09
+    fast = starts["fast.test"]
+    assert 0.015 <= fast[2] - fast[0] < 0.09
+
+
+def test_run_fair_interleaves_hosts() -> None:
+    urls = [f"https://big.test/{i}" for i in range(6)] + ["https://small.test/0"]
+    order: list[str] = []
+
+    async def handle(url: str) -> str:
+        order.append(url)
+        await asyncio.sleep(0.01)
+        return url
+
+    async def run() -> list[str]:
+        return [result async for result in run_fair(urls, handle, concurrency=2, max_per_host=1)]
+
+    results = asyncio.run(run())
+
+    assert sorted(results) == sorted(urls)
+    assert order[:2] == ["https://big.test/0", "https://small.test/0"]
+
+
+def test_fetch_async_waits_for_crawl_delay() -> None:
+    request_times: list[float] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(200, text="User-agent: *\nCrawl-delay: 0.05\n")
+        request_times.append(time.monotonic())
+        return httpx.Response(200, headers={"content-type": "text/html"}, text="<html></html>")
+
+    async def run() -> None:
+        scheduler = HostScheduler(max_per_host=4)
+        robots_cache = RobotsCache()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await asyncio.gather(
+                *(
+                    _fetch_async(
+                        f"https://example.com/{i}",
+                        user_agent=USER_AGENT,
+                        ignore_robots_txt=False,
+                        proxy_url=None,
+                        timeout=5,
+                        client=client,
+                        robots_cache=robots_cache,
+                        scheduler=scheduler,
+                    )
+                    for i in range(3)
+                )
+            )
+
+    asyncio.run(run())
+
+    assert len(request_times) == 3
+    assert request_times[2] - request_times[0] >= 0.09
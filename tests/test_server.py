@@ -0,0 +1,164 @@
+"""Tests for the long-running conversion server."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from extract2md import _server
+from extract2md._server import ConversionServer
+from extract2md.models import ConversionResult, Extract2MarkdownFetchError
+
+ARTICLE = (
+    "<html><body><article><h1>Served</h1><p>This paragraph is long enough for the "
+    "extractor to keep it as the main content of the page being converted.</p>"
+    "</article></body></html>"
+)
+
+
+def _run(server: ConversionServer, scenario):
+    async def run():
+        listener = await server.start(host="127.0.0.1", port=0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+                return await scenario(client)
+        finally:
+            await server.close()
+
+    return asyncio.run(run())
+
+
+def test_server_converts_html_jobs_and_reports_health() -> None:
+    async def scenario(client: httpx.AsyncClient):
+        converted = await client.post("/convert", json={"html": ARTICLE})
+        health = await client.get("/health")
+        return converted, health
+
+    converted, health = _run(ConversionServer(concurrency=2), scenario)
+
+    assert converted.status_code == 200
+    assert "Served" in converted.json()["markdown"]
+    assert health.json() == {
+        "status": "ok",
+        "active": 0,
+        "queued": 0,
+        "completed": 1,
+        "failed": 0,
+        "concurrency": 2,
+        "max_queue": 100,
+    }
+
+
+def test_server_maps_url_job_errors_to_status_codes(monkeypatch) -> None:
+    async def fake_convert_one(client, url, **kwargs):
+        return ConversionResult(url=url, error=Extract2MarkdownFetchError("HTTP 404"))
+
+    monkeypatch.setattr(_server, "_convert_one", fake_convert_one)
+
+    async def scenario(client: httpx.AsyncClient):
+        failed = await client.post("/convert", json={"url": "https://example.com/missing"})
+        invalid = await client.post("/convert", content=b"{not json")
+        both = await client.post("/convert", json={"url": "x", "html": "y"})
+        return failed, invalid, both
+
+    failed, invalid, both = _run(ConversionServer(), scenario)
+
+    assert failed.status_code == 502
+    assert failed.json()["type"] == "Extract2MarkdownFetchError"
+    assert invalid.status_code == 400
+    assert both.status_code == 400
+
+
+def test_server_rejects_invalid_job_options() -> None:
+    async def scenario(client: httpx.AsyncClient):
+        return [
+            await client.post("/convert", json={"html": ARTICLE, **options})
+            for options in (
+                {"converter": "nonexistent"},
+                {"converter": "trafilatura,nonexistent"},
+                {"converter": ["trafilatura"]},
+                {"rewrite_relative_urls": "no"},
+            )
+        ]
+
+    responses = _run(ConversionServer(), scenario)
+
+    assert [response.status_code for response in responses] == [400, 400, 400, 400]
+    assert "nonexistent" in responses[0].json()["error"]
+
+
+def test_server_passes_base_url_and_answers_unexpected_errors(monkeypatch) -> None:
+    seen = {}
+
+    async def fake_convert_one(client, url, **kwargs):
+        seen.update(kwargs)
+        return ConversionResult(url=url, markdown="done")
+
+    async def broken_ahtml_to_markdown(*args, **kwargs):
+        raise RuntimeError("converter bug")
+
+    monkeypatch.setattr(_server, "_convert_one", fake_convert_one)
+    monkeypatch.setattr(_server, "ahtml_to_markdown", broken_ahtml_to_markdown)
+
+    async def scenario(client: httpx.AsyncClient):
+        converted = await client.post(
+            "/convert", json={"url": "https://example.com/a", "base_url": "https://mirror.test/"}
+        )
+        invalid = await client.post("/convert", json={"html": ARTICLE, "content_type": 1})
+        broken = await client.post("/convert", json={"html": ARTICLE})
+        return converted, invalid, broken
+
+    converted, invalid, broken = _run(ConversionServer(), scenario)
+
+    assert converted.json()["markdown"] == "done"
+    assert seen["base_url"] == "https://mirror.test/"
+    assert invalid.status_code == 400
+    assert broken.status_code == 500
+    assert broken.json()["type"] == "RuntimeError"
+
+
+def test_server_answers_oversized_request_and_header_lines() -> None:
+    async def scenario(client: httpx.AsyncClient):
+        statuses = []
+        for request in (
+            b"GET /" + b"a" * 100_000 + b" HTTP/1.1\r\n\r\n",
+            b"GET /health HTTP/1.1\r\nX-Long: " + b"a" * 100_000 + b"\r\n\r\n",
+        ):
+            reader, writer = await asyncio.open_connection(client.base_url.host, client.base_url.port)
+            writer.write(request)
+            await writer.drain()
+            statuses.append((await reader.readline()).split()[1])
+            writer.close()
+            await writer.wait_closed()
+        return statuses
+
+    assert _run(ConversionServer(), scenario) == [b"414", b"431"]
+
+
+def test_server_rejects_jobs_beyond_queue_limit(monkeypatch) -> None:
+    release = asyncio.Event()
+
+    async def slow_convert_one(client, url, **kwargs):
+        await release.wait()
+        return ConversionResult(url=url, markdown="done")
+
+    monkeypatch.setattr(_server, "_convert_one", slow_convert_one)
+    server = ConversionServer(concurrency=1, max_queue=1)
+
+    async def scenario(client: httpx.AsyncClient):
+        running = asyncio.create_task(client.post("/convert", json={"url": "https://a.test/"}))
+        queued = asyncio.create_task(client.post("/convert", json={"url": "https://b.test/"}))
+        while server.active < 1 or server.queued < 1:
+            await asyncio.sleep(0.01)
+        rejected = await client.post("/convert", json={"url": "https://c.test/"})
+        release.set()
+        return rejected, await running, await queued
+
+    rejected, running, queued = _run(server, scenario)
+
+    assert rejected.status_code == 503
+    assert rejected.headers["retry-after"] == "1"
+    assert running.json()["markdown"] == "done"
+    assert queued.json()["markdown"] == "done"
@@ -0,0 +1,244 @@
+"""Tests for sitemap discovery and streaming parsing."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import io
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import pytest
+
+from extract2md import RobotsCache, aiter_sitemap_urls, cli, crawl
+from extract2md._sitemap import _download, iter_sitemap_entries, parse_lastmod
+from extract2md.models import Extract2MarkdownFetchError
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def _urlset(*entries: tuple[str, str | None]) -> bytes:
+    urls = "".join(
+        f"<url><loc>{loc}</loc>{f'<lastmod>{lastmod}</lastmod>' if lastmod else ''}</url>"
+        for loc, lastmod in entries
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{urls}</urlset>'.encode()
+
+
+SITE = {
+    "/robots.txt": b"User-agent: *\nAllow: /\nSitemap: https://example.com/sitemap_index.xml\n",
+    "/sitemap_index.xml": (
+        f"<sitemapindex {NS}>"
+        "<sitemap><loc>https://example.com/posts.xml.gz</loc><lastmod>2024-06-01</lastmod></sitemap>"
+        "<sitemap><loc>https://example.com/archive.xml</loc><lastmod>2020-01-01</lastmod></sitemap>"
+        "<sitemap><loc>https://example.com/sitemap_index.xml</loc></sitemap>"
+        "</sitemapindex>"
+    ).encode(),
+    "/posts.xml.gz": gzip.compress(
+        _urlset(
+            ("https://example.com/new", "2024-06-01T12:00:00+02:00"),
+            ("https://example.com/old", "2023-12-31"),
+            ("https://example.com/undated", None),
+            ("https://other.test/elsewhere", "2024-06-02"),
+        )
+    ),
+    "/archive.xml": _urlset(("https://example.com/ancient", "2019-01-01")),
+}
+
+
+def _handler(requested: list[str]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        if request.url.path in SITE:
+            return httpx.Response(200, content=SITE[request.url.path])
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html"},
+            text=f"<html><body><article><h1>{request.url.path}</h1><p>Body text.</p></article></body></html>",
+        )
+
+    return handler
+
+
+def test_parse_lastmod_accepts_w3c_datetimes() -> None:
+    assert parse_lastmod("2024") == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert parse_lastmod(" 2024-05-01T10:00:00.5Z ") == datetime(2024, 5, 1, 10, tzinfo=timezone.utc)
+    assert parse_lastmod("2024-05-01T12:00+02:00") == datetime(2024, 5, 1, 10, tzinfo=timezone.utc)
+    assert parse_lastmod("2024-13-01") is None
+    assert parse_lastmod("yesterday") is None
+    assert parse_lastmod(None) is None
+
+
+def test_iter_sitemap_entries_streams_plain_and_gzip_sitemaps() -> None:
+    plain = _urlset(("https://example.com/a", "2024-01-02"), ("https://example.com/b", None))
+    bare = plain.replace(f" {NS}".encode(), b"")
+
+    for data in (plain, gzip.compress(plain), bare):
+        entries = list(iter_sitemap_entries(io.BytesIO(data)))
+        assert [entry.loc for entry in entries] == ["https://example.com/a", "https://example.com/b"]
+        assert entries[0].lastmod == datetime(2024, 1, 2, tzinfo=timezone.utc)
+        assert not entries[0].is_sitemap
+
+    with pytest.raises(ValueError):
+        list(iter_sitemap_entries(io.BytesIO(b"<urlset><url><loc>x</loc>")))
+
+
+def test_sitemaps_are_limited_in_size() -> None:
+    bomb = gzip.compress(_urlset(*((f"https://example.com/{index}", None) for index in range(1000))))
+
+    with pytest.raises(ValueError, match="exceeds"):
+        list(iter_sitemap_entries(io.BytesIO(bomb), max_bytes=len(bomb)))
+
+    async def download():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=bomb))
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await _download(client, "https://example.com/sitemap.xml.gz", "test", len(bomb) - 1)
+
+    with pytest.raises(Extract2MarkdownFetchError, match="exceeds"):
+        asyncio.run(download())
+
+
+def test_aiter_sitemap_urls_follows_indexes_from_robots_txt() -> None:
+    requested: list[str] = []
+
+    async def run(since):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler(requested))) as client:
+            return [
+                url async for url in aiter_sitemap_urls(
+                    client,
+                    "https://example.com/docs/",
+                    user_agent="test",
+                    robots_cache=RobotsCache(),
+                    since=since,
+                )
+            ]
+
+    assert asyncio.run(run(None)) == [
+        "https://example.com/new",
+        "https://example.com/old",
+        "https://example.com/undated",
+        "https://other.test/elsewhere",
+        "https://example.com/ancient",
+    ]
+    assert requested.count("/sitemap_index.xml") == 1
+
+    requested.clear()
+    assert asyncio.run(run(datetime(2024, 1, 1))) == [
+        "https://example.com/new",
+        "https://example.com/undated",
+        "https://other.test/elsewhere",
+    ]
+    assert "/archive.xml" not in requested
+
+
+def test_aiter_sitemap_urls_reports_missing_sitemaps() -> None:
+    async def run():
+        transport = httpx.MockTransport(lambda request: httpx.Response(404))
+        async with httpx.AsyncClient(transport=transport) as client:
+            return [
+                url async for url in aiter_sitemap_urls(
+                    client, "https://example.com/", user_agent="test", robots_cache=RobotsCache()
+                )
+            ]
+
+    with pytest.raises(Extract2MarkdownFetchError, match="sitemap.xml"):
+        asyncio.run(run())
+
+
+def test_aiter_sitemap_urls_reads_on_past_broken_sitemaps() -> None:
+    site = {
+        "/sitemap_index.xml": (
+            f"<sitemapindex {NS}>"
+            "<sitemap><loc>https://example.com/dead.xml</loc></sitemap>"
+            "<sitemap><loc>https://example.com/broken.xml</loc></sitemap>"
+            "<sitemap><loc>https://example.com/live.xml</loc></sitemap>"
+            "</sitemapindex>"
+        ).encode(),
+        "/broken.xml": b"<urlset><url><loc>https://example.com/partial",
+        "/live.xml": _urlset(("https://example.com/live", None)),
+    }
+    errors: dict[str, Extract2MarkdownFetchError] = {}
+
+    async def run():
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, content=site[request.url.path])
+            if request.url.path in site
+            else httpx.Response(404)
+        )
+        async with httpx.AsyncClient(transport=transport) as client:
+            return [
+                url async for url in aiter_sitemap_urls(
+                    client,
+                    "https://example.com/sitemap_index.xml",
+                    user_agent="test",
+                    on_error=errors.__setitem__,
+                )
+            ]
+
+    assert asyncio.run(run()) == ["https://example.com/live"]
+    assert errors["https://example.com/dead.xml"].status_code == 404
+    assert "Invalid sitemap" in str(errors["https://example.com/broken.xml"])
+
+
+def test_crawl_reports_missing_sitemaps_as_failed_results(monkeypatch) -> None:
+    monkeypatch.setattr(
+        "extract2md._crawl.create_client",
+        lambda **kwargs: httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(404))),
+    )
+
+    results = list(crawl(["https://example.com/", "https://other.test/"], sitemap=True, robots_cache=RobotsCache()))
+
+    assert [(result.url, result.status_code) for result in results] == [
+        ("https://example.com/sitemap.xml", 404),
+        ("https://other.test/sitemap.xml", 404),
+    ]
+
+
+def test_crawl_converts_sitemap_pages(monkeypatch) -> None:
+    requested: list[str] = []
+    monkeypatch.setattr(
+        "extract2md._crawl.create_client",
+        lambda **kwargs: httpx.AsyncClient(transport=httpx.MockTransport(_handler(requested))),
+    )
+
+    results = list(
+        crawl(
+            "https://example.com/",
+            sitemap=True,
+            same_host=True,
+            since=datetime(2024, 1, 1),
+            max_pages=None,
+            robots_cache=RobotsCache(),
+        )
+    )
+
+    assert sorted(result.url for result in results) == ["https://example.com/new", "https://example.com/undated"]
+    assert all(result.ok and result.links == () for result in results)
+    assert "/elsewhere" not in requested
+
+
+def test_cli_crawl_sitemap_reads_and_writes_the_state_file(monkeypatch, tmp_path: Path, capsys) -> None:
+    state_file = tmp_path / "state.json"
+    state_file.write_text(json.dumps({"last_run": "2024-01-01T00:00:00+00:00"}), encoding="utf-8")
+    seen = {}
+
+    def fake_crawl(start_urls, **kwargs):
+        seen.update(kwargs)
+        yield from ()
+
+    monkeypatch.setattr(cli, "crawl", fake_crawl)
+
+    exit_code = cli.main(["crawl", "https://example.com/", "--sitemap", "--state-file", str(state_file)])
+
+    assert exit_code == 0
+    assert seen["sitemap"] is True
+    assert seen["max_pages"] is None
+    assert seen["since"] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    last_run = parse_lastmod(json.loads(state_file.read_text(encoding="utf-8"))["last_run"])
+    assert last_run is not None and last_run > seen["since"]
+
+    with pytest.raises(SystemExit):
+        cli.main(["crawl", "https://example.com/", "--since", "2024-01-01"])
+    assert "--since and --state-file require --sitemap" in capsys.readouterr().err
@@ -0,0 +1,85 @@
+"""Unit tests for HTML and charset sniffing."""
+
+from __future__ import annotations
+
+import codecs
+import mmap
+
+from extract2md import _sniff
+from extract2md._files import read_mapped
+from extract2md._sniff import (
+    decode_html,
+    detect_charset,
+    sniff_charset,
+    sniff_html,
+    sniff_prefix,
+)
+
+
+def test_sniff_html_skips_long_preambles() -> None:
+    preamble = "<!-- " + "license text " * 500 + "-->\n"
+
+    assert sniff_html(preamble + "<html><body></body></html>") is True
+    assert sniff_html('<?xml version="1.0"?>\n<!DOCTYPE html>\n<title>x</title>') is True
+    assert sniff_html("\ufeff  <HEAD><title>x</title></head>") is True
+
+
+def test_sniff_html_rejects_other_documents() -> None:
+    assert sniff_html("%PDF-1.7 binary") is False
+    assert sniff_html('{"json": true}') is False
+    assert sniff_html('<?xml version="1.0"?><!DOCTYPE svg><svg></svg>') is False
+
+
+def test_sniff_html_is_undecided_on_truncated_preamble() -> None:
+    assert sniff_html("<!-- still inside a comment") is None
+    assert sniff_html("   ") is None
+    assert sniff_html("<ht") is None
+
+
+def test_sniff_charset_prefers_bom_then_header_then_meta() -> None:
+    meta = b'<html><head><meta http-equiv="Content-Type" content="text/html; charset=ISO-8859-2">'
+
+    assert sniff_charset(codecs.BOM_UTF8 + meta, "text/html; charset=latin-1") == "utf-8-sig"
+    assert sniff_charset(meta, "text/html; charset=windows-1252") == "windows-1252"
+    assert sniff_charset(meta, "text/html") == "iso-8859-2"
+    assert sniff_charset(b"<html>", "text/html; charset=bogus") is None
+
+
+def test_sniff_prefix_decodes_utf16_documents() -> None:
+    prefix = "<html><body>text</body></html>".encode("utf-16")
+
+    assert sniff_prefix(prefix, "text/html") == (True, "utf-16")
+
+
+def test_detect_charset_falls_back_to_windows_1252_for_invalid_utf8() -> None:
+    assert detect_charset(b"<p>plain</p>") == "utf-8"
+    assert detect_charset("<p>café</p>".encode()) == "utf-8"
+    assert detect_charset("<p>café</p>".encode("cp1252")) == "cp1252"
+    assert detect_charset("<p>café</p>".encode("cp1252"), "latin-1") == "latin-1"
+
+
+def test_decode_html_decodes_undeclared_legacy_pages() -> None:
+    assert decode_html("<p>“café”</p>".encode("cp1252")) == "<p>“café”</p>"
+    assert decode_html("<p>café</p>".encode()) == "<p>café</p>"
+
+
+def test_detect_charset_validates_bytes_in_chunks(monkeypatch) -> None:
+    monkeypatch.setattr(_sniff, "_VALIDATE_CHUNK_BYTES", 4)
+
+    assert detect_charset("<p>café</p>".encode()) == "utf-8"
+    assert detect_charset("<p>café".encode()[:-1]) == "cp1252"  # truncated character
+
+
+def test_detect_charset_validates_mapped_files_in_chunks(monkeypatch, tmp_path) -> None:
+    """A multi-byte character split across two chunks is still valid UTF-8."""
+    monkeypatch.setattr(_sniff, "_VALIDATE_CHUNK_BYTES", 4)
+    utf8_file = tmp_path / "utf8.html"
+    utf8_file.write_bytes("<p>café</p>".encode())
+    legacy_file = tmp_path / "legacy.html"
+    legacy_file.write_bytes("<p>café</p>".encode("cp1252"))
+
+    with read_mapped(utf8_file, threshold=0) as utf8, read_mapped(legacy_file, threshold=0) as legacy:
+        assert isinstance(utf8, mmap.mmap)
+        assert detect_charset(utf8) == "utf-8"
+        assert detect_charset(legacy) == "cp1252"
+        assert decode_html(legacy) == "<p>café</p>"